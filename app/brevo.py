@@ -11,6 +11,8 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from app import http_client
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
@@ -28,7 +30,7 @@ def _post(path, payload):
         return None
 
     try:
-        response = requests.post(
+        response = http_client.post(
             f"{BREVO_API_BASE}{path}",
             json=payload,
             headers={
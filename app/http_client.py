@@ -0,0 +1,59 @@
+"""
+Shared session for outbound API calls (geocoding, Brevo, GitHub, Imgur).
+
+Connections are pooled per host and kept alive, so repeat calls skip DNS
+and the TCP and TLS handshakes. urllib3's pools are thread-safe, and
+cookies are refused so the session holds no other state shared between
+threads. Every request gets a connect timeout, plus a read timeout unless
+the caller passes its own.
+"""
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+# Hosts with a pool kept open, and connections kept open to each
+POOL_HOSTS = 10
+POOL_CONNECTIONS_PER_HOST = 10
+
+
+class PooledSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def request(self, method, url, timeout=None, **kwargs):
+        # A single number is the caller's read timeout - connecting is always bounded the same
+        if timeout is None:
+            timeout = DEFAULT_READ_TIMEOUT
+        if not isinstance(timeout, tuple):
+            timeout = (CONNECT_TIMEOUT, timeout)
+        return super().request(method, url, timeout=timeout, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession()
+    return _session
+
+
+def get(url, **kwargs) -> requests.Response:
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs) -> requests.Response:
+    return get_session().post(url, **kwargs)
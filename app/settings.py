@@ -105,6 +105,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "tinymce",
     "corsheaders",
     "crispy_forms",
@@ -221,11 +222,29 @@ else:
 DATABASES = {"default": database}
 
 # Cache configuration (for rate limiting)
+MAP_FRAGMENT_CACHE_BACKEND = os.environ.get(
+    "MAP_FRAGMENT_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
         "LOCATION": "rate_limit_cache",  # Table name
-    }
+    },
+    # Rendered map fragments and tiles (eznashdb.fragment_cache). Process-local
+    # by default - point it at a shared backend if running several processes.
+    "map_fragments": {
+        "BACKEND": MAP_FRAGMENT_CACHE_BACKEND,
+        "LOCATION": os.environ.get("MAP_FRAGMENT_CACHE_LOCATION", "map-fragments"),
+        "TIMEOUT": int(os.environ.get("MAP_FRAGMENT_CACHE_TIMEOUT", 60 * 60)),
+        # Room for a few thousand tiles - LocMemCache keeps only 300 by default
+        "OPTIONS": ({"MAX_ENTRIES": 5000} if MAP_FRAGMENT_CACHE_BACKEND.endswith("LocMemCache") else {}),
+    },
+    # Geocoding search results (eznashdb.geocoding_cache), shared by all processes
+    "geocoding": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "geocoding_cache",  # Table name
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    },
 }
 
 AUTH_USER_MODEL = "users.User"
@@ -353,6 +372,23 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 CRISPY_CLASS_CONVERTERS = {"textinput": "textinput rounded", "select": "select rounded"}
 
+# Metrics (e.g. eznashdb.place_search's provider latencies) are logged as
+# key=value lines, for a log-based metrics pipeline to pick up. Failures are
+# logged at INFO and per-search ones at DEBUG, so set METRICS_LOG_LEVEL=DEBUG
+# to get them all
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "eznashdb.metrics": {
+            "handlers": ["console"],
+            "level": os.environ.get("METRICS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 # Sentry
 SENTRY_DSN = os.environ.get("SENTRY_DSN")
 if SENTRY_DSN and (DEBUG is False):
@@ -367,6 +403,11 @@ MAPS_CO_API_KEY = os.environ.get("MAPS_CO_API_KEY")
 MAPS_CO_DOMAIN = "https://geocode.maps.co/search"
 NOMINATIM_DOMAIN = "https://nominatim.openstreetmap.org/"
 BASE_OSM_URL = MAPS_CO_API_KEY and MAPS_CO_DOMAIN or NOMINATIM_DOMAIN
+# Seconds search results are cached for, per provider (eznashdb.geocoding_cache)
+GEOCODING_CACHE_TIMEOUTS = {
+    "google": int(os.environ.get("GOOGLE_PLACES_CACHE_TIMEOUT", 24 * 60 * 60)),
+    "osm": int(os.environ.get("OSM_CACHE_TIMEOUT", 7 * 24 * 60 * 60)),
+}
 
 # Google Places API (disabled on dev - restricted to ezratnashim.com)
 GOOGLE_PLACES_API_KEY = None
@@ -377,6 +418,15 @@ GOOGLE_PLACES_USER_DAILY_AUTOCOMPLETE_LIMIT = int(
     os.environ.get("GOOGLE_PLACES_USER_DAILY_AUTOCOMPLETE_LIMIT", 50)
 )
 
+# Answer shul filters from the in-memory facet index (eznashdb.facet_index)
+# rather than joining rooms in Postgres
+SHUL_FACET_INDEX_ENABLED = os.environ.get("SHUL_FACET_INDEX_ENABLED", "True") == "True"
+
+# Where the unfiltered map's marker bundle is written (eznashdb.marker_bundle)
+SHUL_MARKER_BUNDLE_ROOT = os.environ.get(
+    "SHUL_MARKER_BUNDLE_ROOT", os.path.join(BASE_DIR, "marker_bundles")
+)
+
 # Enforce host
 ENFORCE_HOST = os.environ.get("ENFORCE_HOST")
 
@@ -30,7 +30,7 @@ def describe_post():
 
     def skips_request_when_brevo_disabled(settings, mocker):
         settings.BREVO_API_KEY = None
-        request = mocker.patch("app.brevo.requests.post")
+        request = mocker.patch("app.http_client.post")
 
         result = real_post("/contacts", {"email": "jane@example.com"})
 
@@ -40,7 +40,7 @@ def describe_post():
     def swallows_request_failures(settings, mocker):
         """A Brevo outage must not raise - callers rely on this being best-effort."""
         settings.BREVO_API_KEY = "test-key"
-        mocker.patch("app.brevo.requests.post", side_effect=requests.RequestException("boom"))
+        mocker.patch("app.http_client.post", side_effect=requests.RequestException("boom"))
 
         result = real_post("/contacts", {"email": "jane@example.com"})
 
@@ -0,0 +1,52 @@
+import urllib.request
+from email.message import Message
+
+import requests
+
+from app import http_client
+from app.http_client import CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, PooledSession
+
+
+def test_reuses_one_session():
+    assert http_client.get_session() is http_client.get_session()
+
+
+def test_pools_connections_per_host():
+    adapter = PooledSession().get_adapter("https://nominatim.openstreetmap.org/search")
+
+    assert adapter._pool_connections == http_client.POOL_HOSTS
+    assert adapter._pool_maxsize == http_client.POOL_CONNECTIONS_PER_HOST
+
+
+def describe_timeouts():
+    def defaults_both(mocker):
+        request = mocker.patch.object(requests.Session, "request")
+
+        PooledSession().get("https://example.com")
+
+        assert request.call_args.kwargs["timeout"] == (CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+    def treats_a_number_as_the_read_timeout(mocker):
+        request = mocker.patch.object(requests.Session, "request")
+
+        PooledSession().post("https://example.com", timeout=30)
+
+        assert request.call_args.kwargs["timeout"] == (CONNECT_TIMEOUT, 30)
+
+    def keeps_a_callers_pair(mocker):
+        request = mocker.patch.object(requests.Session, "request")
+
+        PooledSession().get("https://example.com", timeout=(1, 2))
+
+        assert request.call_args.kwargs["timeout"] == (1, 2)
+
+
+def test_refuses_cookies():
+    session = PooledSession()
+    headers = Message()
+    headers["Set-Cookie"] = "id=1; Path=/"
+    response = type("Response", (), {"info": lambda self: headers})()
+
+    session.cookies.extract_cookies(response, urllib.request.Request("https://example.com/"))
+
+    assert not session.cookies
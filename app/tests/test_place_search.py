@@ -1,9 +1,21 @@
 """Tests for place search merger."""
 
+import logging
+import threading
+import time
+from unittest.mock import ANY
+
 import pytest
 
+from eznashdb import place_search
 from eznashdb.enums import GeocodingProvider
-from eznashdb.place_search import NormalizedPlace, PlaceSearchMerger, score_place
+from eznashdb.place_search import (
+    NormalizedPlace,
+    PlaceSearchMerger,
+    ProviderExecutor,
+    matches_query,
+    score_place,
+)
 
 
 def describe_score_place():
@@ -254,8 +266,192 @@ def describe_place_search_merger():
         results = merger.search("test", session_token="token123")
 
         # Should call both providers
-        google_client_mock.autocomplete_and_normalize.assert_called_once_with("test", "token123")
-        osm_client_mock.search_and_normalize.assert_called_once_with("test")
+        google_client_mock.autocomplete_and_normalize.assert_called_once_with(
+            "test", "token123", deadline=ANY
+        )
+        osm_client_mock.search_and_normalize.assert_called_once_with("test", deadline=ANY)
 
         # Should return results from both
         assert len(results) == 2
+
+
+def _osm_place(place_id, name):
+    return NormalizedPlace(
+        id=f"osm:{place_id}",
+        provider=GeocodingProvider.OSM,
+        name=name,
+        display_address="",
+        latitude=31.8,
+        longitude=35.2,
+        raw_data={},
+    )
+
+
+def describe_matches_query():
+    @pytest.mark.parametrize(
+        ("query", "matches"),
+        [
+            ("jerusal", True),
+            ("jerusalem isr", True),
+            ("Israel  JERUS", True),
+            ("jerusalem x", False),
+            ("salem", False),
+        ],
+    )
+    def it_needs_each_query_word_to_start_a_name_word(query, matches):
+        assert matches_query(_osm_place(1, "Jerusalem, Israel"), query) is matches
+
+    def it_ignores_accents():
+        assert matches_query(_osm_place(1, "Zürich, Switzerland"), "zuri")
+
+
+def describe_prefix_reuse():
+    @pytest.fixture
+    def osm_client_mock(mocker):
+        return mocker.Mock()
+
+    @pytest.fixture
+    def merger(osm_client_mock):
+        return PlaceSearchMerger(None, osm_client_mock)
+
+    @pytest.fixture
+    def jerusalem_places():
+        return [
+            _osm_place(1, "Jerusalem, Israel"),
+            _osm_place(2, "Jericho, West Bank"),
+            _osm_place(3, "Jerusalem Street, Tel Aviv, Israel"),
+            _osm_place(4, "Old City, Jerusalem, Israel"),
+        ]
+
+    def it_filters_a_shorter_querys_results(merger, osm_client_mock, jerusalem_places):
+        osm_client_mock.search_and_normalize.return_value = jerusalem_places
+        merger.search("jer", session_token="")
+
+        results = merger.search("jerusal", session_token="")
+
+        osm_client_mock.search_and_normalize.assert_called_once_with("jer", deadline=ANY)
+        assert {place.id for place in results} == {"osm:1", "osm:3", "osm:4"}
+
+    def it_rescores_by_rank_among_the_matches(merger, osm_client_mock):
+        osm_client_mock.search_and_normalize.return_value = [
+            _osm_place(1, "Jericho"),
+            _osm_place(2, "Jerusalem"),
+            _osm_place(3, "Jerusalem"),
+            _osm_place(4, "Jerusalem"),
+        ]
+        merger.search("jer", session_token="")
+
+        results = merger.search("jerusalem", session_token="")
+
+        assert [place.id for place in results] == ["osm:2", "osm:3", "osm:4"]
+
+    def it_asks_the_provider_when_too_few_still_match(merger, osm_client_mock, jerusalem_places):
+        osm_client_mock.search_and_normalize.return_value = jerusalem_places
+        merger.search("jer", session_token="")
+
+        merger.search("jericho", session_token="")
+
+        assert osm_client_mock.search_and_normalize.call_count == 2
+        osm_client_mock.search_and_normalize.assert_called_with("jericho", deadline=ANY)
+
+    def it_ignores_prefixes_shorter_than_the_minimum(merger, osm_client_mock, jerusalem_places):
+        osm_client_mock.search_and_normalize.return_value = jerusalem_places
+        merger.search("je", session_token="")
+
+        merger.search("jerusalem", session_token="")
+
+        assert osm_client_mock.search_and_normalize.call_count == 2
+
+
+def describe_provider_calls():
+    @pytest.fixture
+    def google_client_mock(mocker):
+        mock = mocker.Mock()
+        mock.autocomplete_and_normalize.return_value = []
+        return mock
+
+    @pytest.fixture
+    def osm_client_mock(mocker):
+        mock = mocker.Mock()
+        mock.search_and_normalize.return_value = [_osm_place(1, "Jerusalem")]
+        return mock
+
+    @pytest.fixture
+    def merger(google_client_mock, osm_client_mock):
+        return PlaceSearchMerger(google_client_mock, osm_client_mock)
+
+    @pytest.fixture
+    def metrics(caplog, monkeypatch):
+        # Metrics don't propagate to the root logger caplog listens on
+        monkeypatch.setattr(logging.getLogger("eznashdb.metrics"), "propagate", True)
+        with caplog.at_level(logging.DEBUG, logger="eznashdb.metrics"):
+            yield caplog
+
+    def return_what_finished_by_the_deadline(merger, google_client_mock, monkeypatch, metrics):
+        monkeypatch.setattr(place_search, "SEARCH_TIMEOUT", 0.2)
+        release = threading.Event()
+        google_client_mock.autocomplete_and_normalize.side_effect = lambda *args, **kwargs: (
+            release.wait(5) and []
+        )
+
+        start = time.monotonic()
+        try:
+            results = merger.search("jerusalem", session_token="")
+        finally:
+            release.set()
+
+        assert time.monotonic() - start < 1
+        assert [place.id for place in results] == ["osm:1"]
+        assert "metric=place_search.provider_missed_deadline value=1 provider=google" in [
+            record.getMessage() for record in metrics.records if record.levelno == logging.INFO
+        ]
+
+    def are_given_the_search_deadline(merger, osm_client_mock):
+        before = time.monotonic()
+
+        merger.search("jerusalem", session_token="")
+
+        deadline = osm_client_mock.search_and_normalize.call_args.kwargs["deadline"]
+        timeout = place_search.SEARCH_TIMEOUT
+        assert before + timeout <= deadline <= time.monotonic() + timeout
+
+    def are_skipped_when_too_many_are_pending(merger, osm_client_mock, monkeypatch):
+        monkeypatch.setattr(place_search, "provider_executor", ProviderExecutor(1, max_pending=0))
+
+        assert merger.search("jerusalem", session_token="") == []
+        osm_client_mock.search_and_normalize.assert_not_called()
+
+    def record_their_latency_at_debug(merger, metrics):
+        merger.search("jerusalem", session_token="")
+
+        levels = {record.getMessage().split()[0]: record.levelno for record in metrics.records}
+        assert levels["metric=place_search.provider_latency_ms"] == logging.DEBUG
+        assert levels["metric=place_search.pending_calls"] == logging.DEBUG
+        assert any(
+            record.getMessage().startswith("metric=place_search.provider_latency_ms")
+            and "provider=osm outcome=ok" in record.getMessage()
+            for record in metrics.records
+        )
+
+    def record_skipped_calls_at_info(merger, metrics, monkeypatch):
+        monkeypatch.setattr(place_search, "provider_executor", ProviderExecutor(1, max_pending=0))
+
+        merger.search("jerusalem", session_token="")
+
+        assert [record.getMessage() for record in metrics.records if record.levelno == logging.INFO] == [
+            "metric=place_search.provider_skipped value=1 provider=google",
+            "metric=place_search.provider_skipped value=1 provider=osm",
+        ]
+
+
+def describe_provider_executor():
+    def refuses_calls_past_the_pending_limit():
+        executor = ProviderExecutor(1, max_pending=1)
+        release = threading.Event()
+
+        first = executor.submit(release.wait, 5)
+        assert executor.submit(lambda: None) is None
+
+        release.set()
+        first.result(timeout=5)
+        assert executor.submit(lambda: "ok").result(timeout=5) == "ok"
@@ -1,4 +1,5 @@
 import setBodyHeight from "../initializers/bodyHeight";
+import initializeShulNameAutocompletes from "../initializers/shulNameAutocomplete";
 import initializeTomSelects from "../initializers/tomSelect";
 import initializeTooltips from "../initializers/tooltips";
 import Alpine from "alpinejs";
@@ -35,10 +36,15 @@ window.htmx = htmx;
     setBodyHeight,
     initializeTooltips,
     initializeTomSelects,
+    initializeShulNameAutocompletes,
     initializeAlpine,
   ]);
   onDocumentEvent("formset-initialized", [initializeTomSelects]);
-  onDOMChange([initializeTomSelects, initializeTooltips]);
+  onDOMChange([
+    initializeTomSelects,
+    initializeTooltips,
+    initializeShulNameAutocompletes,
+  ]);
   onDocumentEvent("htmx:afterSettle", [initializeTomSelects]);
   window.addEventListener("resize", setBodyHeight);
 })();
@@ -0,0 +1,82 @@
+// Suggests existing shuls by name as you type. Inputs opt in with
+// data-shul-name-autocomplete="<suggest url>" and data-item-url, a link
+// template with __id__, __lat__ and __lon__ placeholders for each result.
+// An optional data-autocomplete-heading is shown above the results.
+export default function initializeShulNameAutocompletes() {
+  document
+    .querySelectorAll("input[data-shul-name-autocomplete]")
+    .forEach((input) => {
+      if (input.dataset.autocompleteInitialized) return;
+      input.dataset.autocompleteInitialized = "true";
+      input.setAttribute("autocomplete", "off");
+
+      const menu = document.createElement("div");
+      menu.className = "dropdown-menu w-100";
+      input.parentElement.classList.add("position-relative");
+      input.insertAdjacentElement("afterend", menu);
+
+      let controller = null;
+
+      const hide = () => menu.classList.remove("show");
+
+      const itemUrl = ([id, lat, lon]) =>
+        input.dataset.itemUrl
+          .replace("__id__", encodeURIComponent(id))
+          .replace("__lat__", encodeURIComponent(lat))
+          .replace("__lon__", encodeURIComponent(lon));
+
+      const render = (results) => {
+        menu.replaceChildren();
+        if (!results.length) return hide();
+
+        if (input.dataset.autocompleteHeading) {
+          const heading = document.createElement("h6");
+          heading.className = "dropdown-header text-wrap";
+          heading.textContent = input.dataset.autocompleteHeading;
+          menu.append(heading);
+        }
+        results.forEach((row) => {
+          const [, , , , name, city] = row;
+          const item = document.createElement("a");
+          item.className = "dropdown-item text-wrap";
+          item.href = itemUrl(row);
+          item.textContent = name;
+          if (city) {
+            const cityEl = document.createElement("span");
+            cityEl.className = "text-muted small ms-2";
+            cityEl.textContent = city;
+            item.append(cityEl);
+          }
+          menu.append(item);
+        });
+        menu.classList.add("show");
+      };
+
+      input.addEventListener("input", () => {
+        // Lookups are answered from memory, so no debounce - just drop stale ones
+        controller?.abort();
+        const query = input.value.trim();
+        if (!query) return render([]);
+
+        controller = new AbortController();
+        const params = new URLSearchParams({ q: query });
+        fetch(`${input.dataset.shulNameAutocomplete}?${params}`, {
+          signal: controller.signal,
+        })
+          .then((response) => (response.ok ? response.json() : { results: [] }))
+          .then((data) => render(data.results))
+          .catch((error) => {
+            if (error.name !== "AbortError") hide();
+          });
+      });
+
+      input.addEventListener("keydown", (event) => {
+        if (event.key === "Escape") hide();
+      });
+      // Delay so a click on a suggestion lands before the menu closes
+      input.addEventListener("blur", () => setTimeout(hide, 150));
+      input.addEventListener("focus", () => {
+        if (menu.children.length) menu.classList.add("show");
+      });
+    });
+}
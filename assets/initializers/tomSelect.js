@@ -8,10 +8,18 @@ export default function initializeTomSelects() {
     const isSearchable = el.dataset.searchable === "true";
     const expandOnFocus = el.dataset.expandOnFocus === "true";
 
+    const getOptionHtml = (data, escape) =>
+      data.html ?? data.$option?.innerHTML ?? escape(data.text ?? "");
+
     const renderUnescapedContent = (data, escape) => {
-      const html =
-        data.html ?? data.$option?.innerHTML ?? escape(data.text ?? "");
-      return `<div>${html}</div>`;
+      return `<div>${getOptionHtml(data, escape)}</div>`;
+    };
+
+    // Options may carry a result count (e.g. the shul filters' facet counts)
+    const renderOptionWithCount = (data, escape) => {
+      if (data.count === undefined) return renderUnescapedContent(data, escape);
+      const count = `<span class="text-muted small">(${escape(String(data.count))})</span>`;
+      return `<div>${getOptionHtml(data, escape)} ${count}</div>`;
     };
 
     // Show "X items selected" when collapsed, individual items when expanded
@@ -53,7 +61,7 @@ export default function initializeTomSelects() {
       dropdownParent: "body",
       highlight: false,
       render: {
-        option: renderUnescapedContent,
+        option: renderOptionWithCount,
         item: renderUnescapedContent,
       },
       onInitialize: function () {
@@ -4,11 +4,19 @@ import pytest
 from allauth.socialaccount.models import SocialApp
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sites.models import Site
+from django.core.cache import caches
 from django.core.handlers.wsgi import WSGIRequest
 from django.urls import resolve, reverse
 
 from eznashdb.constants import DEFAULT_ARG
+from eznashdb.facet_index import shul_facet_index
+from eznashdb.fragment_cache import CACHE_ALIAS as MAP_FRAGMENT_CACHE_ALIAS
+from eznashdb.fragment_cache import checked_data_version
+from eznashdb.geocoding_cache import CACHE_ALIAS as GEOCODING_CACHE_ALIAS
+from eznashdb.geocoding_cache import geocoding_cache
+from eznashdb.marker_bundle import bundle_rebuilder, current_bundle
 from eznashdb.models import Shul
+from eznashdb.name_index import shul_name_index
 
 
 @pytest.fixture(autouse=True)
@@ -21,6 +29,42 @@ def _enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def _reset_shul_indexes():
+    # Test transactions roll back without sending signals, so start each test fresh
+    shul_facet_index.clear()
+    shul_name_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_marker_bundle(settings, tmp_path, mocker):
+    settings.SHUL_MARKER_BUNDLE_ROOT = tmp_path / "marker_bundles"
+    current_bundle.clear()
+    bundle_rebuilder.clear()
+    # A rebuild thread couldn't see the test's transaction - tests that want
+    # a scheduled rebuild run it from this mock, on the test's connection
+    mocker.patch("eznashdb.marker_bundle._start_timer")
+    mocker.patch("eznashdb.marker_bundle.close_old_connections")
+
+
+@pytest.fixture(autouse=True)
+def _clear_map_fragment_cache():
+    caches[MAP_FRAGMENT_CACHE_ALIAS].clear()
+    checked_data_version.clear()
+
+
+@pytest.fixture
+def _data_version_checked():
+    """For query counts: the data version is checked per interval, not per request."""
+    checked_data_version.get()
+
+
+@pytest.fixture(autouse=True)
+def _clear_geocoding_cache(db):
+    geocoding_cache.clear()
+    caches[GEOCODING_CACHE_ALIAS].clear()
+
+
 @pytest.fixture(autouse=True)
 def _mock_brevo(mocker):
     mocker.patch("app.brevo._post", return_value=None)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EznashdbConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "eznashdb"
+
+    def ready(self):
+        import eznashdb.signals  # noqa: F401
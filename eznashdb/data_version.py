@@ -0,0 +1,41 @@
+"""Version stamps for shul map data, used to validate cached map responses."""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import quote_etag
+
+from eznashdb.models import Room, Shul
+
+
+def get_data_version() -> str:
+    """
+    A stamp that changes whenever a shul or room is created, updated, soft
+    deleted, restored or hard deleted. Rooms are hard deleted, so row counts
+    are included - a delete leaves no timestamp behind.
+    """
+    shuls = Shul.all_objects.aggregate(
+        updated=Max("updated_at"), deleted=Max("deleted"), count=Count("pk")
+    )
+    rooms = Room.objects.aggregate(updated=Max("updated_at"), count=Count("pk"))
+    return "|".join(
+        str(value)
+        for value in (
+            shuls["updated"],
+            shuls["deleted"],
+            shuls["count"],
+            rooms["updated"],
+            rooms["count"],
+        )
+    )
+
+
+def make_etag(version: str, params) -> str:
+    """ETag for a response built from ``version`` data and the given QueryDict params."""
+    return quote_etag(hashlib.md5(f"{version}:{params_digest(params)}".encode()).hexdigest())
+
+
+def params_digest(params) -> str:
+    """Digest of a QueryDict's params, ignoring param and value order."""
+    normalized = sorted((key, sorted(values)) for key, values in params.lists())
+    return hashlib.md5(str(normalized).encode()).hexdigest()
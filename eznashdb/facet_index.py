@@ -0,0 +1,169 @@
+"""
+Process-local facet index answering ShulFilterSet's choice filters.
+
+Each facet value maps to a bitmap (a Python int, one bit per shul id) of the
+live shuls having that value, so filter combinations are a few bitwise
+AND/ORs instead of a rooms join + DISTINCT in Postgres.
+
+Kept current incrementally: model signals (see eznashdb.signals) mark the
+affected shuls dirty and they're re-read on the next lookup. Writes from
+other processes are caught by periodically comparing the data version.
+Note that ``QuerySet.update()`` sends no signals, so it bypasses the index
+until that next version check.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from eznashdb.data_version import get_data_version
+from eznashdb.models import Room, Shul
+
+SHUL_FACETS = {"kaddish_policy": "kaddish_policy"}
+# A shul matches a rooms facet value if any of its rooms has it. Shuls without
+# rooms match the blank value, mirroring ShulFilterSet's rooms__isnull case.
+ROOM_FACETS = {
+    "rooms__relative_size": "relative_size",
+    "rooms__see_hear_score": "see_hear_score",
+}
+FACETS = (*SHUL_FACETS, *ROOM_FACETS)
+
+# Seconds between data version checks for writes made by other processes
+RECHECK_INTERVAL = 60
+
+
+class ShulFacetIndex:
+    def __init__(self):
+        # Guards the bitmaps - held only for in-memory work, never for queries
+        self._lock = threading.RLock()
+        # Serializes reloads, so two threads don't apply the same shul's rows out of order
+        self._refresh_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            # facet -> value -> bitmap of shul ids
+            self._bitmaps = defaultdict(lambda: defaultdict(int))
+            # shul id -> facet -> values, to unset a shul's bits when it changes
+            self._shul_values = {}
+            self._dirty_ids = set()
+            self._version = None
+            self._checked_at = 0.0
+
+    def mark_dirty(self, shul_id):
+        with self._lock:
+            self._dirty_ids.add(shul_id)
+
+    def match(self, selections: dict[str, list[str]]) -> list[int]:
+        """Ids of live shuls matching every facet selection (any of its values)."""
+        self._ensure_current()
+        with self._lock:
+            result = None
+            for facet, values in selections.items():
+                facet_bitmaps = self._bitmaps[facet]
+                bitmap = 0
+                for value in values:
+                    bitmap |= facet_bitmaps.get(value, 0)
+                result = bitmap if result is None else result & bitmap
+        return _bitmap_ids(result or 0)
+
+    def _is_current(self, now) -> bool:
+        with self._lock:
+            return (
+                self._version is not None
+                and now - self._checked_at < RECHECK_INTERVAL
+                and not self._dirty_ids
+            )
+
+    def _ensure_current(self):
+        if self._is_current(time.monotonic()):
+            return
+
+        with self._refresh_lock:
+            now = time.monotonic()
+            with self._lock:
+                check_version = self._version is None or now - self._checked_at >= RECHECK_INTERVAL
+                # Shuls marked while the rows are read stay dirty for the next lookup
+                dirty_ids, self._dirty_ids = self._dirty_ids, set()
+
+            if check_version:
+                version = get_data_version()
+                if version != self._version:
+                    self._rebuild(_load_facet_values(Shul.objects.all()))
+                    self._version = version
+                    # The full reload covers them
+                    dirty_ids = set()
+                self._checked_at = now
+
+            if dirty_ids:
+                # Soft deleted shuls drop out here, as Shul.objects excludes them
+                self._refresh(dirty_ids, _load_facet_values(Shul.objects.filter(pk__in=dirty_ids)))
+
+    def _rebuild(self, loaded):
+        with self._lock:
+            self._bitmaps.clear()
+            self._shul_values.clear()
+            self._refresh((), loaded)
+
+    def _refresh(self, shul_ids, loaded):
+        """
+        Replace the values of ``shul_ids`` with ``loaded`` (shul id -> facet
+        values). Each affected bitmap is changed once, by a mask of all its
+        shuls - OR-ing big ints in a bit at a time would be quadratic.
+        """
+        removed = defaultdict(list)
+        added = defaultdict(list)
+        with self._lock:
+            for shul_id in shul_ids:
+                for facet, facet_values in self._shul_values.pop(shul_id, {}).items():
+                    for value in facet_values:
+                        removed[facet, value].append(shul_id)
+            for shul_id, values in loaded.items():
+                self._shul_values[shul_id] = values
+                for facet, facet_values in values.items():
+                    for value in facet_values:
+                        added[facet, value].append(shul_id)
+
+            for (facet, value), ids in removed.items():
+                self._bitmaps[facet][value] &= ~_bitmap_of(ids)
+            for (facet, value), ids in added.items():
+                self._bitmaps[facet][value] |= _bitmap_of(ids)
+
+
+def _load_facet_values(shuls) -> dict[int, dict[str, set[str]]]:
+    """Facet values of the given shuls, read in two queries."""
+    values = {
+        shul_id: {facet: {shul_values[i]} for i, facet in enumerate(SHUL_FACETS)}
+        for shul_id, *shul_values in shuls.values_list("pk", *SHUL_FACETS.values())
+    }
+    room_rows = Room.objects.filter(shul__in=shuls).values_list("shul_id", *ROOM_FACETS.values())
+    rooms_values = defaultdict(lambda: {facet: set() for facet in ROOM_FACETS})
+    for shul_id, *room_values in room_rows:
+        for facet, value in zip(ROOM_FACETS, room_values, strict=True):
+            rooms_values[shul_id][facet].add(value)
+
+    for shul_id, shul_facet_values in values.items():
+        if shul_id in rooms_values:
+            shul_facet_values.update(rooms_values[shul_id])
+        else:
+            shul_facet_values.update({facet: {""} for facet in ROOM_FACETS})
+    return values
+
+
+def _bitmap_of(ids) -> int:
+    """A bitmap with the bits of ``ids`` set, built in one pass."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _bitmap_ids(bitmap: int) -> list[int]:
+    # One pass over the binary string - cheaper than peeling bits off a big int
+    return [i for i, bit in enumerate(reversed(bin(bitmap)[2:])) if bit == "1"]
+
+
+shul_facet_index = ShulFacetIndex()
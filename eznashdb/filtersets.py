@@ -1,11 +1,36 @@
-from django.db.models import Prefetch, Q
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db.models import BooleanField, Count, Exists, F, Func, OuterRef, Prefetch, Q, Value
 from django_filters import FilterSet
 
 from eznashdb.constants import FieldsOptions
 from eznashdb.enums import KaddishPolicy, RelativeSize, SeeHearScore
+from eznashdb.facet_index import FACETS, shul_facet_index
 from eznashdb.filters import MultiSelectModelFieldFilter
 from eznashdb.models import Room, Shul
 
+# Columns a map marker is drawn from: the shul id and its stored display
+# coords/cluster. Select these for markers rather than loading full shuls.
+MARKER_FIELDS = ("pk", "display_lat", "display_lon", "cluster_key")
+
+
+def any_of_ids(ids) -> Func:
+    """
+    A condition for shuls with these ids: ``id = ANY(%s::bigint[])`` with the
+    ids as a single parameter. Unlike ``pk__in``, the SQL doesn't grow by a
+    placeholder per id, so thousands of matches are as cheap to plan as one.
+    """
+    ids_literal = "{" + ",".join(map(str, ids)) + "}"
+    return Func(
+        F("pk"),
+        Value(ids_literal),
+        arg_joiner=" = ANY(",
+        template="%(expressions)s::bigint[])",
+        output_field=BooleanField(),
+    )
+
 
 class ShulFilterSet(FilterSet):
     kaddish_policy = MultiSelectModelFieldFilter(
@@ -26,6 +51,14 @@ class ShulFilterSet(FilterSet):
         method="filter_rooms__see_hear_score",
     )
 
+    def __init__(self, *args, prefetch_rooms=True, **kwargs):
+        """
+        ``prefetch_rooms=False`` leaves the rooms prefetch off ``qs``, for
+        callers that only project MARKER_FIELDS or count the results.
+        """
+        super().__init__(*args, **kwargs)
+        self.prefetch_rooms = prefetch_rooms
+
     def filter_rooms__relative_size(self, qs, name, value):
         query = Q(rooms__relative_size__in=value)
         if "" in value:
@@ -40,9 +73,80 @@ class ShulFilterSet(FilterSet):
         qs = qs.filter(query).distinct()
         return qs
 
+    def filter_queryset(self, queryset):
+        if not settings.SHUL_FACET_INDEX_ENABLED:
+            return super().filter_queryset(queryset)
+
+        # Facet filters are answered in memory, anything else falls through
+        # to its regular filter method
+        selections = {}
+        for name, value in self.form.cleaned_data.items():
+            if name in FACETS and value:
+                selections[name] = value
+            elif name not in FACETS:
+                queryset = self.filters[name].filter(queryset, value)
+        if selections:
+            queryset = queryset.filter(any_of_ids(shul_facet_index.match(selections)))
+        return queryset
+
+    def get_facet_counts(self) -> dict | None:
+        """
+        The number of matching shuls, plus for each filter option how many
+        shuls selecting it would yield given the other filters' selections,
+        all in one conditional aggregate query. None if the filters are invalid.
+
+        Returns ``{"total": int, "options": {filter_name: {value: count}}}``.
+        """
+        if self.is_bound and not self.is_valid():
+            return None
+        cleaned_data = self.form.cleaned_data if self.is_bound else {}
+        conditions = {
+            name: self._get_selection_q(name, values) for name, values in cleaned_data.items() if values
+        }
+
+        aggregates = {"total": self._count_where(conditions.values())}
+        option_keys = {}
+        for i, (name, filter_) in enumerate(self.filters.items()):
+            other_conditions = [q for other, q in conditions.items() if other != name]
+            for j, (value, _label) in enumerate(filter_.extra["choices"]):
+                key = f"option_{i}_{j}"
+                option_keys[key] = (name, value)
+                option_q = self._get_selection_q(name, [value])
+                aggregates[key] = self._count_where([*other_conditions, option_q])
+
+        counts = self.queryset.aggregate(**aggregates)
+        options = {name: {} for name in self.filters}
+        for key, (name, value) in option_keys.items():
+            options[name][value] = counts[key]
+        return {"total": counts["total"], "options": options}
+
+    def _get_selection_q(self, name, values) -> Q:
+        """
+        Shuls matching any of a filter's values, as a condition on the shul row
+        itself - rooms are tested with EXISTS so nothing is joined or duplicated.
+        """
+        model_field = self.filters[name].model_field
+        if not model_field.startswith("rooms__"):
+            return Q(**{f"{model_field}__in": values})
+
+        room_field = model_field.removeprefix("rooms__")
+        rooms = Room.objects.filter(shul=OuterRef("pk"))
+        query = Q(Exists(rooms.filter(**{f"{room_field}__in": values})))
+        if "" in values:
+            query |= ~Q(Exists(rooms))
+        return query
+
+    @staticmethod
+    def _count_where(conditions) -> Count:
+        conditions = list(conditions)
+        return Count("pk", filter=reduce(and_, conditions) if conditions else None)
+
     @property
     def qs(self):
-        return super().qs.prefetch_related(Prefetch("rooms", queryset=Room.objects.all().order_by("pk")))
+        qs = super().qs
+        if self.prefetch_rooms:
+            qs = qs.prefetch_related(Prefetch("rooms", queryset=Room.objects.all().order_by("pk")))
+        return qs
 
     class Meta:
         model = Shul
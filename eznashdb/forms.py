@@ -3,6 +3,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.forms import HiddenInput, ModelForm, TextInput, inlineformset_factory
 from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
 
 from eznashdb.constants import FieldsOptions
 from eznashdb.enums import KaddishPolicy, RelativeSize, SeeHearScore
@@ -42,6 +43,15 @@ class ShulForm(ModelForm):
         helper.form_tag = False
         self.fields["address"].required = True
         self.fields["kaddish_policy"].choices = KaddishPolicy.get_display_choices(include_blank=True)
+        if not self.instance.pk:
+            # Point out shuls that are already listed before a duplicate is added
+            self.fields["name"].widget.attrs.update(
+                {
+                    "data-shul-name-autocomplete": reverse("eznashdb:shul_name_suggest"),
+                    "data-item-url": reverse("eznashdb:update_shul", args=["__id__"]),
+                    "data-autocomplete-heading": "Already listed? Edit it instead:",
+                }
+            )
 
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,108 @@
+"""
+Cache of rendered map fragments (the shuls page's map_updates partial).
+
+Fragments are keyed by their request params and a data version kept in the
+same cache. Model signals (see eznashdb.signals) bump that version on every
+shul or room change, orphaning all cached fragments at once, so a hit needs
+no database query. ``QuerySet.update()`` sends no signals - call
+``bump_fragment_version()`` after using it on shuls or rooms.
+
+Writes no signal reports here - from other processes, ``QuerySet.update()``,
+the shell or a database restore - are caught by also keying fragments by
+the data version (see eznashdb.data_version), rechecked every
+RECHECK_INTERVAL seconds. A bulk update must set ``updated_at`` to show up.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+
+from eznashdb.data_version import get_data_version, params_digest
+
+CACHE_ALIAS = "map_fragments"
+VERSION_KEY = "shul_data_version"
+
+# Seconds between data version checks for writes that sent no signal here
+RECHECK_INTERVAL = 60
+
+
+def get_fragment_version(version_key=VERSION_KEY) -> int:
+    """
+    The current version for ``version_key`` - the global shul data version
+    by default, or a narrower one such as a map tile's (see eznashdb.map_tiles).
+    """
+    cache = caches[CACHE_ALIAS]
+    version = cache.get(version_key)
+    if version is None:
+        # Evicted or a fresh cache: start past any version used before, so
+        # fragments cached under an older one can't be served again
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_fragment_version(version_key=VERSION_KEY):
+    cache = caches[CACHE_ALIAS]
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, time.time_ns(), timeout=None)
+
+
+class CheckedDataVersion:
+    """A digest of the data version as of the last check, kept in memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    def get(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < RECHECK_INTERVAL:
+                return self._version
+
+        version = hashlib.md5(get_data_version().encode()).hexdigest()
+        with self._lock:
+            self._version, self._checked_at = version, now
+        return version
+
+
+checked_data_version = CheckedDataVersion()
+
+
+def get_fragment_stamp(version_key=VERSION_KEY) -> str:
+    """
+    What fragments under ``version_key`` are valid for: its version, plus
+    the data version as of the last check. Also used as an ETag version.
+    """
+    return f"{get_fragment_version(version_key)}.{checked_data_version.get()}"
+
+
+def make_fragment_key(name, params, version_key=VERSION_KEY) -> str:
+    """
+    Key for the ``name`` fragment rendered for the given QueryDict params,
+    under the current ``version_key`` stamp. Make it before rendering, so a
+    change mid-render orphans the result.
+    """
+    return f"{name}:{get_fragment_stamp(version_key)}:{params_digest(params)}"
+
+
+def get_fragment(key) -> bytes | None:
+    return caches[CACHE_ALIAS].get(key)
+
+
+def get_fragments(keys) -> dict[str, bytes]:
+    """The cached fragments among ``keys``, in one cache round trip."""
+    return caches[CACHE_ALIAS].get_many(keys)
+
+
+def set_fragment(key, content: bytes):
+    caches[CACHE_ALIAS].set(key, content)
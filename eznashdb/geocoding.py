@@ -1,5 +1,6 @@
 """Geocoding client classes for Google Places and OpenStreetMap."""
 
+import time
 import urllib.parse
 from datetime import date
 from json.decoder import JSONDecodeError
@@ -10,21 +11,42 @@ from django.conf import settings
 from django.db.models import F
 from waffle import flag_is_active
 
+from app import http_client
 from app.models import GooglePlacesUsage, GooglePlacesUserUsage
 from eznashdb.enums import GeocodingProvider
 from eznashdb.place_search import NormalizedPlace
 
+# Seconds to wait for a provider's response - PlaceSearchMerger gives up after 5
+READ_TIMEOUT = 5
+
+
+def get_read_timeout(deadline: float | None = None) -> float:
+    """
+    READ_TIMEOUT, cut short by a caller's ``time.monotonic()`` deadline.
+    Raises requests.Timeout if the deadline has already passed.
+    """
+    if deadline is None:
+        return READ_TIMEOUT
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout("Deadline passed before the request was sent")
+    return min(READ_TIMEOUT, remaining)
+
 
 class GooglePlacesClient:
     """Handles Google Places API calls."""
 
     def __init__(self, api_key: str):
         self.api_key = api_key
+        # Billable autocomplete calls made - cached lookups don't call it. Counted
+        # when sent, as Google bills calls that time out on our end too
+        self.autocomplete_requests = 0
 
-    def autocomplete(self, query: str, session_token: str) -> list[dict]:
+    def autocomplete(self, query: str, session_token: str, deadline: float | None = None) -> list[dict]:
         """
         Get autocomplete suggestions from Google Places API.
         Returns list of suggestions without coordinates, or empty list on failure.
+        Gives up at ``deadline`` (a ``time.monotonic()`` value), if given.
         """
         url = "https://places.googleapis.com/v1/places:autocomplete"
         headers = {
@@ -36,7 +58,9 @@ class GooglePlacesClient:
             "sessionToken": session_token,
         }
 
-        response = requests.post(url, json=payload, headers=headers)
+        timeout = get_read_timeout(deadline)
+        self.autocomplete_requests += 1
+        response = http_client.post(url, json=payload, headers=headers, timeout=timeout)
 
         if response.status_code != 200:
             sentry_sdk.capture_message(
@@ -82,7 +106,10 @@ class GooglePlacesClient:
         if session_token:
             headers["X-Goog-Session-Token"] = session_token
 
-        response = requests.get(url, headers=headers)
+        try:
+            response = http_client.get(url, headers=headers, timeout=READ_TIMEOUT)
+        except requests.RequestException:
+            return None
 
         if response.status_code != 200:
             return None
@@ -98,12 +125,14 @@ class GooglePlacesClient:
             "source": GeocodingProvider.GOOGLE,
         }
 
-    def autocomplete_and_normalize(self, query: str, session_token: str) -> list[NormalizedPlace]:
+    def autocomplete_and_normalize(
+        self, query: str, session_token: str, deadline: float | None = None
+    ) -> list[NormalizedPlace]:
         """
         Get autocomplete suggestions and normalize to NormalizedPlace format.
         Returns list of NormalizedPlace objects.
         """
-        results = self.autocomplete(query, session_token)
+        results = self.autocomplete(query, session_token, deadline)
 
         normalized = []
         for result in results:
@@ -133,10 +162,11 @@ class OSMClient:
         self.base_url = base_url
         self.api_key = api_key
 
-    def search(self, query: str) -> list[dict]:
+    def search(self, query: str, deadline: float | None = None) -> list[dict]:
         """
         Search for locations using Nominatim API.
         Returns list of results with coordinates, or empty list on failure.
+        Gives up at ``deadline`` (a ``time.monotonic()`` value), if given.
         """
         params = {
             "format": "json",
@@ -149,9 +179,10 @@ class OSMClient:
             params["api_key"] = self.api_key
 
         url = self.base_url + "?" + urllib.parse.urlencode(params)
+        timeout = get_read_timeout(deadline)
 
         try:
-            response = requests.get(url)
+            response = http_client.get(url, timeout=timeout)
 
             # Validate response is a list
             data = response.json()
@@ -171,12 +202,12 @@ class OSMClient:
             )
             return []
 
-    def search_and_format_results(self, query: str) -> list[dict]:
+    def search_and_format_results(self, query: str, deadline: float | None = None) -> list[dict]:
         """
         Search for locations and return formatted results.
         Returns list of formatted results with standardized fields.
         """
-        return self._format_results(self.search(query))
+        return self._format_results(self.search(query, deadline))
 
     def _format_results(self, results: list[dict]) -> list[dict]:
         """Format OSM results to standardized structure."""
@@ -193,12 +224,12 @@ class OSMClient:
 
         return results
 
-    def search_and_normalize(self, query: str) -> list[NormalizedPlace]:
+    def search_and_normalize(self, query: str, deadline: float | None = None) -> list[NormalizedPlace]:
         """
         Search and normalize to NormalizedPlace format.
         Returns list of NormalizedPlace objects.
         """
-        results = self.search_and_format_results(query)
+        results = self.search_and_format_results(query, deadline)
 
         normalized = []
         for result in results:
@@ -0,0 +1,123 @@
+"""
+Cache of geocoding search results (lists of NormalizedPlace), so a query
+someone typed recently is answered without the provider's network round
+trip - or, for Google, its billable quota. Used by PlaceSearchMerger.
+
+Results are kept per provider and normalized query in two tiers: a small
+process-local LRU in front of the "geocoding" cache shared by all
+processes. Each provider has its own timeout, from
+settings.GEOCODING_CACHE_TIMEOUTS.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from eznashdb.enums import GeocodingProvider
+
+CACHE_ALIAS = "geocoding"
+LOCAL_MAX_ENTRIES = 1000
+# Local entries may outlive the shared entry they were read from by at most this
+LOCAL_TIMEOUT = 10 * 60
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class GeocodingCache:
+    def __init__(self, max_entries: int = LOCAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Empty the local tier. The shared tier is left to expire."""
+        with self._lock:
+            # key -> (expires at, places), least recently used first
+            self._local = OrderedDict()
+
+    def get(self, provider: GeocodingProvider, query: str) -> list | None:
+        key = _make_key(provider, query)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                expires_at, places = entry
+                if expires_at > time.monotonic():
+                    self._local.move_to_end(key)
+                    return list(places)
+                del self._local[key]
+
+        places = caches[CACHE_ALIAS].get(key)
+        if places is not None:
+            self._set_local(key, provider, places)
+            return list(places)
+        return None
+
+    def get_longest_prefix(
+        self, provider: GeocodingProvider, query: str, min_length: int
+    ) -> list | None:
+        """
+        Results cached for the longest prefix of ``query`` shorter than it
+        but at least ``min_length`` characters, in at most one shared cache
+        round trip.
+        """
+        query = normalize_query(query)
+        prefixes = sorted(
+            {query[:length].rstrip() for length in range(min_length, len(query))} - {query},
+            key=len,
+            reverse=True,
+        )
+        keys = [_make_key(provider, prefix) for prefix in prefixes if len(prefix) >= min_length]
+
+        # Only prefixes longer than the longest one cached locally need the shared tier
+        local_hit = None
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._local.get(key)
+                if entry is not None and entry[0] > now:
+                    self._local.move_to_end(key)
+                    local_hit = entry[1]
+                    keys = keys[:i]
+                    break
+
+        shared = caches[CACHE_ALIAS].get_many(keys) if keys else {}
+        for key in keys:
+            if key in shared:
+                self._set_local(key, provider, shared[key])
+                return list(shared[key])
+        return list(local_hit) if local_hit is not None else None
+
+    def set(self, provider: GeocodingProvider, query: str, places: list):
+        # An empty list may be a provider failure, so it isn't worth keeping
+        if not places:
+            return
+        key = _make_key(provider, query)
+        places = tuple(places)
+        caches[CACHE_ALIAS].set(key, places, timeout=_get_timeout(provider))
+        self._set_local(key, provider, places)
+
+    def _set_local(self, key, provider, places):
+        expires_at = time.monotonic() + min(_get_timeout(provider), LOCAL_TIMEOUT)
+        with self._lock:
+            self._local[key] = (expires_at, places)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+
+def _make_key(provider: GeocodingProvider, query: str) -> str:
+    digest = hashlib.md5(normalize_query(query).encode()).hexdigest()
+    return f"{provider.value}:{digest}"
+
+
+def _get_timeout(provider: GeocodingProvider) -> int:
+    return settings.GEOCODING_CACHE_TIMEOUTS[provider.value]
+
+
+geocoding_cache = GeocodingCache()
@@ -0,0 +1,20 @@
+"""Management command to build the unfiltered map's marker bundle."""
+
+from django.core.management.base import BaseCommand
+
+from eznashdb.marker_bundle import build_marker_bundle
+
+
+class Command(BaseCommand):
+    """Write the precomputed marker file served for the unfiltered map."""
+
+    help = "Build the unfiltered map's marker bundle (see eznashdb.marker_bundle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Rebuild even if shul data hasn't changed"
+        )
+
+    def handle(self, *args, **options):
+        name = build_marker_bundle(force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Marker bundle: {name}"))
@@ -0,0 +1,86 @@
+"""Map viewport parsing for viewport-bounded marker queries."""
+
+import math
+from dataclasses import dataclass
+
+from django.db.models import Q
+
+# Markers are loaded this far past each edge of the viewport (as a fraction of
+# its span) so small pans don't immediately need another fetch.
+VIEWPORT_MARGIN = 0.5
+
+# At or below this zoom, markers are aggregated server-side into grid cells
+# (see ShulMarkersView) rather than shipped individually. Cells here are still
+# several times coarser than the 0.01 degree privacy rounding in
+# Shul.round_coord, so individual pins only appear once zoomed in past it.
+GRID_CLUSTER_MAX_ZOOM = 9
+
+# Grid cells span this many degrees at zoom 0, halving with each zoom level
+# (a 256px tile spans 360 degrees at zoom 0, so this is ~40px per cell).
+GRID_CELL_SIZE_AT_ZOOM_0 = 60
+
+
+@dataclass(frozen=True)
+class MapViewport:
+    """A map's visible bounding box (in degrees) and zoom level."""
+
+    west: float
+    south: float
+    east: float
+    north: float
+    zoom: int | None = None
+
+    @classmethod
+    def from_params(cls, params) -> "MapViewport | None":
+        """
+        Parse ``bbox=west,south,east,north`` (Leaflet's ``toBBoxString()``)
+        and an optional ``zoom`` from a QueryDict. Returns None when there is
+        no valid bbox, so callers fall back to an unbounded query.
+        """
+        try:
+            west, south, east, north = (float(value) for value in params["bbox"].split(","))
+        except (KeyError, ValueError):
+            return None
+        if not all(map(math.isfinite, (west, south, east, north))):
+            return None
+        if south > north or west > east:
+            return None
+
+        zoom = params.get("zoom", "")
+        zoom = int(zoom) if zoom.isdigit() else None
+        return cls(west, south, east, north, zoom)
+
+    @property
+    def is_grid_clustered(self) -> bool:
+        return self.zoom is not None and self.zoom <= GRID_CLUSTER_MAX_ZOOM
+
+    @property
+    def grid_cell_size(self) -> float:
+        return GRID_CELL_SIZE_AT_ZOOM_0 / 2 ** (self.zoom or 0)
+
+    def with_margin(self, margin: float = VIEWPORT_MARGIN) -> "MapViewport":
+        lat_pad = (self.north - self.south) * margin
+        lon_pad = (self.east - self.west) * margin
+        return MapViewport(
+            west=self.west - lon_pad,
+            south=max(self.south - lat_pad, -90),
+            east=self.east + lon_pad,
+            north=min(self.north + lat_pad, 90),
+            zoom=self.zoom,
+        )
+
+    def as_q(self, lat_field="display_lat", lon_field="display_lon") -> Q:
+        """
+        Filter for points inside the viewport. Leaflet bounds aren't wrapped to
+        [-180, 180] when the map is panned across the antimeridian, so the
+        longitude range is normalized and split in two where it crosses it.
+        """
+        q = Q(**{f"{lat_field}__gte": self.south, f"{lat_field}__lte": self.north})
+        if self.east - self.west >= 360:
+            return q
+
+        shift = math.floor((self.west + 180) / 360) * 360
+        west, east = self.west - shift, self.east - shift
+        if east <= 180:
+            return q & Q(**{f"{lon_field}__gte": west, f"{lon_field}__lte": east})
+        return q & (Q(**{f"{lon_field}__gte": west}) | Q(**{f"{lon_field}__lte": east - 360}))
@@ -0,0 +1,85 @@
+"""
+Web Mercator (XYZ) tiling for shul map markers, with per-tile cache versions.
+
+Tiles are the unit the browse page loads markers in (see ShulTileView): at
+grid cluster zooms a tile holds that zoom's grid clusters, and past them
+individual markers - which look the same at every zoom, so they're only
+tiled at MARKER_TILE_ZOOM.
+"""
+
+import math
+
+from django.db.models import Q
+
+from eznashdb.fragment_cache import bump_fragment_version, get_fragment_version
+from eznashdb.map_bounds import GRID_CLUSTER_MAX_ZOOM, MapViewport
+
+MARKER_TILE_ZOOM = GRID_CLUSTER_MAX_ZOOM + 1
+
+# Web Mercator's latitude limit - tiles in the top and bottom rows are
+# stretched to the poles so no shul falls outside every tile
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MARKER_TILE_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def tile_viewport(z: int, x: int, y: int) -> MapViewport:
+    """The area covered by a tile, in degrees."""
+    n = 2**z
+    return MapViewport(
+        west=x / n * 360 - 180,
+        south=-90 if y == n - 1 else _tile_lat(y + 1, n),
+        east=(x + 1) / n * 360 - 180,
+        north=90 if y == 0 else _tile_lat(y, n),
+        zoom=z,
+    )
+
+
+def tile_q(z: int, x: int, y: int, lat_field="display_lat", lon_field="display_lon") -> Q:
+    """
+    Filter for points in a tile, partitioning the world exactly as
+    tile_containing does - each point is in one tile per zoom, so a change
+    there invalidates every tile that could show it.
+    """
+    n = 2**z
+    viewport = tile_viewport(z, x, y)
+    q = Q(**{f"{lon_field}__gte": viewport.west, f"{lon_field}__lt": viewport.east})
+    # Longitudes wrap, so past +-180 counts as the far side
+    if x == 0:
+        q |= Q(**{f"{lon_field}__gte": 180})
+    if x == n - 1:
+        q |= Q(**{f"{lon_field}__lt": -180})
+    if y > 0:
+        q &= Q(**{f"{lat_field}__lte": viewport.north})
+    if y < n - 1:
+        q &= Q(**{f"{lat_field}__gt": viewport.south})
+    return q
+
+
+def _tile_lat(y, n) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+def tile_containing(lat: float, lon: float, z: int) -> tuple[int, int]:
+    n = 2**z
+    lat = max(-MAX_MERCATOR_LAT, min(lat, MAX_MERCATOR_LAT))
+    lat_rad = math.radians(lat)
+    x = math.floor((lon + 180) / 360 * n) % n
+    y = math.floor((1 - math.asinh(math.tan(lat_rad)) / math.pi) / 2 * n)
+    return x, min(max(y, 0), n - 1)
+
+
+def tile_version_key(z, x, y) -> str:
+    return f"tile_version:{z}/{x}/{y}"
+
+
+def get_tile_version(z: int, x: int, y: int) -> int:
+    return get_fragment_version(tile_version_key(z, x, y))
+
+
+def invalidate_tiles_at(lat: float, lon: float):
+    """Orphan the cached tiles, at every zoom, covering the given point."""
+    for z in range(MARKER_TILE_ZOOM + 1):
+        bump_fragment_version(tile_version_key(z, *tile_containing(lat, lon, z)))
@@ -0,0 +1,223 @@
+"""
+Precomputed marker file for the unfiltered map, which most visitors land on.
+
+``build_marker_bundle()`` writes every live shul's marker row to a
+content-hashed JSON file, with gzip (and brotli, if installed) copies, and
+points a manifest at it. The shuls page hands that URL to the client instead
+of tile URLs when no filters apply; as the name changes with the content,
+ShulMarkerBundleView can serve it with immutable cache headers.
+
+The ``build_marker_bundle`` command builds it on startup. After that, shul
+and room signals (see eznashdb.signals) schedule a rebuild on a background
+thread, a few seconds after commit so a burst of saves rebuilds once.
+
+Readers keep the manifest in memory, keyed on the data version they last
+checked. Like the facet index, they recheck it after a local change or
+every RECHECK_INTERVAL seconds. That catches writes from other processes
+and machines, whose bundle files these aren't. A bundle behind the data is
+never handed out. Until this process rebuilds its own, the map loads tiles.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from eznashdb.data_version import get_data_version
+from eznashdb.filtersets import MARKER_FIELDS
+from eznashdb.fragment_cache import bump_fragment_version
+from eznashdb.models import Shul
+
+try:
+    import brotli
+except ImportError:  # Optional, as for whitenoise
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+BUNDLE_NAME_RE = re.compile(r"^shul-markers\.[0-9a-f]{12}\.json$")
+# Older bundles are kept a while for pages that were rendered pointing at them
+KEEP_BUNDLES = 3
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# Seconds between data version checks for writes made by other processes
+RECHECK_INTERVAL = 60
+# Seconds a scheduled rebuild waits, collecting the changes made meanwhile
+REBUILD_DELAY = 5
+
+
+def _bundle_root() -> Path:
+    return Path(settings.SHUL_MARKER_BUNDLE_ROOT)
+
+
+def _read_manifest() -> dict:
+    try:
+        return json.loads((_bundle_root() / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+class CurrentBundle:
+    """The name of the bundle built from the current data, kept in memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._name = None
+            self._checked_at = 0.0
+
+    def mark_stale(self):
+        """Recheck the data version on the next lookup."""
+        with self._lock:
+            self._version = None
+
+    def get_name(self) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < RECHECK_INTERVAL:
+                return self._name
+
+        version = get_data_version()
+        manifest = _read_manifest()
+        name = manifest.get("name")
+        if manifest.get("version") != version or not get_bundle_path(name or ""):
+            # Built by no one yet, or before a change made in another process
+            schedule_rebuild()
+            return None
+
+        with self._lock:
+            self._version, self._name, self._checked_at = version, name, now
+        return name
+
+
+current_bundle = CurrentBundle()
+
+
+def get_bundle_name() -> str | None:
+    """The bundle built from the current data, or None if it hasn't been built."""
+    return current_bundle.get_name()
+
+
+def get_bundle_path(name: str, encoding: str | None = None) -> Path | None:
+    """Path of a bundle (or its ``encoding`` compressed copy), if it exists."""
+    if not BUNDLE_NAME_RE.match(name):
+        return None
+    path = _bundle_root() / (name + ENCODINGS.get(encoding, ""))
+    return path if path.is_file() else None
+
+
+def build_marker_bundle(force=False) -> str:
+    """
+    Write the bundle for the current shul data and return its name. Skipped
+    if the data hasn't changed since the current bundle was built.
+    """
+    version = get_data_version()
+    manifest = _read_manifest()
+    if not force and manifest.get("version") == version and get_bundle_path(manifest["name"]):
+        return manifest["name"]
+
+    # Sync point for marker deltas (see ShulMarkerDeltaView), taken before reading
+    since = timezone.now().isoformat()
+    rows = Shul.objects.order_by("pk").values_list(*MARKER_FIELDS)
+    content = json.dumps({"markers": list(rows), "since": since}, separators=(",", ":")).encode()
+    name = f"shul-markers.{hashlib.md5(content).hexdigest()[:12]}.json"
+
+    root = _bundle_root()
+    root.mkdir(parents=True, exist_ok=True)
+    _write_atomic(root / name, content)
+    _write_atomic(root / f"{name}.gz", gzip.compress(content))
+    if brotli:
+        _write_atomic(root / f"{name}.br", brotli.compress(content))
+    recent = [name, *(n for n in manifest.get("recent", []) if n != name)][:KEEP_BUNDLES]
+    manifest = {"name": name, "version": version, "recent": recent}
+    _write_atomic(root / MANIFEST_NAME, json.dumps(manifest).encode())
+
+    _remove_old_bundles(root, keep=recent)
+    return name
+
+
+class BundleRebuilder:
+    """Rebuilds the bundle on a background thread, once per burst of changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._scheduled = False
+
+    def schedule(self):
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        _start_timer(REBUILD_DELAY, self._run)
+
+    def _run(self):
+        with self._lock:
+            # Changes from here on need a rebuild of their own
+            self._scheduled = False
+        try:
+            build_marker_bundle()
+            current_bundle.mark_stale()
+            # Cached map_updates partials link the bundle by name
+            bump_fragment_version()
+        except Exception as e:
+            # Readers fall back to tiles, and schedule another attempt
+            logger.warning(f"Marker bundle rebuild failed: {e}")
+        finally:
+            # This thread's connection isn't closed by any request
+            close_old_connections()
+
+
+bundle_rebuilder = BundleRebuilder()
+
+
+def schedule_rebuild():
+    bundle_rebuilder.schedule()
+
+
+def data_changed():
+    """
+    For shul and room signals, after commit: readers recheck the data
+    version, and a rebuild is scheduled.
+    """
+    current_bundle.mark_stale()
+    schedule_rebuild()
+
+
+def _start_timer(delay: float, function):
+    timer = threading.Timer(delay, function)
+    timer.daemon = True
+    timer.start()
+
+
+def _write_atomic(path: Path, content: bytes):
+    # Readers never see a half-written file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_old_bundles(root: Path, keep: list[str]):
+    for path in root.iterdir():
+        name = path.name.removesuffix(".br").removesuffix(".gz")
+        if BUNDLE_NAME_RE.match(name) and name not in keep:
+            path.unlink(missing_ok=True)
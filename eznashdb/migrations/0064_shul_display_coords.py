@@ -0,0 +1,60 @@
+# Generated by Django 4.2.18
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def _jitter(rounded_lat, rounded_lon, coord_type):
+    hash_input = f"{rounded_lat}_{rounded_lon}_{coord_type}".encode()
+    hash_value = int(hashlib.md5(hash_input).hexdigest(), 16)
+    return ((hash_value % 6000) - 3000) / 1000000
+
+
+def backfill_display_coords(apps, schema_editor):
+    # Frozen copy of Shul.get_display_coords - migrations can't call model methods
+    Shul = apps.get_model("eznashdb", "Shul")
+    shuls = list(Shul._base_manager.only("pk", "latitude", "longitude"))
+    for shul in shuls:
+        rounded_lat = float(round(shul.latitude, 2))
+        rounded_lon = float(round(shul.longitude, 2))
+        shul.display_lat = rounded_lat + _jitter(rounded_lat, rounded_lon, "lat")
+        shul.display_lon = rounded_lon + _jitter(rounded_lat, rounded_lon, "lon")
+        shul.cluster_key = f"{shul.display_lat}_{shul.display_lon}"
+    Shul._base_manager.bulk_update(shuls, ["display_lat", "display_lon", "cluster_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("eznashdb", "0063_alter_shul_kaddish_policy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shul",
+            name="display_lat",
+            field=models.FloatField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="shul",
+            name="display_lon",
+            field=models.FloatField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="shul",
+            name="cluster_key",
+            field=models.CharField(default="", editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_display_coords, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="shul",
+            index=models.Index(fields=["cluster_key"], name="shul_cluster_key_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="shul",
+            index=models.Index(fields=["display_lat", "display_lon"], name="shul_display_coords_idx"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.18 on 2026-10-17 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("eznashdb", "0064_shul_display_coords"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shul",
+            index=models.Index(fields=["latitude", "longitude"], name="shul_coords_idx"),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.18 on 2026-10-17 19:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("eznashdb", "0065_shul_coords_idx"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="shul",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="shul_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shul",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["address"], name="shul_address_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.18 on 2026-10-17 18:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("eznashdb", "0066_shul_trgm_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shul",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["city"], name="shul_city_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shul",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector("name", config="simple", weight="A"),
+                        "||",
+                        django.contrib.postgres.search.SearchVector("city", config="simple", weight="B"),
+                        django.contrib.postgres.search.SearchConfig("simple"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector("address", config="simple", weight="C"),
+                    django.contrib.postgres.search.SearchConfig("simple"),
+                ),
+                name="shul_search_vector_idx",
+            ),
+        ),
+    ]
@@ -2,6 +2,8 @@ import hashlib
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.contrib.sites.models import Site
 from django.db import models
 from django.urls import reverse
@@ -11,6 +13,20 @@ from safedelete.models import SafeDeleteModel
 from eznashdb.enums import KaddishPolicy, RelativeSize, SeeHearScore
 
 
+def shul_search_vector():
+    """
+    Weighted full-text document of a shul's name, city and address. The
+    'simple' config skips stemming, which suits names in any language. The
+    GIN index below is built on this exact expression, so search queries
+    must use it to be served by the index (see eznashdb.shul_search).
+    """
+    return (
+        SearchVector("name", weight="A", config="simple")
+        + SearchVector("city", weight="B", config="simple")
+        + SearchVector("address", weight="C", config="simple")
+    )
+
+
 class Shul(SafeDeleteModel):
     id = models.BigAutoField(primary_key=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -36,11 +52,29 @@ class Shul(SafeDeleteModel):
     kaddish_policy = models.CharField(
         max_length=50, blank=True, choices=KaddishPolicy.choices, default=""
     )
+    # Denormalized from latitude/longitude on save (see get_display_coords) so
+    # map renders are a plain attribute read instead of rounding + hashing.
+    display_lat = models.FloatField(editable=False)
+    display_lon = models.FloatField(editable=False)
+    # Rendered as a string (not interpolated as a float in a template) so
+    # Django's numberformat can't expand scientific notation (e.g. -2e-05
+    # -> -0.00002) and diverge from this value.
+    cluster_key = models.CharField(max_length=64, editable=False)
 
     class Meta:
         verbose_name = "shul"
         verbose_name_plural = "shuls"
-        indexes = [models.Index(fields=["name"], name="shul_name_idx")]
+        indexes = [
+            models.Index(fields=["name"], name="shul_name_idx"),
+            models.Index(fields=["cluster_key"], name="shul_cluster_key_idx"),
+            models.Index(fields=["display_lat", "display_lon"], name="shul_display_coords_idx"),
+            # For the nearby shuls check (see eznashdb.nearby)
+            models.Index(fields=["latitude", "longitude"], name="shul_coords_idx"),
+            GinIndex(fields=["name"], name="shul_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["address"], name="shul_address_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["city"], name="shul_city_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(shul_search_vector(), name="shul_search_vector_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name}"
@@ -51,20 +85,43 @@ class Shul(SafeDeleteModel):
         else:
             return ""
 
-    @property
-    def display_lat(self):
-        return self.rounded_lat + self.get_jitter("lat")
-
-    @property
-    def display_lon(self):
-        return self.rounded_lon + self.get_jitter("lon")
-
-    @property
-    def cluster_key(self):
-        # Rendered as a string (not interpolated as a float in a template) so
-        # Django's numberformat can't expand scientific notation (e.g. -2e-05
-        # -> -0.00002) and diverge from this value.
-        return f"{self.display_lat}_{self.display_lon}"
+    DISPLAY_COORD_FIELDS = ("display_lat", "display_lon", "cluster_key")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored_display_coords()
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.set_display_coords()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, *self.DISPLAY_COORD_FIELDS}
+        super().save(*args, **kwargs)
+        self._remember_stored_display_coords()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_stored_display_coords()
+
+    def _remember_stored_display_coords(self):
+        """
+        The display coords as stored, so a save that moves the shul knows the
+        map tiles it leaves (see eznashdb.signals) without querying for them.
+        None if they weren't loaded (deferred).
+        """
+        loaded = self.__dict__
+        self.stored_display_coords = (
+            (loaded["display_lat"], loaded["display_lon"])
+            if "display_lat" in loaded and "display_lon" in loaded
+            else None
+        )
+
+    def set_display_coords(self):
+        self.display_lat, self.display_lon, self.cluster_key = self.get_display_coords(
+            self.latitude, self.longitude
+        )
 
     @property
     def rounded_lat(self):
@@ -78,8 +135,18 @@ class Shul(SafeDeleteModel):
     def round_coord(value):
         return float(round(value, 2))
 
-    def get_jitter(self, coord_type):
-        hash_input = f"{self.rounded_lat}_{self.rounded_lon}_{coord_type}".encode()
+    @classmethod
+    def get_display_coords(cls, latitude, longitude):
+        """Privacy-rounded, deterministically jittered (lat, lon, cluster_key)."""
+        rounded_lat = cls.round_coord(latitude)
+        rounded_lon = cls.round_coord(longitude)
+        display_lat = rounded_lat + cls.get_jitter(rounded_lat, rounded_lon, "lat")
+        display_lon = rounded_lon + cls.get_jitter(rounded_lat, rounded_lon, "lon")
+        return display_lat, display_lon, f"{display_lat}_{display_lon}"
+
+    @staticmethod
+    def get_jitter(rounded_lat, rounded_lon, coord_type):
+        hash_input = f"{rounded_lat}_{rounded_lon}_{coord_type}".encode()
         hash_value = int(hashlib.md5(hash_input).hexdigest(), 16)
         return ((hash_value % 6000) - 3000) / 1000000
 
@@ -0,0 +1,180 @@
+"""
+Process-local index answering shul name autocomplete without a query.
+
+Every word start of each live shul's name and city is kept in one sorted
+list, so a prefix lookup is a bisect plus a short scan: "isr" finds
+"Young Israel" through its "israel" entry, and "young isr" through its
+"young israel" entry.
+
+Kept current like eznashdb.facet_index: model signals (see
+eznashdb.signals) mark changed shuls dirty and they're re-read on the next
+lookup, and writes from other processes are caught by periodically
+comparing the data version.
+"""
+
+import bisect
+import heapq
+import itertools
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+
+from eznashdb.data_version import get_data_version
+from eznashdb.filtersets import MARKER_FIELDS
+from eznashdb.models import Shul
+
+# Seconds between data version checks for writes made by other processes
+RECHECK_INTERVAL = 60
+MAX_SUGGESTIONS = 10
+
+
+@dataclass(frozen=True)
+class ShulSuggestion:
+    pk: int
+    display_lat: float
+    display_lon: float
+    cluster_key: str
+    name: str
+    city: str
+
+    def as_row(self) -> list:
+        """A marker row (ShulMarkersView's format) followed by name and city."""
+        return [self.pk, self.display_lat, self.display_lon, self.cluster_key, self.name, self.city]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accent-free words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def _word_starts(text: str) -> list[str]:
+    words = normalize(text).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class ShulNameIndex:
+    def __init__(self):
+        # Guards the entries - held only for in-memory work, never for queries
+        self._lock = threading.RLock()
+        # Serializes reloads, so two threads don't apply the same shul's rows out of order
+        self._refresh_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            # Sorted (key, shul id, is city) entries, one per word start
+            self._entries = []
+            self._suggestions = {}
+            # shul id -> normalized name, for ordering suggestions
+            self._sort_names = {}
+            self._dirty_ids = set()
+            self._version = None
+            self._checked_at = 0.0
+
+    def mark_dirty(self, shul_id):
+        with self._lock:
+            self._dirty_ids.add(shul_id)
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> list[ShulSuggestion]:
+        """
+        Live shuls with a name or city word starting with ``query``. Name
+        matches come first, those matching from the start of the name before
+        the rest, then alphabetically.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self._ensure_current()
+        with self._lock:
+            name_matches, city_matches = set(), set()
+            start = bisect.bisect_left(self._entries, (prefix,))
+            for key, shul_id, is_city in itertools.islice(self._entries, start, None):
+                if not key.startswith(prefix):
+                    break
+                (city_matches if is_city else name_matches).add(shul_id)
+
+            def sort_key(shul_id):
+                name = self._sort_names[shul_id]
+                return (shul_id not in name_matches, not name.startswith(prefix), name, shul_id)
+
+            best = heapq.nsmallest(limit, name_matches | city_matches, key=sort_key)
+            return [self._suggestions[shul_id] for shul_id in best]
+
+    def _is_current(self, now) -> bool:
+        with self._lock:
+            return (
+                self._version is not None
+                and now - self._checked_at < RECHECK_INTERVAL
+                and not self._dirty_ids
+            )
+
+    def _ensure_current(self):
+        if self._is_current(time.monotonic()):
+            return
+
+        with self._refresh_lock:
+            now = time.monotonic()
+            with self._lock:
+                check_version = self._version is None or now - self._checked_at >= RECHECK_INTERVAL
+                # Shuls marked while the rows are read stay dirty for the next lookup
+                dirty_ids, self._dirty_ids = self._dirty_ids, set()
+
+            if check_version:
+                version = get_data_version()
+                if version != self._version:
+                    self._rebuild(_load_suggestions(Shul.objects.all()))
+                    self._version = version
+                    # The full reload covers them
+                    dirty_ids = set()
+                self._checked_at = now
+
+            if dirty_ids:
+                # Soft deleted shuls drop out here, as Shul.objects excludes them
+                self._refresh(dirty_ids, _load_suggestions(Shul.objects.filter(pk__in=dirty_ids)))
+
+    def _rebuild(self, loaded):
+        """Build a new index from ``loaded`` suggestions, then swap it in."""
+        suggestions = {suggestion.pk: suggestion for suggestion in loaded}
+        sort_names = {pk: normalize(suggestion.name) for pk, suggestion in suggestions.items()}
+        entries = sorted(entry for suggestion in loaded for entry in _entries_for(suggestion))
+        with self._lock:
+            self._entries, self._suggestions, self._sort_names = entries, suggestions, sort_names
+
+    def _refresh(self, shul_ids, loaded):
+        """Replace the suggestions of ``shul_ids`` with ``loaded``."""
+        with self._lock:
+            for shul_id in shul_ids:
+                self._remove(shul_id)
+            for suggestion in loaded:
+                self._suggestions[suggestion.pk] = suggestion
+                self._sort_names[suggestion.pk] = normalize(suggestion.name)
+                for entry in _entries_for(suggestion):
+                    bisect.insort(self._entries, entry)
+
+    def _remove(self, shul_id):
+        suggestion = self._suggestions.pop(shul_id, None)
+        if suggestion is None:
+            return
+        del self._sort_names[shul_id]
+        for entry in _entries_for(suggestion):
+            i = bisect.bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+
+def _entries_for(suggestion: ShulSuggestion) -> set[tuple[str, int, bool]]:
+    return {
+        *((key, suggestion.pk, False) for key in _word_starts(suggestion.name)),
+        *((key, suggestion.pk, True) for key in _word_starts(suggestion.city)),
+    }
+
+
+def _load_suggestions(shuls) -> list[ShulSuggestion]:
+    return [ShulSuggestion(*row) for row in shuls.values_list(*MARKER_FIELDS, "name", "city")]
+
+
+shul_name_index = ShulNameIndex()
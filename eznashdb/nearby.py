@@ -0,0 +1,70 @@
+"""
+Shuls within a distance of a point, nearest first - for spotting duplicates
+when a shul is added.
+
+Candidates come from an indexed range query on latitude/longitude over a
+bounding box sized in metres (so it widens toward the poles), then the
+great-circle distance is computed in SQL to filter and order them. Names and
+addresses are compared with pg_trgm's similarity operator, which their GIN
+trigram indexes serve.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+from eznashdb.map_bounds import MapViewport
+from eznashdb.models import Shul
+
+EARTH_RADIUS_M = 6_371_000
+
+
+def bounding_box(lat: float, lon: float, radius_m: float) -> MapViewport:
+    """The box (in degrees) containing every point within ``radius_m`` of lat/lon."""
+    lat_delta = math.degrees(radius_m / EARTH_RADIUS_M)
+    south, north = lat - lat_delta, lat + lat_delta
+    if south <= -90 or north >= 90:
+        # The circle reaches a pole, so takes in every longitude
+        return MapViewport(west=-180, south=max(south, -90), east=180, north=min(north, 90))
+    angle = radius_m / EARTH_RADIUS_M
+    lon_delta = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    return MapViewport(west=lon - lon_delta, south=south, east=lon + lon_delta, north=north)
+
+
+def distance_from(lat: float, lon: float, lat_field="latitude", lon_field="longitude"):
+    """Haversine distance in metres between lat/lon and each row's coordinates."""
+    row_lat = Radians(Cast(lat_field, FloatField()))
+    row_lon = Radians(Cast(lon_field, FloatField()))
+    lat_rad = Value(math.radians(lat))
+    lon_rad = Value(math.radians(lon))
+    cos_lat = Value(math.cos(math.radians(lat)))
+    a = Power(Sin((row_lat - lat_rad) / 2), 2) + cos_lat * Cos(row_lat) * Power(
+        Sin((row_lon - lon_rad) / 2), 2
+    )
+    # Least() guards against rounding pushing a past 1 for antipodal points
+    return Value(2 * EARTH_RADIUS_M) * ASin(Least(Sqrt(a), Value(1.0)))
+
+
+def shuls_near(lat: float, lon: float, radius_m: float, queryset: QuerySet | None = None) -> QuerySet:
+    """Shuls within ``radius_m`` metres of lat/lon, annotated with ``distance`` and nearest first."""
+    if queryset is None:
+        queryset = Shul.objects.all()
+    lat, lon = float(lat), float(lon)
+    box = bounding_box(lat, lon, radius_m)
+    return (
+        queryset.filter(box.as_q(lat_field="latitude", lon_field="longitude"))
+        .annotate(distance=distance_from(lat, lon))
+        .filter(distance__lte=radius_m)
+        .order_by(F("distance").asc(), "pk")
+    )
+
+
+def similar_to(name: str = "", address: str = "") -> Q:
+    """Shuls whose name or address is trigram-similar to the given (non-blank) ones."""
+    q = Q(pk__in=[])
+    if name.strip():
+        q |= Q(name__trigram_similar=name)
+    if address.strip():
+        q |= Q(address__trigram_similar=address)
+    return q
@@ -1,14 +1,21 @@
 """Place search merger for Google Places and OSM Nominatim."""
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, wait
 from dataclasses import dataclass
+from functools import partial
 
 import requests
 
 from eznashdb.enums import GeocodingProvider
+from eznashdb.geocoding_cache import geocoding_cache
 
 logger = logging.getLogger(__name__)
+metrics_logger = logging.getLogger("eznashdb.metrics")
 
 # Scoring weights (must sum to 1.0)
 WEIGHT_RESULTS_RANK = 0.65
@@ -20,6 +27,22 @@ MAX_COMMA_COUNT = 8.0
 # Google addresses use fewer commas for same precision as OSM
 GOOGLE_COMMA_MULTIPLIER = 2
 
+# A query can be answered from the cached results of a shorter one it extends
+# (e.g. "jerusalem" from "jerusal") if at least this many of them still match.
+# Providers cap their result counts, so fewer suggests better matches were cut.
+MIN_REUSED_RESULTS = 3
+# Shortest prefix whose results are reused
+MIN_REUSED_PREFIX_LENGTH = 3
+
+# Seconds a search waits for its providers. Whatever they've returned by then
+# is used - slower calls are left to finish in the background.
+SEARCH_TIMEOUT = 5
+# Provider calls run on one pool of threads shared by all searches. Beyond
+# this many calls running or queued, new ones are skipped rather than queued
+# behind calls that would likely miss their deadline anyway.
+PROVIDER_WORKERS = 8
+MAX_PENDING_PROVIDER_CALLS = 32
+
 
 @dataclass
 class NormalizedPlace:
@@ -70,6 +93,86 @@ def score_place(place: NormalizedPlace, result_rank: int) -> float:
     return rank_score * WEIGHT_RESULTS_RANK + precision_score * WEIGHT_PRECISION
 
 
+def matches_query(place: NormalizedPlace, query: str) -> bool:
+    """Whether each word of ``query`` starts a word of the place's name."""
+    name_words = _words(place.name)
+    return all(any(word.startswith(query_word) for word in name_words) for query_word in _words(query))
+
+
+def _words(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return re.findall(r"\w+", "".join(char for char in text if not unicodedata.combining(char)))
+
+
+def _reuse_prefix_results(provider: GeocodingProvider, query: str) -> list[NormalizedPlace] | None:
+    """
+    The cached results of a shorter query that ``query`` extends, filtered to
+    those still matching it, if enough remain to skip asking the provider.
+    They keep their order, so are rescored by their rank among the matches.
+    """
+    cached = geocoding_cache.get_longest_prefix(provider, query, MIN_REUSED_PREFIX_LENGTH)
+    if cached is None:
+        return None
+    matching = [place for place in cached if matches_query(place, query)]
+    return matching if len(matching) >= MIN_REUSED_RESULTS else None
+
+
+def record_metric(name: str, value, level: int = logging.DEBUG, **tags):
+    """
+    Log a metric as key=value pairs on the eznashdb.metrics logger. Routine
+    ones, sent on every search, are at DEBUG; failures are at INFO.
+    """
+    fields = {"metric": name, "value": value, **tags}
+    metrics_logger.log(level, " ".join(f"{key}={value}" for key, value in fields.items()))
+
+
+class ProviderExecutor:
+    """A thread pool for provider calls that refuses work past a pending limit."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="place-search")
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future | None:
+        """Schedule ``fn``, or return None if too many calls are already pending."""
+        with self._lock:
+            if self._pending >= self._max_pending:
+                return None
+            self._pending += 1
+            pending = self._pending
+        record_metric("place_search.pending_calls", pending)
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+
+provider_executor = ProviderExecutor(PROVIDER_WORKERS, MAX_PENDING_PROVIDER_CALLS)
+
+
+def _timed_fetch(provider: GeocodingProvider, fetch):
+    start = time.monotonic()
+    outcome = "error"
+    try:
+        results = fetch()
+        outcome = "ok"
+        return results
+    finally:
+        latency_ms = round((time.monotonic() - start) * 1000)
+        record_metric(
+            "place_search.provider_latency_ms",
+            latency_ms,
+            level=logging.DEBUG if outcome == "ok" else logging.INFO,
+            provider=provider.value,
+            outcome=outcome,
+        )
+
+
 class PlaceSearchMerger:
     """Merges results from Google Places and OSM Nominatim."""
 
@@ -95,37 +198,63 @@ class PlaceSearchMerger:
         Returns:
             List of NormalizedPlace objects, sorted by score (highest first)
         """
-        google_results = []
-        osm_results = []
-
-        # Query both providers in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=2) as executor:
+        # Providers that answered this query, or enough of one it extends,
+        # recently are served from the cache (see eznashdb.geocoding_cache
+        # and _reuse_prefix_results). It's read and written here rather
+        # than in the worker threads, which would each open a DB connection.
+        results = {}
+        fetches = {}
+        if self.google_client:
+            fetches[GeocodingProvider.GOOGLE] = partial(
+                self.google_client.autocomplete_and_normalize, query, session_token
+            )
+        fetches[GeocodingProvider.OSM] = partial(self.osm_client.search_and_normalize, query)
+        for provider in list(fetches):
+            cached = geocoding_cache.get(provider, query)
+            if cached is None:
+                cached = _reuse_prefix_results(provider, query)
+            if cached is not None:
+                results[provider] = cached
+                del fetches[provider]
+
+        if fetches:
+            # Passed down to the providers' HTTP calls, so none outlives the search
+            deadline = time.monotonic() + SEARCH_TIMEOUT
             futures = {}
-
-            # Submit Google Places query (if client is available)
-            if self.google_client:
-                google_future = executor.submit(
-                    self.google_client.autocomplete_and_normalize, query, session_token
+            for provider, fetch in fetches.items():
+                future = provider_executor.submit(
+                    _timed_fetch, provider, partial(fetch, deadline=deadline)
                 )
-                futures[google_future] = GeocodingProvider.GOOGLE
-
-            # Submit OSM query
-            osm_future = executor.submit(self.osm_client.search_and_normalize, query)
-            futures[osm_future] = GeocodingProvider.OSM
-
-            # Collect results with 5 second timeout per provider
-            for future in as_completed(futures, timeout=5):
+                if future is None:
+                    logger.warning(f"Provider {provider} skipped: too many searches in progress")
+                    record_metric(
+                        "place_search.provider_skipped", 1, level=logging.INFO, provider=provider.value
+                    )
+                else:
+                    futures[future] = provider
+
+            done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+            for future in not_done:
+                logger.warning(f"Provider {futures[future]} failed: missed the search deadline")
+                record_metric(
+                    "place_search.provider_missed_deadline",
+                    1,
+                    level=logging.INFO,
+                    provider=futures[future].value,
+                )
+            for future in done:
                 try:
-                    provider_results = future.result(timeout=5)
+                    provider_results = future.result()
                     if provider_results:
-                        if futures[future] == GeocodingProvider.GOOGLE:
-                            google_results = provider_results
-                        else:
-                            osm_results = provider_results
+                        results[futures[future]] = provider_results
+                        geocoding_cache.set(futures[future], query, provider_results)
                 except (TimeoutError, requests.RequestException) as e:
                     # Network/timeout failure - continue with other provider
                     logger.warning(f"Provider {futures[future]} failed: {e}")
 
+        google_results = results.get(GeocodingProvider.GOOGLE, [])
+        osm_results = results.get(GeocodingProvider.OSM, [])
+
         # Score results preserving provider rank
         scored_results = []
         for provider_results in [google_results, osm_results]:
@@ -0,0 +1,58 @@
+"""
+Search of shuls by name, city and address.
+
+Each query term is matched as a prefix against the full-text document from
+``shul_search_vector()`` (GIN indexed), so results show up while typing. Trigram
+word similarity on the same fields (pg_trgm GIN indexes) catches misspellings
+full-text matching misses. Results are ranked by the sum of the two scores.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q, QuerySet
+from django.db.models.functions import Greatest
+
+from eznashdb.models import shul_search_vector
+
+MIN_QUERY_LENGTH = 2
+MAX_RESULTS = 20
+
+
+def prefix_search_query(query: str) -> SearchQuery | None:
+    """A tsquery matching documents with every term of ``query`` as a word prefix."""
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    # \w+ terms carry no tsquery syntax, so are safe to pass raw
+    return SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config="simple")
+
+
+def search_shuls(queryset: QuerySet, query: str, limit: int = MAX_RESULTS) -> QuerySet:
+    """
+    Shuls in ``queryset`` matching ``query``, best match first, annotated
+    with their ``rank``. Queries shorter than MIN_QUERY_LENGTH match nothing.
+    """
+    query = query.strip()
+    search_query = prefix_search_query(query)
+    if len(query) < MIN_QUERY_LENGTH or search_query is None:
+        return queryset.none()
+
+    vector = shul_search_vector()
+    matches = (
+        Q(search_document=search_query)
+        | Q(name__trigram_word_similar=query)
+        | Q(city__trigram_word_similar=query)
+        | Q(address__trigram_word_similar=query)
+    )
+    similarity = Greatest(
+        TrigramWordSimilarity(query, "name"),
+        TrigramWordSimilarity(query, "city"),
+        TrigramWordSimilarity(query, "address"),
+    )
+    return (
+        queryset.alias(search_document=vector)
+        .filter(matches)
+        .annotate(rank=SearchRank(vector, search_query) + similarity)
+        .order_by(F("rank").desc(), "name", "pk")[:limit]
+    )
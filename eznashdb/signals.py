@@ -0,0 +1,138 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from safedelete.signals import post_softdelete, post_undelete
+
+from eznashdb import marker_bundle
+from eznashdb.facet_index import shul_facet_index
+from eznashdb.fragment_cache import bump_fragment_version
+from eznashdb.map_tiles import invalidate_tiles_at
+from eznashdb.models import DeletedShul, Room, Shul
+from eznashdb.name_index import shul_name_index
+
+
+def _mark_shul_dirty(index, shul_id):
+    """
+    Marked now so this connection's own reads see the change, and again after
+    commit so a lookup from another thread mid-transaction can't leave the
+    pre-commit state cached.
+    """
+    index.mark_dirty(shul_id)
+    transaction.on_commit(lambda: index.mark_dirty(shul_id))
+
+
+# Soft delete and undelete both save the shul, so post_save covers them too
+@receiver(post_save, sender=Shul)
+@receiver(post_save, sender=DeletedShul)
+@receiver(post_delete, sender=Shul)
+@receiver(post_delete, sender=DeletedShul)
+def update_facet_index_for_shul(sender, instance, **kwargs):
+    _mark_shul_dirty(shul_facet_index, instance.pk)
+
+
+@receiver(post_save, sender=Shul)
+@receiver(post_save, sender=DeletedShul)
+@receiver(post_delete, sender=Shul)
+@receiver(post_delete, sender=DeletedShul)
+def update_name_index_for_shul(sender, instance, **kwargs):
+    _mark_shul_dirty(shul_name_index, instance.pk)
+
+
+@receiver(post_save, sender=Shul)
+@receiver(post_save, sender=DeletedShul)
+@receiver(post_delete, sender=Shul)
+@receiver(post_delete, sender=DeletedShul)
+@receiver(post_softdelete, sender=Shul)
+@receiver(post_softdelete, sender=DeletedShul)
+@receiver(post_undelete, sender=Shul)
+@receiver(post_undelete, sender=DeletedShul)
+def invalidate_map_fragments(sender, instance, **kwargs):
+    # Bumped again after commit for the same reason as _mark_shul_dirty
+    bump_fragment_version()
+    transaction.on_commit(bump_fragment_version)
+
+
+@receiver(post_save, sender=Shul)
+@receiver(post_save, sender=DeletedShul)
+@receiver(post_delete, sender=Shul)
+@receiver(post_delete, sender=DeletedShul)
+def invalidate_map_tiles_for_shul(sender, instance, **kwargs):
+    coords = {(instance.display_lat, instance.display_lon)}
+    # A moved shul leaves the tiles it was in, so those need invalidating too.
+    # (Shul.save only updates stored_display_coords after its post_save signals.)
+    if previous_coords := getattr(instance, "stored_display_coords", None):
+        coords.add(previous_coords)
+    for lat, lon in coords:
+        _invalidate_tiles_at(lat, lon)
+
+
+def _invalidate_tiles_at(lat, lon):
+    # Again after commit for the same reason as _mark_shul_dirty
+    invalidate_tiles_at(lat, lon)
+    transaction.on_commit(lambda: invalidate_tiles_at(lat, lon))
+
+
+@receiver(post_save, sender=Shul)
+@receiver(post_save, sender=DeletedShul)
+@receiver(post_delete, sender=Shul)
+@receiver(post_delete, sender=DeletedShul)
+def rebuild_marker_bundle_on_commit(sender, instance, **kwargs):
+    # Rebuilt on a background thread after a short delay, so several saves
+    # (e.g. a shul and its rooms) rebuild once, and not on the request thread
+    transaction.on_commit(marker_bundle.data_changed)
+
+
+_room_batch = threading.local()
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def update_caches_for_room(sender, instance, **kwargs):
+    rooms_changed(instance.shul_id)
+
+
+def rooms_changed(*shul_ids):
+    """
+    Updates the facet index and map caches for changes to these shuls' rooms.
+    Room signals call this, and bulk room writes (which send no signals) must
+    call it themselves. Inside batched_room_changes() the update waits for the
+    end of the batch.
+    """
+    batch = getattr(_room_batch, "shul_ids", None)
+    if batch is not None:
+        batch.update(shul_ids)
+        return
+
+    for shul_id in shul_ids:
+        _mark_shul_dirty(shul_facet_index, shul_id)
+    # Bumped again after commit for the same reason as _mark_shul_dirty
+    bump_fragment_version()
+    transaction.on_commit(bump_fragment_version)
+    coords = Shul.all_objects.filter(pk__in=shul_ids).values_list("display_lat", "display_lon")
+    for lat, lon in set(coords):
+        _invalidate_tiles_at(lat, lon)
+    transaction.on_commit(marker_bundle.data_changed)
+
+
+@contextmanager
+def batched_room_changes():
+    """
+    Collects the room changes made inside the block and updates the caches
+    for them once on exit, rather than once per room.
+    """
+    if hasattr(_room_batch, "shul_ids"):
+        # Nested - the outer batch updates the caches
+        yield
+        return
+
+    _room_batch.shul_ids = set()
+    try:
+        yield
+    finally:
+        shul_ids = _room_batch.shul_ids
+        del _room_batch.shul_ids
+        if shul_ids:
+            rooms_changed(*shul_ids)
@@ -2,10 +2,16 @@ import pytest
 from django.urls import resolve, reverse
 
 from eznashdb.enums import KaddishPolicy, RelativeSize, SeeHearScore
-from eznashdb.filtersets import ShulFilterSet
+from eznashdb.filtersets import MARKER_FIELDS, ShulFilterSet, any_of_ids
 from eznashdb.models import Shul
 
 
+@pytest.fixture(autouse=True, params=[True, False], ids=["facet_index", "orm"])
+def _facet_index_enabled(request, settings):
+    """Both filtering paths must agree - see eznashdb.facet_index."""
+    settings.SHUL_FACET_INDEX_ENABLED = request.param
+
+
 @pytest.fixture
 def test_request(rf, test_user):
     request = rf.get("/")
@@ -168,3 +174,113 @@ def describe_kaddish_policy_filter():
 
         data = {"kaddish_policy": query}
         assert ShulFilterSet(data, request=test_request).qs.count() == 0
+
+
+def describe_combined_filters():
+    def require_every_filter_to_match(test_request):
+        both = Shul.objects.create(name="Both", latitude=1, longitude=1, kaddish_policy="NO")
+        both.rooms.create(relative_size=RelativeSize.L)
+        size_only = Shul.objects.create(name="Size", latitude=1, longitude=1, kaddish_policy="")
+        size_only.rooms.create(relative_size=RelativeSize.L)
+
+        data = {"rooms__relative_size": ["L"], "kaddish_policy": ["NO"]}
+        assert list(ShulFilterSet(data, request=test_request).qs) == [both]
+
+    def exclude_soft_deleted_shuls(test_request, test_shul):
+        test_shul.rooms.create(relative_size=RelativeSize.L)
+        test_shul.delete()
+
+        data = {"rooms__relative_size": ["L"]}
+        assert ShulFilterSet(data, request=test_request).qs.count() == 0
+
+
+def describe_any_of_ids():
+    def matches_only_the_given_ids():
+        shuls = [Shul.objects.create(name=f"S{i}", latitude=1, longitude=1) for i in range(3)]
+
+        matched = Shul.objects.filter(any_of_ids([shuls[0].pk, shuls[2].pk])).order_by("pk")
+
+        assert list(matched) == [shuls[0], shuls[2]]
+
+    def matches_nothing_without_ids(test_shul):
+        assert not Shul.objects.filter(any_of_ids([])).exists()
+
+    def binds_the_ids_as_one_parameter():
+        _sql, params = Shul.objects.filter(any_of_ids(range(1000))).query.sql_with_params()
+
+        assert len(params) == 1
+
+
+def describe_prefetch_rooms():
+    def prefetches_rooms_by_default(test_request, test_shul, django_assert_num_queries):
+        test_shul.rooms.create(relative_size=RelativeSize.L)
+
+        with django_assert_num_queries(2):
+            shuls = list(ShulFilterSet({}, request=test_request).qs)
+            assert len(shuls[0].rooms.all()) == 1
+
+    def can_skip_the_rooms_prefetch(test_request, test_shul, django_assert_num_queries):
+        test_shul.rooms.create(relative_size=RelativeSize.L)
+        filterset = ShulFilterSet({}, request=test_request, prefetch_rooms=False)
+
+        with django_assert_num_queries(1):
+            rows = list(filterset.qs.values_list(*MARKER_FIELDS))
+
+        assert rows == [
+            (test_shul.pk, test_shul.display_lat, test_shul.display_lon, test_shul.cluster_key)
+        ]
+
+
+def describe_facet_counts():
+    @pytest.fixture
+    def shuls():
+        large = Shul.objects.create(name="Large", latitude=1, longitude=1, kaddish_policy="NO")
+        large.rooms.create(relative_size=RelativeSize.L)
+        large.rooms.create(relative_size=RelativeSize.L)
+        mixed = Shul.objects.create(name="Mixed", latitude=1, longitude=1, kaddish_policy="")
+        mixed.rooms.create(relative_size=RelativeSize.L)
+        mixed.rooms.create(relative_size=RelativeSize.S)
+        no_rooms = Shul.objects.create(name="No rooms", latitude=1, longitude=1)
+        return large, mixed, no_rooms
+
+    def counts_every_option_without_filters(test_request, shuls):
+        counts = ShulFilterSet({}, request=test_request).get_facet_counts()
+
+        assert counts["total"] == 3
+        # A shul with two matching rooms is only counted once
+        assert counts["options"]["rooms__relative_size"]["L"] == 2
+        assert counts["options"]["rooms__relative_size"]["S"] == 1
+        assert counts["options"]["rooms__relative_size"]["M"] == 0
+        assert counts["options"]["rooms__relative_size"][""] == 1
+        assert counts["options"]["kaddish_policy"]["NO"] == 1
+        assert counts["options"]["kaddish_policy"][""] == 2
+
+    def applies_the_other_filters_to_each_options_count(test_request, shuls):
+        data = {"rooms__relative_size": ["S"], "kaddish_policy": ["NO"]}
+        counts = ShulFilterSet(data, request=test_request).get_facet_counts()
+
+        assert counts["total"] == 0
+        # Counts ignore their own filter's selection, so they say what
+        # selecting that option (too) would yield
+        assert counts["options"]["rooms__relative_size"]["L"] == 1
+        assert counts["options"]["kaddish_policy"][""] == 1
+        assert counts["options"]["kaddish_policy"]["NO"] == 0
+
+    def total_matches_the_filtered_queryset(test_request, shuls):
+        data = {"rooms__relative_size": ["L", ""]}
+        filterset = ShulFilterSet(data, request=test_request)
+
+        assert filterset.get_facet_counts()["total"] == filterset.qs.count() == 3
+
+    def uses_a_single_query(test_request, shuls, django_assert_num_queries):
+        data = {"rooms__relative_size": ["L"], "rooms__see_hear_score": ["5"]}
+        filterset = ShulFilterSet(data, request=test_request)
+        filterset.is_valid()
+
+        with django_assert_num_queries(1):
+            filterset.get_facet_counts()
+
+    def is_none_for_invalid_filters(test_request, shuls):
+        data = {"rooms__relative_size": ["NOT_A_REAL_CHOICE"]}
+
+        assert ShulFilterSet(data, request=test_request).get_facet_counts() is None
@@ -1,7 +1,9 @@
 import pytest
 from bs4 import BeautifulSoup
+from django.urls import reverse
 
 from eznashdb.forms import ShulForm
+from eznashdb.models import Shul
 
 
 def test_displays_shul_fields():
@@ -36,3 +38,19 @@ def describe_validation():
             }
         )
         assert form.is_valid() is is_valid
+
+
+def describe_name_autocomplete():
+    def suggests_listed_shuls_when_adding_one():
+        soup = BeautifulSoup(ShulForm().as_p(), "html.parser")
+        name_input = soup.find(attrs={"id": "id_name"})
+
+        assert name_input["data-shul-name-autocomplete"] == reverse("eznashdb:shul_name_suggest")
+        assert name_input["data-item-url"] == reverse("eznashdb:update_shul", args=["__id__"])
+
+    def is_off_when_updating_a_shul():
+        shul = Shul.objects.create(name="S", latitude=1, longitude=1)
+
+        soup = BeautifulSoup(ShulForm(instance=shul).as_p(), "html.parser")
+
+        assert not soup.find(attrs={"id": "id_name"}).has_attr("data-shul-name-autocomplete")
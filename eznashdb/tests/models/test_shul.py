@@ -1,4 +1,5 @@
 import pytest
+from django.db.models.signals import post_save
 from django.template import Context, Template
 
 from eznashdb.models import Shul
@@ -32,6 +33,73 @@ def describe_cluster_key():
         assert rendered == shul.cluster_key
 
 
+def describe_display_coords():
+    def are_stored_on_create():
+        shul = Shul.objects.create(name="S", latitude=40.7128, longitude=-74.0060)
+
+        stored = Shul.objects.values("display_lat", "display_lon", "cluster_key").get(pk=shul.pk)
+
+        assert stored == {
+            "display_lat": shul.display_lat,
+            "display_lon": shul.display_lon,
+            "cluster_key": shul.cluster_key,
+        }
+
+    def are_derived_from_the_rounded_coords():
+        here = Shul.objects.create(name="Here", latitude=40.7128, longitude=-74.0060)
+        also = Shul.objects.create(name="Also Here", latitude=40.7129, longitude=-74.0061)
+
+        assert (here.display_lat, here.display_lon) == (also.display_lat, also.display_lon)
+        assert abs(here.display_lat - 40.71) <= 0.003
+        assert abs(here.display_lon - -74.01) <= 0.003
+
+    def are_updated_when_the_shul_moves():
+        shul = Shul.objects.create(name="S", latitude=40.7128, longitude=-74.0060)
+        old_cluster_key = shul.cluster_key
+
+        shul.latitude, shul.longitude = 31.7683, 35.2137
+        shul.save(update_fields=["latitude", "longitude"])
+        shul.refresh_from_db()
+
+        assert shul.cluster_key != old_cluster_key
+        assert shul.cluster_key == Shul.get_display_coords(shul.latitude, shul.longitude)[2]
+
+
+def describe_stored_display_coords():
+    def are_remembered_when_loaded():
+        shul = Shul.objects.create(name="S", latitude=40.7128, longitude=-74.0060)
+
+        loaded = Shul.objects.get(pk=shul.pk)
+
+        assert loaded.stored_display_coords == (shul.display_lat, shul.display_lon)
+
+    def are_the_previous_coords_until_a_move_is_saved(django_assert_num_queries):
+        shul = Shul.objects.get(
+            pk=Shul.objects.create(name="S", latitude=40.7128, longitude=-74.0060).pk
+        )
+        before = (shul.display_lat, shul.display_lon)
+        seen_by_signals = []
+
+        def receiver(sender, instance, **kwargs):
+            seen_by_signals.append(instance.stored_display_coords)
+
+        post_save.connect(receiver, sender=Shul)
+        shul.latitude, shul.longitude = 31.7683, 35.2137
+        try:
+            with django_assert_num_queries(1):
+                shul.save()
+        finally:
+            post_save.disconnect(receiver, sender=Shul)
+
+        assert seen_by_signals == [before]
+        assert shul.stored_display_coords == (shul.display_lat, shul.display_lon)
+
+    def are_none_when_deferred():
+        shul = Shul.objects.create(name="S", latitude=40.7128, longitude=-74.0060)
+
+        assert Shul.objects.only("name").get(pk=shul.pk).stored_display_coords is None
+
+
 def describe_get_map_url():
     @pytest.fixture
     def shul(test_user):
@@ -0,0 +1,46 @@
+"""Unit tests for shul map data versioning."""
+
+from django.http import QueryDict
+
+from eznashdb.data_version import get_data_version, make_etag
+from eznashdb.models import Shul
+
+
+def describe_get_data_version():
+    def changes_when_a_shul_is_created():
+        before = get_data_version()
+
+        Shul.objects.create(name="S", latitude=40.71, longitude=-74.0)
+
+        assert get_data_version() != before
+
+    def changes_when_a_shul_is_soft_deleted_and_restored(test_shul):
+        before_delete = get_data_version()
+        test_shul.delete()
+        after_delete = get_data_version()
+        test_shul.undelete()
+
+        assert after_delete != before_delete
+        assert get_data_version() != after_delete
+
+    def changes_when_a_room_is_hard_deleted(test_shul):
+        room = test_shul.rooms.create(name="r")
+        before = get_data_version()
+
+        room.delete()
+
+        assert get_data_version() != before
+
+    def is_stable_without_changes(test_shul):
+        assert get_data_version() == get_data_version()
+
+
+def describe_make_etag():
+    def ignores_param_and_value_order():
+        assert make_etag("v1", QueryDict("a=1&a=2&b=3")) == make_etag("v1", QueryDict("b=3&a=2&a=1"))
+
+    def differs_by_params():
+        assert make_etag("v1", QueryDict("a=1")) != make_etag("v1", QueryDict("a=2"))
+
+    def differs_by_version():
+        assert make_etag("v1", QueryDict("a=1")) != make_etag("v2", QueryDict("a=1"))
@@ -0,0 +1,113 @@
+"""Unit tests for the in-memory shul facet index."""
+
+import threading
+
+import pytest
+
+from eznashdb import facet_index
+from eznashdb.enums import KaddishPolicy, RelativeSize, SeeHearScore
+from eznashdb.facet_index import ShulFacetIndex, shul_facet_index
+from eznashdb.models import Shul
+
+
+@pytest.fixture
+def shul():
+    return Shul.objects.create(name="S", latitude=1, longitude=1, kaddish_policy=KaddishPolicy.NO)
+
+
+def describe_match():
+    def ors_values_within_a_facet(shul):
+        other = Shul.objects.create(name="O", latitude=1, longitude=1, kaddish_policy="")
+
+        ids = shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO, ""]})
+
+        assert sorted(ids) == sorted([shul.pk, other.pk])
+
+    def ands_across_facets(shul):
+        shul.rooms.create(relative_size=RelativeSize.L, see_hear_score=SeeHearScore._5)
+
+        large = {"rooms__relative_size": [RelativeSize.L]}
+
+        assert shul_facet_index.match({**large, "rooms__see_hear_score": [SeeHearScore._5]}) == [shul.pk]
+        assert shul_facet_index.match({**large, "rooms__see_hear_score": [SeeHearScore._1]}) == []
+
+    def shuls_without_rooms_match_the_blank_room_value(shul):
+        assert shul_facet_index.match({"rooms__relative_size": [""]}) == [shul.pk]
+
+    def unknown_values_match_nothing(shul):
+        assert shul_facet_index.match({"kaddish_policy": ["NOT_A_VALUE"]}) == []
+
+
+def describe_incremental_updates():
+    def picks_up_a_changed_shul(shul):
+        assert shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO]}) == [shul.pk]
+
+        shul.kaddish_policy = KaddishPolicy.CAN_SAY_ALONE
+        shul.save()
+
+        assert shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO]}) == []
+        assert shul_facet_index.match({"kaddish_policy": [KaddishPolicy.CAN_SAY_ALONE]}) == [shul.pk]
+
+    def picks_up_added_and_deleted_rooms(shul):
+        assert shul_facet_index.match({"rooms__relative_size": [""]}) == [shul.pk]
+
+        room = shul.rooms.create(relative_size=RelativeSize.L)
+        assert shul_facet_index.match({"rooms__relative_size": [""]}) == []
+        assert shul_facet_index.match({"rooms__relative_size": [RelativeSize.L]}) == [shul.pk]
+
+        room.delete()
+        assert shul_facet_index.match({"rooms__relative_size": [RelativeSize.L]}) == []
+        assert shul_facet_index.match({"rooms__relative_size": [""]}) == [shul.pk]
+
+    def drops_soft_deleted_shuls_and_restores_undeleted_ones(shul):
+        shul.delete()
+        assert shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO]}) == []
+
+        shul.undelete()
+        assert shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO]}) == [shul.pk]
+
+    def only_rereads_dirty_shuls(shul, django_assert_num_queries):
+        shul_facet_index.match({"kaddish_policy": [KaddishPolicy.NO]})
+        shul.rooms.create(relative_size=RelativeSize.L)
+
+        # The changed shul and its rooms - no full rebuild or version check
+        with django_assert_num_queries(2):
+            shul_facet_index.match({"rooms__relative_size": [RelativeSize.L]})
+
+
+def describe_out_of_process_writes():
+    def are_caught_by_the_data_version_recheck(shul, mocker):
+        index = ShulFacetIndex()
+        assert index.match({"kaddish_policy": [KaddishPolicy.NO]}) == [shul.pk]
+
+        # Like a write from another process: no signal reaches this index
+        Shul.objects.filter(pk=shul.pk).update(kaddish_policy="", updated_at=shul.updated_at)
+        Shul.objects.create(name="New", latitude=1, longitude=1)
+        mocker.patch("eznashdb.facet_index.RECHECK_INTERVAL", 0)
+
+        assert index.match({"kaddish_policy": [KaddishPolicy.NO]}) == []
+
+
+def describe_locking():
+    def lets_shuls_be_marked_dirty_while_it_queries(shul, mocker):
+        index = ShulFacetIndex()
+        marked = threading.Event()
+        load = facet_index._load_facet_values
+
+        def load_while_marking(shuls):
+            # A save on another request thread, mid-query
+            thread = threading.Thread(target=lambda: (index.mark_dirty(shul.pk), marked.set()))
+            thread.start()
+            thread.join(timeout=5)
+            return load(shuls)
+
+        mocker.patch("eznashdb.facet_index._load_facet_values", side_effect=load_while_marking)
+
+        assert index.match({"kaddish_policy": [KaddishPolicy.NO]}) == [shul.pk]
+        assert marked.is_set()
+
+
+def test_bitmap_of_sets_each_id():
+    assert facet_index._bitmap_of([]) == 0
+    assert facet_index._bitmap_of([0, 3, 9]) == 0b1000001001
+    assert facet_index._bitmap_ids(facet_index._bitmap_of(range(0, 5000, 7))) == list(range(0, 5000, 7))
@@ -0,0 +1,77 @@
+"""Unit tests for the rendered map fragment cache."""
+
+from django.core.cache import caches
+from django.http import QueryDict
+from django.utils import timezone
+
+from eznashdb.fragment_cache import (
+    CACHE_ALIAS,
+    VERSION_KEY,
+    bump_fragment_version,
+    get_fragment,
+    get_fragment_stamp,
+    get_fragment_version,
+    make_fragment_key,
+    set_fragment,
+)
+from eznashdb.models import Shul
+
+
+def describe_fragment_version():
+    def is_stable_until_bumped():
+        version = get_fragment_version()
+
+        assert get_fragment_version() == version
+        bump_fragment_version()
+        assert get_fragment_version() > version
+
+    def moves_forward_when_lost_from_the_cache():
+        version = get_fragment_version()
+
+        caches[CACHE_ALIAS].delete(VERSION_KEY)
+
+        assert get_fragment_version() > version
+
+    def bumping_works_before_a_version_exists():
+        bump_fragment_version()
+
+        assert get_fragment_version()
+
+
+def describe_fragment_stamp():
+    def checks_the_data_version_once_per_interval(test_shul, django_assert_num_queries):
+        stamp = get_fragment_stamp()
+
+        with django_assert_num_queries(0):
+            assert get_fragment_stamp() == stamp
+
+    def catches_writes_that_sent_no_signal(test_shul, mocker):
+        stamp = get_fragment_stamp()
+        mocker.patch("eznashdb.fragment_cache.RECHECK_INTERVAL", 0)
+
+        Shul.objects.filter(pk=test_shul.pk).update(updated_at=timezone.now())
+
+        assert get_fragment_stamp() != stamp
+
+    def changes_when_the_version_is_bumped():
+        stamp = get_fragment_stamp()
+
+        bump_fragment_version()
+
+        assert get_fragment_stamp() != stamp
+
+
+def describe_fragments():
+    def are_orphaned_by_a_version_bump():
+        key = make_fragment_key("map_updates", QueryDict("a=1"))
+        set_fragment(key, b"html")
+        assert get_fragment(make_fragment_key("map_updates", QueryDict("a=1"))) == b"html"
+
+        bump_fragment_version()
+
+        assert get_fragment(make_fragment_key("map_updates", QueryDict("a=1"))) is None
+
+    def keys_ignore_param_order():
+        assert make_fragment_key("f", QueryDict("a=1&b=2")) == make_fragment_key(
+            "f", QueryDict("b=2&a=1")
+        )
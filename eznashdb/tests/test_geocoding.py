@@ -1,5 +1,6 @@
 """Unit tests for geocoding client classes."""
 
+import time
 from calendar import monthrange
 from datetime import date
 
@@ -11,11 +12,32 @@ from waffle.testutils import override_flag
 
 from app.models import GooglePlacesUsage, GooglePlacesUserUsage
 from eznashdb.enums import GeocodingProvider
-from eznashdb.geocoding import GooglePlacesBudgetChecker, GooglePlacesClient, OSMClient
+from eznashdb.geocoding import (
+    READ_TIMEOUT,
+    GooglePlacesBudgetChecker,
+    GooglePlacesClient,
+    OSMClient,
+    get_read_timeout,
+)
 
 User = get_user_model()
 
 
+def describe_get_read_timeout():
+    def defaults_without_a_deadline():
+        assert get_read_timeout() == READ_TIMEOUT
+
+    def is_cut_short_by_the_deadline():
+        assert 0 < get_read_timeout(time.monotonic() + 1) <= 1
+
+    def never_exceeds_the_default():
+        assert get_read_timeout(time.monotonic() + READ_TIMEOUT * 10) == READ_TIMEOUT
+
+    def raises_once_the_deadline_has_passed():
+        with pytest.raises(requests.Timeout):
+            get_read_timeout(time.monotonic() - 1)
+
+
 def describe_google_places_client():
     @pytest.fixture
     def client():
@@ -36,7 +58,7 @@ def describe_google_places_client():
                 ]
             }
 
-            mocker.patch("requests.post", return_value=mock_response)
+            mocker.patch("app.http_client.post", return_value=mock_response)
             results = client.autocomplete("test query", "session123")
 
             assert results == [
@@ -54,7 +76,7 @@ def describe_google_places_client():
             mock_response = mocker.Mock()
             mock_response.status_code = 500
 
-            mocker.patch("requests.post", return_value=mock_response)
+            mocker.patch("app.http_client.post", return_value=mock_response)
             results = client.autocomplete("test query", "session123")
 
             assert results == []
@@ -64,11 +86,19 @@ def describe_google_places_client():
             mock_response.status_code = 200
             mock_response.json.return_value = {"suggestions": []}
 
-            mocker.patch("requests.post", return_value=mock_response)
+            mocker.patch("app.http_client.post", return_value=mock_response)
             results = client.autocomplete("test query", "session123")
 
             assert results == []
 
+        def it_counts_a_request_that_times_out(client, mocker):
+            mocker.patch("app.http_client.post", side_effect=requests.Timeout("slow"))
+
+            with pytest.raises(requests.Timeout):
+                client.autocomplete("test query", "session123")
+
+            assert client.autocomplete_requests == 1
+
     def describe_get_details():
         def it_returns_place_with_coordinates(client, mocker):
             mock_response = mocker.Mock()
@@ -78,7 +108,7 @@ def describe_google_places_client():
                 "formattedAddress": "123 Main St, New York, NY",
             }
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             result = client.get_details("place123", "session123")
 
             assert result == {
@@ -97,7 +127,7 @@ def describe_google_places_client():
                 "formattedAddress": "Test Address",
             }
 
-            mock_get = mocker.patch("requests.get", return_value=mock_response)
+            mock_get = mocker.patch("app.http_client.get", return_value=mock_response)
             client.get_details("place123", "session123")
 
             call_args = mock_get.call_args
@@ -108,11 +138,23 @@ def describe_google_places_client():
             mock_response = mocker.Mock()
             mock_response.status_code = 404
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             result = client.get_details("invalid_place", "session123")
 
             assert result is None
 
+        def it_returns_none_on_timeout(client, mocker):
+            mocker.patch("app.http_client.get", side_effect=requests.Timeout("slow"))
+
+            assert client.get_details("place123", "session123") is None
+
+        def it_sets_a_timeout(client, mocker):
+            mock_get = mocker.patch("app.http_client.get")
+
+            client.get_details("place123", "session123")
+
+            assert mock_get.call_args.kwargs["timeout"] == READ_TIMEOUT
+
     def describe_autocomplete_and_normalize():
         def it_normalizes_autocomplete_result(client, mocker):
             # Mock the autocomplete response
@@ -165,7 +207,7 @@ def describe_osm_client():
                 }
             ]
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             results = client.search("test query")
 
             assert results == [
@@ -181,14 +223,14 @@ def describe_osm_client():
             mock_response = mocker.Mock()
             mock_response.json.return_value = {"error": "invalid"}  # Not a list
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             results = client.search("test query")
 
             assert results == []
 
         def it_returns_empty_list_on_request_exception(client, mocker):
             mocker.patch(
-                "eznashdb.geocoding.requests.get",
+                "app.http_client.get",
                 side_effect=requests.RequestException("Network error"),
             )
             results = client.search("test query")
@@ -205,7 +247,7 @@ def describe_osm_client():
                 }
             ]
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             results = client.search_and_format_results("tel aviv")
 
             assert results[0]["id"] == "123"
@@ -220,7 +262,7 @@ def describe_osm_client():
                 }
             ]
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("app.http_client.get", return_value=mock_response)
             results = client.search_and_format_results("jerusalem")
 
             assert "Israel" in results[0]["display_name"]
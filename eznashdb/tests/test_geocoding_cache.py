@@ -0,0 +1,127 @@
+"""Unit tests for the two-tier geocoding result cache."""
+
+import pytest
+from django.core.cache import caches
+
+from eznashdb.enums import GeocodingProvider
+from eznashdb.geocoding import OSMClient
+from eznashdb.geocoding_cache import CACHE_ALIAS, GeocodingCache, geocoding_cache
+from eznashdb.place_search import NormalizedPlace, PlaceSearchMerger
+
+
+@pytest.fixture
+def place():
+    return NormalizedPlace(
+        id="osm:1",
+        provider=GeocodingProvider.OSM,
+        name="Toronto, Ontario, Canada",
+        display_address="",
+        latitude=43.7,
+        longitude=-79.4,
+        raw_data={"place_id": "1"},
+    )
+
+
+def describe_get():
+    def misses_an_unknown_query():
+        assert geocoding_cache.get(GeocodingProvider.OSM, "toronto") is None
+
+    def hits_the_same_query_normalized(place):
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto ontario", [place])
+
+        assert geocoding_cache.get(GeocodingProvider.OSM, "  Toronto   ONTARIO ") == [place]
+
+    def keeps_providers_apart(place):
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto", [place])
+
+        assert geocoding_cache.get(GeocodingProvider.GOOGLE, "toronto") is None
+
+    def falls_back_to_the_shared_cache(place):
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto", [place])
+
+        # Like another process, which has its own local tier
+        assert GeocodingCache().get(GeocodingProvider.OSM, "toronto") == [place]
+
+    def answers_from_the_local_tier_without_the_shared_cache(place, mocker):
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto", [place])
+        shared_get = mocker.spy(caches[CACHE_ALIAS], "get")
+
+        assert geocoding_cache.get(GeocodingProvider.OSM, "toronto") == [place]
+        shared_get.assert_not_called()
+
+
+def describe_set():
+    def skips_empty_results():
+        geocoding_cache.set(GeocodingProvider.OSM, "nowhere", [])
+
+        assert GeocodingCache().get(GeocodingProvider.OSM, "nowhere") is None
+
+    def uses_the_providers_timeout(place, mocker, settings):
+        settings.GEOCODING_CACHE_TIMEOUTS = {"google": 60, "osm": 3600}
+        shared_set = mocker.spy(caches[CACHE_ALIAS], "set")
+
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto", [place])
+
+        assert shared_set.call_args.kwargs["timeout"] == 3600
+
+    def evicts_the_least_recently_used_local_entry(place, mocker):
+        cache = GeocodingCache(max_entries=2)
+        cache.set(GeocodingProvider.OSM, "a", [place])
+        cache.set(GeocodingProvider.OSM, "b", [place])
+        cache.get(GeocodingProvider.OSM, "a")
+        cache.set(GeocodingProvider.OSM, "c", [place])
+        shared_get = mocker.spy(caches[CACHE_ALIAS], "get")
+
+        cache.get(GeocodingProvider.OSM, "a")
+        cache.get(GeocodingProvider.OSM, "c")
+        shared_get.assert_not_called()
+        cache.get(GeocodingProvider.OSM, "b")
+        shared_get.assert_called_once()
+
+
+def test_repeat_searches_skip_the_network(mocker):
+    response = mocker.Mock()
+    response.json.return_value = [
+        {"place_id": 1, "display_name": "Toronto", "lat": "43.7", "lon": "-79.4"}
+    ]
+    requests_get = mocker.patch("app.http_client.get", return_value=response)
+    merger = PlaceSearchMerger(None, OSMClient(base_url="https://test-osm.com/search"))
+
+    first = merger.search("toronto", "")
+    second = merger.search("Toronto", "")
+
+    assert second == first
+    assert requests_get.call_count == 1
+
+
+def describe_get_longest_prefix():
+    def returns_the_longest_cached_prefix(place):
+        other = NormalizedPlace(**{**place.__dict__, "id": "osm:2"})
+        geocoding_cache.set(GeocodingProvider.OSM, "tor", [place])
+        geocoding_cache.set(GeocodingProvider.OSM, "toron", [other])
+
+        assert geocoding_cache.get_longest_prefix(GeocodingProvider.OSM, "Toronto", 3) == [other]
+
+    def prefers_a_longer_shared_prefix_to_a_shorter_local_one(place):
+        other = NormalizedPlace(**{**place.__dict__, "id": "osm:2"})
+        cache = GeocodingCache()
+        cache.set(GeocodingProvider.OSM, "tor", [place])
+        # Cached by another process
+        GeocodingCache().set(GeocodingProvider.OSM, "toron", [other])
+
+        assert cache.get_longest_prefix(GeocodingProvider.OSM, "toronto", 3) == [other]
+
+    def ignores_the_query_itself_and_prefixes_below_the_minimum(place):
+        geocoding_cache.set(GeocodingProvider.OSM, "to", [place])
+        geocoding_cache.set(GeocodingProvider.OSM, "toronto", [place])
+
+        assert geocoding_cache.get_longest_prefix(GeocodingProvider.OSM, "toronto", 3) is None
+
+    def reads_the_shared_tier_once(place, mocker):
+        shared_get_many = mocker.spy(caches[CACHE_ALIAS], "get_many")
+        shared_get = mocker.spy(caches[CACHE_ALIAS], "get")
+
+        GeocodingCache().get_longest_prefix(GeocodingProvider.OSM, "toronto ontario", 3)
+
+        shared_get_many.assert_called_once()
+        shared_get.assert_not_called()
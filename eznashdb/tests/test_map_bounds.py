@@ -0,0 +1,90 @@
+"""Unit tests for map viewport parsing."""
+
+import pytest
+from django.http import QueryDict
+
+from eznashdb.map_bounds import GRID_CLUSTER_MAX_ZOOM, MapViewport
+from eznashdb.models import Shul
+
+
+def describe_from_params():
+    def parses_bbox_and_zoom():
+        viewport = MapViewport.from_params(QueryDict("bbox=-74.1,40.6,-73.9,40.8&zoom=12"))
+
+        assert viewport == MapViewport(-74.1, 40.6, -73.9, 40.8, zoom=12)
+
+    def zoom_is_optional():
+        viewport = MapViewport.from_params(QueryDict("bbox=-74.1,40.6,-73.9,40.8"))
+
+        assert viewport.zoom is None
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "",
+            "zoom=5",
+            "bbox=1,2,3",
+            "bbox=a,b,c,d",
+            "bbox=0,nan,1,1",
+            "bbox=0,10,1,5",  # south > north
+        ],
+    )
+    def returns_none_for_missing_or_invalid_bbox(query):
+        assert MapViewport.from_params(QueryDict(query)) is None
+
+
+def describe_with_margin():
+    def pads_each_edge_by_half_the_span():
+        viewport = MapViewport(0, 0, 10, 10).with_margin()
+
+        assert viewport == MapViewport(-5, -5, 15, 15)
+
+    def clamps_latitude_to_the_poles():
+        viewport = MapViewport(0, -80, 10, 80).with_margin()
+
+        assert (viewport.south, viewport.north) == (-90, 90)
+
+
+def describe_as_q():
+    @pytest.fixture
+    def shuls():
+        return {
+            "new_york": Shul.objects.create(name="NY", latitude=40.71, longitude=-74.0),
+            "jerusalem": Shul.objects.create(name="J", latitude=31.77, longitude=35.21),
+            "fiji": Shul.objects.create(name="F", latitude=-17.71, longitude=178.06),
+            "samoa": Shul.objects.create(name="S", latitude=-13.83, longitude=-171.76),
+        }
+
+    def _names_in(viewport):
+        return set(Shul.objects.filter(viewport.as_q()).values_list("name", flat=True))
+
+    def includes_only_shuls_in_the_box(shuls):
+        assert _names_in(MapViewport(-80, 35, -70, 45)) == {"NY"}
+
+    def handles_boxes_across_the_antimeridian(shuls):
+        assert _names_in(MapViewport(170, -20, 190, -10)) == {"F", "S"}
+
+    def handles_boxes_shifted_a_whole_world_over(shuls):
+        assert _names_in(MapViewport(-80 + 360, 35, -70 + 360, 45)) == {"NY"}
+
+    def ignores_longitude_when_the_box_spans_the_world(shuls):
+        assert _names_in(MapViewport(-200, -90, 200, 90)) == {"NY", "J", "F", "S"}
+
+
+def describe_grid_clustering():
+    @pytest.mark.parametrize(
+        ("zoom", "expected"),
+        [(None, False), (2, True), (GRID_CLUSTER_MAX_ZOOM, True), (GRID_CLUSTER_MAX_ZOOM + 1, False)],
+    )
+    def applies_at_or_below_the_max_zoom(zoom, expected):
+        assert MapViewport(0, 0, 1, 1, zoom=zoom).is_grid_clustered is expected
+
+    def cells_halve_with_each_zoom_level():
+        assert MapViewport(0, 0, 1, 1, zoom=3).grid_cell_size == (
+            2 * MapViewport(0, 0, 1, 1, zoom=4).grid_cell_size
+        )
+
+    def cells_stay_coarser_than_the_privacy_rounding():
+        viewport = MapViewport(0, 0, 1, 1, zoom=GRID_CLUSTER_MAX_ZOOM)
+
+        assert viewport.grid_cell_size > 0.01
@@ -0,0 +1,83 @@
+"""Unit tests for map marker tiling."""
+
+import pytest
+
+from eznashdb.map_tiles import (
+    MARKER_TILE_ZOOM,
+    get_tile_version,
+    invalidate_tiles_at,
+    is_valid_tile,
+    tile_containing,
+    tile_q,
+    tile_viewport,
+)
+from eznashdb.models import Shul
+
+
+def describe_is_valid_tile():
+    @pytest.mark.parametrize(
+        ("z", "x", "y"), [(0, 0, 0), (2, 3, 3), (MARKER_TILE_ZOOM, 0, 2**MARKER_TILE_ZOOM - 1)]
+    )
+    def accepts_tiles_in_range(z, x, y):
+        assert is_valid_tile(z, x, y)
+
+    @pytest.mark.parametrize(("z", "x", "y"), [(2, 4, 0), (2, 0, 4), (MARKER_TILE_ZOOM + 1, 0, 0)])
+    def rejects_tiles_out_of_range(z, x, y):
+        assert not is_valid_tile(z, x, y)
+
+
+def describe_tile_viewport():
+    def covers_the_world_at_zoom_0():
+        viewport = tile_viewport(0, 0, 0)
+
+        assert (viewport.west, viewport.south, viewport.east, viewport.north) == (-180, -90, 180, 90)
+
+    def splits_at_the_equator_and_meridian():
+        viewport = tile_viewport(1, 1, 0)
+
+        assert viewport.west == 0
+        assert viewport.south == pytest.approx(0)
+        assert viewport.zoom == 1
+
+
+def describe_tile_containing():
+    def finds_the_tile_for_a_point():
+        # New York at zoom 10
+        assert tile_containing(40.7128, -74.0060, 10) == (301, 385)
+
+    def clamps_points_past_the_mercator_limit():
+        assert tile_containing(89.9, 0, 2) == (2, 0)
+        assert tile_containing(-89.9, 0, 2) == (2, 3)
+
+    def wraps_longitudes_past_the_antimeridian():
+        assert tile_containing(0.5, 180.002, 2) == tile_containing(0.5, -179.998, 2)
+
+
+def describe_tile_q():
+    @pytest.mark.parametrize(
+        ("lat", "lon"),
+        [(40.7128, -74.006), (0, 0), (-33.87, 151.21), (89.9, 180.002), (-89.9, -180.002)],
+    )
+    def puts_each_shul_in_exactly_the_tile_containing_it(lat, lon):
+        shul = Shul.objects.create(name="S", latitude=1, longitude=1)
+        Shul.objects.filter(pk=shul.pk).update(display_lat=lat, display_lon=lon)
+
+        for z in range(4):
+            tiles = [
+                (x, y)
+                for x in range(2**z)
+                for y in range(2**z)
+                if Shul.objects.filter(tile_q(z, x, y), pk=shul.pk).exists()
+            ]
+            assert tiles == [tile_containing(lat, lon, z)]
+
+
+def describe_invalidate_tiles_at():
+    def bumps_the_tiles_containing_the_point_at_every_zoom():
+        versions = {z: get_tile_version(z, *tile_containing(10, 10, z)) for z in range(3)}
+        elsewhere = get_tile_version(2, *tile_containing(-10, -10, 2))
+
+        invalidate_tiles_at(10, 10)
+
+        assert all(get_tile_version(z, *tile_containing(10, 10, z)) > versions[z] for z in range(3))
+        assert get_tile_version(2, *tile_containing(-10, -10, 2)) == elsewhere
@@ -0,0 +1,157 @@
+"""Unit tests for the unfiltered map's marker bundle."""
+
+import gzip
+import json
+
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from eznashdb import marker_bundle
+from eznashdb.marker_bundle import (
+    KEEP_BUNDLES,
+    REBUILD_DELAY,
+    build_marker_bundle,
+    get_bundle_name,
+    get_bundle_path,
+)
+from eznashdb.models import Shul
+
+
+def describe_build_marker_bundle():
+    def writes_every_live_shuls_marker(test_shul):
+        deleted = Shul.objects.create(name="Deleted", latitude=1, longitude=1)
+        deleted.delete()
+
+        name = build_marker_bundle()
+
+        assert json.loads(get_bundle_path(name).read_bytes())["markers"] == [
+            [test_shul.pk, test_shul.display_lat, test_shul.display_lon, test_shul.cluster_key]
+        ]
+
+    def includes_a_sync_point_for_marker_deltas(test_shul):
+        before = timezone.now()
+
+        bundle = json.loads(get_bundle_path(build_marker_bundle()).read_bytes())
+
+        assert before <= parse_datetime(bundle["since"]) <= timezone.now()
+
+    def writes_a_gzipped_copy(test_shul):
+        name = build_marker_bundle()
+
+        gzipped = get_bundle_path(name, "gzip").read_bytes()
+        assert gzip.decompress(gzipped) == get_bundle_path(name).read_bytes()
+
+    def points_the_manifest_at_it(test_shul):
+        assert get_bundle_name() is None
+
+        name = build_marker_bundle()
+
+        assert get_bundle_name() == name
+
+    def names_it_by_content(test_shul):
+        name = build_marker_bundle()
+        Shul.objects.create(name="New", latitude=1, longitude=1)
+
+        assert build_marker_bundle() != name
+
+    def skips_rebuilding_unchanged_data(test_shul, django_assert_num_queries):
+        name = build_marker_bundle()
+
+        # Only the data version check
+        with django_assert_num_queries(2):
+            assert build_marker_bundle() == name
+
+    def keeps_only_the_latest_bundles(test_shul):
+        names = []
+        for i in range(KEEP_BUNDLES + 2):
+            Shul.objects.create(name=f"S{i}", latitude=1, longitude=1)
+            names.append(build_marker_bundle())
+
+        assert [bool(get_bundle_path(name)) for name in names] == [False] * 2 + [True] * KEEP_BUNDLES
+        assert get_bundle_path(names[0], "gzip") is None
+
+
+def describe_get_bundle_path():
+    def rejects_names_that_are_not_bundles(test_shul):
+        build_marker_bundle()
+
+        assert get_bundle_path("manifest.json") is None
+        assert get_bundle_path("../settings.py") is None
+
+
+def test_build_marker_bundle_command(test_shul):
+    call_command("build_marker_bundle")
+
+    assert get_bundle_path(get_bundle_name())
+
+
+def _run_scheduled_rebuild():
+    # conftest replaces the timer thread with a mock
+    delay, rebuild = marker_bundle._start_timer.call_args.args
+    assert delay == REBUILD_DELAY
+    rebuild()
+
+
+def describe_signal_hook():
+    def rebuilds_after_a_shul_change_commits(test_shul, django_capture_on_commit_callbacks):
+        name = build_marker_bundle()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            test_shul.delete()
+        _run_scheduled_rebuild()
+
+        assert get_bundle_name() != name
+        assert json.loads(get_bundle_path(get_bundle_name()).read_bytes())["markers"] == []
+
+    def rebuilds_off_the_request_thread(test_shul, django_capture_on_commit_callbacks, mocker):
+        build = mocker.patch("eznashdb.marker_bundle.build_marker_bundle")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            test_shul.rooms.create(name="a")
+
+        build.assert_not_called()
+        marker_bundle._start_timer.assert_called_once()
+
+    def rebuilds_once_per_burst_of_changes(test_shul, django_capture_on_commit_callbacks):
+        build_marker_bundle()
+
+        for name in ("a", "b"):
+            with django_capture_on_commit_callbacks(execute=True):
+                test_shul.rooms.create(name=name)
+
+        marker_bundle._start_timer.assert_called_once()
+
+    def schedules_changes_made_during_a_rebuild_again(test_shul, mocker):
+        marker_bundle.schedule_rebuild()
+        mocker.patch(
+            "eznashdb.marker_bundle.build_marker_bundle",
+            side_effect=lambda: marker_bundle.schedule_rebuild(),
+        )
+
+        _run_scheduled_rebuild()
+
+        assert marker_bundle._start_timer.call_count == 2
+
+
+def describe_get_bundle_name():
+    def reads_the_manifest_once_per_data_version(test_shul, mocker):
+        name = build_marker_bundle()
+        assert get_bundle_name() == name
+        read_manifest = mocker.spy(marker_bundle, "_read_manifest")
+
+        assert get_bundle_name() == name
+        read_manifest.assert_not_called()
+
+    def is_none_while_the_bundle_is_behind_the_data(test_shul, mocker):
+        build_marker_bundle()
+        assert get_bundle_name()
+
+        # Like a write from another process: no signal reaches this one
+        Shul.objects.create(name="New", latitude=1, longitude=1)
+        mocker.patch("eznashdb.marker_bundle.RECHECK_INTERVAL", 0)
+
+        assert get_bundle_name() is None
+        _run_scheduled_rebuild()
+        markers = json.loads(get_bundle_path(get_bundle_name()).read_bytes())["markers"]
+        assert len(markers) == 2
@@ -0,0 +1,128 @@
+"""Unit tests for the in-memory shul name index."""
+
+import threading
+
+import pytest
+from django.utils import timezone
+
+from eznashdb import name_index
+from eznashdb.models import Shul
+from eznashdb.name_index import ShulNameIndex, normalize, shul_name_index
+
+
+def _suggested_names(query, **kwargs):
+    return [suggestion.name for suggestion in shul_name_index.suggest(query, **kwargs)]
+
+
+@pytest.fixture
+def shul():
+    return Shul.objects.create(name="Young Israel", city="Toronto", latitude=1, longitude=1)
+
+
+def test_normalize_lowercases_and_strips_accents_and_punctuation():
+    assert normalize("  Congrégation  Beth-El ") == "congregation beth el"
+
+
+def describe_suggest():
+    def matches_the_start_of_any_word_of_the_name(shul):
+        assert _suggested_names("you") == ["Young Israel"]
+        assert _suggested_names("isr") == ["Young Israel"]
+        assert _suggested_names("young isr") == ["Young Israel"]
+        assert _suggested_names("srael") == []
+
+    def matches_the_city(shul):
+        assert _suggested_names("tor") == ["Young Israel"]
+
+    def ignores_case_and_accents(shul):
+        Shul.objects.create(name="Congrégation Shaar", latitude=1, longitude=1)
+
+        assert _suggested_names("CONGREG") == ["Congrégation Shaar"]
+        assert _suggested_names("YÖUNG") == ["Young Israel"]
+
+    def returns_suggestions_as_marker_rows_with_name_and_city(shul):
+        shul = Shul.objects.get(pk=shul.pk)
+
+        assert [s.as_row() for s in shul_name_index.suggest("young")] == [
+            [shul.pk, shul.display_lat, shul.display_lon, shul.cluster_key, "Young Israel", "Toronto"]
+        ]
+
+    def ranks_name_starts_then_name_words_then_cities():
+        Shul.objects.create(name="Chabad", city="Israel Town", latitude=1, longitude=1)
+        Shul.objects.create(name="Young Israel", latitude=1, longitude=1)
+        Shul.objects.create(name="Israel Center", latitude=1, longitude=1)
+        Shul.objects.create(name="Israel Anshei", latitude=1, longitude=1)
+
+        assert _suggested_names("israel") == ["Israel Anshei", "Israel Center", "Young Israel", "Chabad"]
+
+    def is_limited():
+        for i in range(5):
+            Shul.objects.create(name=f"Beth {i}", latitude=1, longitude=1)
+
+        assert _suggested_names("beth", limit=3) == ["Beth 0", "Beth 1", "Beth 2"]
+
+    def returns_nothing_for_a_blank_query(shul):
+        assert _suggested_names(" - ") == []
+
+    def makes_no_queries_once_built(shul, django_assert_num_queries):
+        shul_name_index.suggest("you")
+
+        with django_assert_num_queries(0):
+            assert _suggested_names("young") == ["Young Israel"]
+
+
+def describe_incremental_updates():
+    def picks_up_a_renamed_shul(shul):
+        assert _suggested_names("young") == ["Young Israel"]
+
+        shul.name = "Beth Jacob"
+        shul.save()
+
+        assert _suggested_names("young") == []
+        assert _suggested_names("jac") == ["Beth Jacob"]
+
+    def drops_soft_deleted_shuls_and_restores_undeleted_ones(shul):
+        shul.delete()
+        assert _suggested_names("young") == []
+
+        shul.undelete()
+        assert _suggested_names("young") == ["Young Israel"]
+
+    def only_rereads_dirty_shuls(shul, django_assert_num_queries):
+        shul_name_index.suggest("you")
+        Shul.objects.create(name="Beth Jacob", latitude=1, longitude=1)
+
+        # The new shul only - no full rebuild or version check
+        with django_assert_num_queries(1):
+            assert _suggested_names("jac") == ["Beth Jacob"]
+
+
+def describe_out_of_process_writes():
+    def are_caught_by_the_data_version_recheck(shul, mocker):
+        index = ShulNameIndex()
+        assert [s.name for s in index.suggest("young")] == ["Young Israel"]
+
+        # Like a write from another process: no signal reaches this index
+        Shul.objects.filter(pk=shul.pk).update(name="Beth Jacob", updated_at=timezone.now())
+        mocker.patch("eznashdb.name_index.RECHECK_INTERVAL", 0)
+
+        assert index.suggest("young") == []
+        assert [s.name for s in index.suggest("jacob")] == ["Beth Jacob"]
+
+
+def describe_locking():
+    def lets_shuls_be_marked_dirty_while_it_queries(shul, mocker):
+        index = ShulNameIndex()
+        marked = threading.Event()
+        load = name_index._load_suggestions
+
+        def load_while_marking(shuls):
+            # A save on another request thread, mid-query
+            thread = threading.Thread(target=lambda: (index.mark_dirty(shul.pk), marked.set()))
+            thread.start()
+            thread.join(timeout=5)
+            return load(shuls)
+
+        mocker.patch("eznashdb.name_index._load_suggestions", side_effect=load_while_marking)
+
+        assert [s.name for s in index.suggest("young")] == ["Young Israel"]
+        assert marked.is_set()
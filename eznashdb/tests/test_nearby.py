@@ -0,0 +1,87 @@
+"""Unit tests for distance-ordered nearby shul lookups."""
+
+import math
+
+import pytest
+
+from eznashdb.models import Shul
+from eznashdb.nearby import EARTH_RADIUS_M, bounding_box, shuls_near, similar_to
+
+# Metres per degree of latitude (and of longitude at the equator)
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def _shul_at(lat, lon, name="Shul"):
+    return Shul.objects.create(name=name, latitude=lat, longitude=lon)
+
+
+def describe_bounding_box():
+    def spans_the_radius_at_the_equator():
+        box = bounding_box(0, 0, 1000)
+
+        assert box.north == pytest.approx(1000 / METRES_PER_DEGREE)
+        assert box.east == pytest.approx(1000 / METRES_PER_DEGREE)
+
+    def widens_in_longitude_toward_the_poles():
+        assert bounding_box(60, 0, 1000).east == pytest.approx(
+            2 * bounding_box(0, 0, 1000).east, rel=1e-3
+        )
+
+    def takes_in_every_longitude_when_reaching_a_pole():
+        box = bounding_box(89.9999, 10, 1000)
+
+        assert (box.west, box.east, box.north) == (-180, 180, 90)
+
+
+def describe_shuls_near():
+    def returns_shuls_within_the_radius_nearest_first():
+        further = _shul_at(0, 100 / METRES_PER_DEGREE, "100m east")
+        nearer = _shul_at(50 / METRES_PER_DEGREE, 0, "50m north")
+        _shul_at(0, 200 / METRES_PER_DEGREE, "200m east")
+
+        shuls = list(shuls_near(0, 0, 150))
+
+        assert shuls == [nearer, further]
+        assert [round(shul.distance) for shul in shuls] == [50, 100]
+
+    def measures_in_metres_away_from_the_equator():
+        # 0.001 degrees of longitude is ~55m at 60 degrees north, ~111m at the equator
+        in_range = _shul_at(60, 0.001)
+
+        assert list(shuls_near(60, 0, 60)) == [in_range]
+        assert round(shuls_near(60, 0, 60).get().distance) == round(0.001 * METRES_PER_DEGREE / 2)
+
+    def finds_shuls_across_the_antimeridian():
+        across = _shul_at(0, -179.9995)
+
+        assert list(shuls_near(0, 179.9995, 150)) == [across]
+
+    def excludes_deleted_shuls():
+        _shul_at(0, 0).delete()
+
+        assert not shuls_near(0, 0, 150).exists()
+
+    def accepts_a_base_queryset():
+        shul = _shul_at(0, 0, "Keep")
+        _shul_at(0, 0, "Drop")
+
+        assert list(shuls_near(0, 0, 150, Shul.objects.filter(name="Keep"))) == [shul]
+
+
+def describe_similar_to():
+    def matches_similar_names():
+        shul = _shul_at(0, 0, "Congregation Beth Israel")
+        _shul_at(0, 0, "Young Israel of Midwood")
+
+        assert list(Shul.objects.filter(similar_to(name="Congregation Beth Israel Synagogue"))) == [shul]
+
+    def matches_similar_addresses():
+        shul = Shul.objects.create(name="A", address="123 Main Street", latitude=0, longitude=0)
+        Shul.objects.create(name="B", address="9 Ocean Parkway", latitude=0, longitude=0)
+
+        assert list(Shul.objects.filter(similar_to(address="123 Main St"))) == [shul]
+
+    def matches_nothing_without_a_name_or_address():
+        _shul_at(0, 0, "Shul")
+
+        assert not Shul.objects.filter(similar_to(name=" ", address="")).exists()
@@ -0,0 +1,64 @@
+"""Unit tests for shul name/city/address search."""
+
+from eznashdb.models import Shul
+from eznashdb.shul_search import MIN_QUERY_LENGTH, prefix_search_query, search_shuls
+
+
+def _shul(name, city="", address=""):
+    return Shul.objects.create(name=name, city=city, address=address, latitude=1, longitude=1)
+
+
+def _search(query):
+    return list(search_shuls(Shul.objects.all(), query))
+
+
+def describe_prefix_search_query():
+    def is_none_without_terms():
+        assert prefix_search_query(" &! ") is None
+
+
+def describe_search_shuls():
+    def matches_names_by_word_prefix():
+        shul = _shul("Congregation Beth Israel")
+        _shul("Chabad House")
+
+        assert _search("beth isr") == [shul]
+
+    def matches_cities_and_addresses():
+        in_city = _shul("A", city="Teaneck")
+        on_street = _shul("B", address="12 Cedar Lane")
+
+        assert _search("teaneck") == [in_city]
+        assert _search("cedar") == [on_street]
+
+    def tolerates_misspellings():
+        shul = _shul("Young Israel of Midwood")
+
+        assert _search("midwod") == [shul]
+
+    def ranks_name_matches_above_address_matches():
+        by_address = _shul("Chabad House", address="1 Jerusalem Road")
+        by_name = _shul("Jerusalem Center")
+
+        assert _search("jerusalem") == [by_name, by_address]
+
+    def excludes_deleted_shuls():
+        _shul("Beth Israel").delete()
+
+        assert _search("beth israel") == []
+
+    def searches_within_the_given_queryset():
+        keep = _shul("Beth Israel", city="Boston")
+        _shul("Beth Israel", city="Denver")
+
+        assert list(search_shuls(Shul.objects.filter(city="Boston"), "beth israel")) == [keep]
+
+    def treats_tsquery_syntax_as_plain_text():
+        shul = _shul("Beth Israel")
+
+        assert _search("beth & !isr:* |") == [shul]
+
+    def ignores_short_queries():
+        _shul("B")
+
+        assert _search("b" * (MIN_QUERY_LENGTH - 1)) == []
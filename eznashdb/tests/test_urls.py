@@ -4,8 +4,15 @@ from django.urls import resolve, reverse
 from eznashdb.views import (
     AddressLookupView,
     CreateUpdateShulView,
+    ShulClusterPopupBatchView,
     ShulClusterPopupView,
+    ShulMarkerBundleView,
+    ShulMarkerDeltaView,
+    ShulMarkersView,
+    ShulNameSuggestView,
+    ShulSearchView,
     ShulsFilterView,
+    ShulTileView,
 )
 
 
@@ -13,7 +20,19 @@ from eznashdb.views import (
     ("view_name", "view", "args", "kwargs"),
     [
         ("eznashdb:shuls", ShulsFilterView, [], {}),
+        ("eznashdb:shul_markers", ShulMarkersView, [], {}),
+        ("eznashdb:shul_marker_delta", ShulMarkerDeltaView, [], {}),
+        ("eznashdb:shul_search", ShulSearchView, [], {}),
+        ("eznashdb:shul_name_suggest", ShulNameSuggestView, [], {}),
+        (
+            "eznashdb:shul_marker_bundle",
+            ShulMarkerBundleView,
+            [],
+            {"name": "shul-markers.0123456789ab.json"},
+        ),
+        ("eznashdb:shul_tile", ShulTileView, [], {"z": 3, "x": 1, "y": 2}),
         ("eznashdb:cluster_popup", ShulClusterPopupView, [], {}),
+        ("eznashdb:cluster_popups", ShulClusterPopupBatchView, [], {}),
         ("eznashdb:create_shul", CreateUpdateShulView, [], {}),
         ("eznashdb:update_shul", CreateUpdateShulView, [], {"pk": 1}),
         ("eznashdb:address_lookup", AddressLookupView, [], {}),
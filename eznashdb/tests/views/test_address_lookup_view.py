@@ -1,5 +1,6 @@
 from datetime import date
 
+import pytest
 from django.test import override_settings
 from django.urls import reverse
 from waffle.testutils import override_flag
@@ -66,26 +67,29 @@ def test_returns_empty_list_when_search_returns_no_results(client, mocker, test_
 
 
 def describe_google_places_integration():
+    @pytest.fixture
+    def google_responds(mocker):
+        google_response = mocker.Mock(status_code=200)
+        google_response.json.return_value = {
+            "suggestions": [
+                {
+                    "placePrediction": {
+                        "placeId": "ChIJ123",
+                        "text": {"text": "Young Israel of Hollywood"},
+                    }
+                }
+            ]
+        }
+        osm_response = mocker.Mock()
+        osm_response.json.return_value = []
+        mocker.patch("app.http_client.get", return_value=osm_response)
+        return mocker.patch("app.http_client.post", return_value=google_response)
+
     @override_flag("google_places_api", active=True)
     @override_settings(GOOGLE_PLACES_API_KEY="test-key")
-    def uses_google_when_flag_enabled(client, test_user, mocker):
+    def uses_google_when_flag_enabled(client, test_user, google_responds):
         client.force_login(test_user)
 
-        # Mock PlaceSearchMerger
-        mock_merger = mocker.patch("eznashdb.views.PlaceSearchMerger")
-        mock_merger_instance = mock_merger.return_value
-        mock_merger_instance.search.return_value = [
-            NormalizedPlace(
-                id="google:ChIJ123",
-                provider=GeocodingProvider.GOOGLE,
-                name="Young Israel of Hollywood",
-                display_address="",
-                latitude=None,
-                longitude=None,
-                raw_data={"place_id": "ChIJ123"},
-            )
-        ]
-
         url = reverse("eznashdb:address_lookup")
         response = client.get(url, {"q": "young israel", "session_token": "test-token"})
 
@@ -102,3 +106,16 @@ def describe_google_places_integration():
 
         user_usage = GooglePlacesUserUsage.objects.get(user=test_user, date=date.today())
         assert user_usage.autocomplete_requests == 1
+
+    @override_flag("google_places_api", active=True)
+    @override_settings(GOOGLE_PLACES_API_KEY="test-key")
+    def does_not_count_cached_lookups_against_the_budget(client, test_user, google_responds):
+        client.force_login(test_user)
+        url = reverse("eznashdb:address_lookup")
+
+        client.get(url, {"q": "young israel", "session_token": "first"})
+        response = client.get(url, {"q": "Young  Israel", "session_token": "second"})
+
+        assert response.json()["results"][0]["place_id"] == "ChIJ123"
+        assert google_responds.call_count == 1
+        assert GooglePlacesUsage.objects.get(date=date.today()).autocomplete_requests == 1
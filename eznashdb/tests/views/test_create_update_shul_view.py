@@ -1,11 +1,14 @@
+from datetime import timedelta
 from functools import partial
 
 from bs4 import BeautifulSoup
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 
 from eznashdb.constants import JUST_SAVED_SHUL_SESSION_KEY
-from eznashdb.models import Shul
+from eznashdb.facet_index import shul_facet_index
+from eznashdb.models import Room, Shul
 from eznashdb.views import CreateUpdateShulView
 from users.models import User
 
@@ -149,6 +152,82 @@ def describe_update():
         test_shul.refresh_from_db()
         assert test_shul.rooms.count() == 2
 
+    def saves_room_edits_removals_and_additions(client, test_shul, test_user):
+        unchanged = test_shul.rooms.create(name="Unchanged", relative_size="M", see_hear_score="1")
+        edited = test_shul.rooms.create(name="Edited", relative_size="M", see_hear_score="1")
+        removed = test_shul.rooms.create(name="Removed", relative_size="M", see_hear_score="1")
+        long_ago = timezone.now() - timedelta(days=30)
+        Room.objects.filter(shul=test_shul).update(updated_at=long_ago)
+
+        def existing_room_fields(room_index, room, **changes):
+            fields = {
+                **get_room_fields(room_index),
+                f"rooms-{room_index}-id": str(room.pk),
+                f"rooms-{room_index}-shul": str(test_shul.pk),
+                f"rooms-{room_index}-name": room.name,
+            }
+            fields.update({f"rooms-{room_index}-{key}": value for key, value in changes.items()})
+            return fields
+
+        client.force_login(test_user)
+        client.post(
+            reverse("eznashdb:update_shul", kwargs={"pk": test_shul.pk}),
+            data={
+                "name": test_shul.name,
+                "address": test_shul.address,
+                "latitude": test_shul.latitude,
+                "longitude": test_shul.longitude,
+                "check_nearby_shuls": "false",
+                **existing_room_fields(0, unchanged),
+                **existing_room_fields(1, edited, name="Renamed", relative_size="L"),
+                **existing_room_fields(2, removed, DELETE="on"),
+                **get_room_fields(room_index=3),
+                **get_room_fs_metadata_fields(initial_forms=3, total_forms=4),
+            },
+        )
+
+        rooms = {room.name: room for room in test_shul.rooms.all()}
+        assert set(rooms) == {"Unchanged", "Renamed", "test room 1"}
+        assert rooms["Renamed"].pk == edited.pk
+        assert rooms["Renamed"].relative_size == "L"
+        # Only rooms that changed are stamped as updated
+        assert rooms["Unchanged"].updated_at == long_ago
+        assert rooms["Renamed"].updated_at > long_ago
+
+    def updates_the_caches_once_however_many_rooms_change(client, test_shul, test_user, mocker):
+        rooms = [test_shul.rooms.create(name=f"Room {i}") for i in range(3)]
+        bump_fragment_version = mocker.patch("eznashdb.signals.bump_fragment_version")
+        mark_dirty = mocker.spy(shul_facet_index, "mark_dirty")
+
+        client.force_login(test_user)
+        client.post(
+            reverse("eznashdb:update_shul", kwargs={"pk": test_shul.pk}),
+            data={
+                "name": test_shul.name,
+                "address": test_shul.address,
+                "latitude": test_shul.latitude,
+                "longitude": test_shul.longitude,
+                "check_nearby_shuls": "false",
+                **{
+                    key: value
+                    for i, room in enumerate(rooms)
+                    for key, value in {
+                        **get_room_fields(i),
+                        f"rooms-{i}-id": str(room.pk),
+                        f"rooms-{i}-DELETE": "on",
+                    }.items()
+                },
+                **get_room_fields(room_index=3),
+                **get_room_fields(room_index=4),
+                **get_room_fs_metadata_fields(initial_forms=3, total_forms=5),
+            },
+        )
+
+        assert test_shul.rooms.count() == 2
+        # Once for the shul's own save and once for all of its rooms
+        assert bump_fragment_version.call_count == 2
+        assert mark_dirty.call_count == 2
+
     def redirects_to_shuls_view(client, test_shul, test_user):
         client.force_login(test_user)
         response = client.post(
@@ -212,6 +291,57 @@ def test_shows_nearby_modal_when_check_nearby_shuls_true(client, test_user):
     assert nearby_shul_2.name in str(soup)
 
 
+def test_nearby_modal_lists_nearest_shuls_first(client, test_user):
+    client.force_login(test_user)
+    Shul.objects.create(name="Further Shul", latitude=0.001, longitude=0)
+    Shul.objects.create(name="Nearer Shul", latitude=0, longitude=0.0005)
+
+    response = client.post(
+        reverse("eznashdb:create_shul"),
+        data={
+            "name": "New Test Shul",
+            "latitude": "0.0",
+            "longitude": "0.0",
+            "address": "123 Test St",
+            "check_nearby_shuls": "true",
+            **get_room_fields(room_index=0),
+            **get_room_fs_metadata_fields(total_forms=1),
+        },
+        headers={"HX-Request": "true"},
+    )
+
+    items = BeautifulSoup(response.content, features="html.parser").select("#nearby-shuls-modal li")
+    assert [item.span.get_text(" ", strip=True) for item in items] == [
+        "Nearer Shul 56 m away",
+        "Further Shul 111 m away",
+    ]
+
+
+def test_nearby_modal_lists_shuls_with_a_similar_name_further_away(client, test_user):
+    client.force_login(test_user)
+    # ~1km away - past the plain nearby radius
+    Shul.objects.create(name="Beth Israel Synagogue", latitude=0.009, longitude=0)
+    Shul.objects.create(name="Chabad House", latitude=0.009, longitude=0)
+
+    response = client.post(
+        reverse("eznashdb:create_shul"),
+        data={
+            "name": "Beth Israel",
+            "latitude": "0.0",
+            "longitude": "0.0",
+            "address": "123 Test St",
+            "check_nearby_shuls": "true",
+            **get_room_fields(room_index=0),
+            **get_room_fs_metadata_fields(total_forms=1),
+        },
+        headers={"HX-Request": "true"},
+    )
+
+    modal = BeautifulSoup(response.content, features="html.parser").find(id="nearby-shuls-modal")
+    assert "Beth Israel Synagogue" in modal.get_text()
+    assert "Chabad House" not in modal.get_text()
+
+
 def test_skips_nearby_modal_when_check_nearby_shuls_false(client, test_user):
     client.force_login(test_user)
     # Create some nearby shuls
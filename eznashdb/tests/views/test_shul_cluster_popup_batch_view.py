@@ -0,0 +1,133 @@
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import AnonymousUser
+
+from eznashdb.enums import RelativeSize
+from eznashdb.models import Shul
+from eznashdb.views import ShulClusterPopupBatchView, ShulClusterPopupView
+
+
+@pytest.fixture
+def popup_GET(rf_GET, test_user):
+    def _get(view_name="eznashdb:cluster_popups", user=test_user, **query_params):
+        request = rf_GET(view_name, query_params=query_params)
+        request.user = user
+        return request
+
+    return _get
+
+
+@pytest.fixture
+def get_popups(popup_GET):
+    def _get(cluster_keys, **kwargs):
+        response = ShulClusterPopupBatchView.as_view()(popup_GET(cluster_key=cluster_keys, **kwargs))
+        return json.loads(response.content)["popups"]
+
+    return _get
+
+
+@pytest.fixture
+def new_york():
+    return [
+        Shul.objects.create(name=f"New York {i}", latitude=40.7128, longitude=-74.0060) for i in range(2)
+    ]
+
+
+@pytest.fixture
+def jerusalem():
+    return Shul.objects.create(name="Jerusalem", latitude=31.7683, longitude=35.2137)
+
+
+def test_returns_each_clusters_popup(get_popups, new_york, jerusalem):
+    popups = get_popups([new_york[0].cluster_key, jerusalem.cluster_key])
+
+    assert set(popups) == {new_york[0].cluster_key, jerusalem.cluster_key}
+    assert "2 Shuls in this area" in popups[new_york[0].cluster_key]
+    assert jerusalem.name in popups[jerusalem.cluster_key]
+    assert new_york[0].name not in popups[jerusalem.cluster_key]
+
+
+def test_renders_the_same_popup_as_the_single_view(popup_GET, get_popups, new_york):
+    cluster_key = new_york[0].cluster_key
+
+    popups = get_popups([cluster_key])
+    single = ShulClusterPopupView.as_view()(popup_GET("eznashdb:cluster_popup", cluster_key=cluster_key))
+
+    assert popups[cluster_key] == single.content.decode()
+
+
+@pytest.mark.usefixtures("_data_version_checked")
+def test_renders_all_popups_from_one_query_and_rooms_prefetch(
+    get_popups, new_york, jerusalem, django_assert_num_queries
+):
+    for shul in [*new_york, jerusalem]:
+        shul.rooms.create(relative_size=RelativeSize.L)
+
+    with django_assert_num_queries(2):
+        get_popups([new_york[0].cluster_key, jerusalem.cluster_key])
+
+
+def test_only_renders_uncached_popups(popup_GET, get_popups, new_york, jerusalem, mocker):
+    ShulClusterPopupView.as_view()(
+        popup_GET("eznashdb:cluster_popup", cluster_key=jerusalem.cluster_key)
+    )
+    render = mocker.spy(ShulClusterPopupBatchView, "_render_popup")
+
+    get_popups([new_york[0].cluster_key, jerusalem.cluster_key])
+
+    assert render.call_count == 1
+
+
+def test_shares_the_popups_opened_at_a_selected_shul(
+    popup_GET, get_popups, new_york, django_assert_num_queries
+):
+    cluster_key = new_york[0].cluster_key
+    ShulClusterPopupView.as_view()(
+        popup_GET("eznashdb:cluster_popup", cluster_key=cluster_key, selected_shul=new_york[0].pk)
+    )
+
+    with django_assert_num_queries(0):
+        popups = get_popups([cluster_key])
+
+    soup = BeautifulSoup(popups[cluster_key], features="html.parser")
+
+    assert not soup.select(".accordion-collapse.show")
+
+
+def test_applies_the_filters(get_popups, new_york):
+    new_york[0].rooms.create(relative_size=RelativeSize.L)
+
+    popup = get_popups([new_york[0].cluster_key], rooms__relative_size=RelativeSize.L)[
+        new_york[0].cluster_key
+    ]
+
+    assert new_york[0].name in popup
+    assert new_york[1].name not in popup
+
+
+def test_shows_anonymous_users_one_shul_per_cluster(get_popups, new_york, settings):
+    settings.DEBUG = False
+
+    popup = get_popups([new_york[0].cluster_key], user=AnonymousUser())[new_york[0].cluster_key]
+
+    soup = BeautifulSoup(popup, features="html.parser")
+    assert len(soup.find_all(class_="text-blur")) == 1
+    assert soup.find(attrs={"data-signin-link": True})["href"] == "/accounts/google/login/"
+
+
+def test_unknown_cluster_renders_an_empty_state(get_popups):
+    assert "no longer available" in get_popups(["0.0_0.0"])["0.0_0.0"]
+
+
+def describe_bad_requests():
+    def without_a_cluster_key(popup_GET):
+        assert ShulClusterPopupBatchView.as_view()(popup_GET()).status_code == 400
+
+    def with_too_many_cluster_keys(popup_GET):
+        cluster_keys = [f"{i}_{i}" for i in range(ShulClusterPopupBatchView.MAX_CLUSTERS + 1)]
+
+        response = ShulClusterPopupBatchView.as_view()(popup_GET(cluster_key=cluster_keys))
+
+        assert response.status_code == 400
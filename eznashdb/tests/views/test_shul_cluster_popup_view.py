@@ -166,21 +166,21 @@ def describe_exclude_param():
         assert test_shul.name in response.content.decode()
 
 
-def test_expands_only_the_selected_shul(popup_GET):
+def test_renders_several_shuls_collapsed_with_their_ids(popup_GET):
     first = Shul.objects.create(name="First", latitude=40.7128, longitude=-74.0060)
     second = Shul.objects.create(name="Second", latitude=40.7129, longitude=-74.0061)
 
     soup = BeautifulSoup(
-        ShulClusterPopupView.as_view()(
-            popup_GET(cluster_key=first.cluster_key, selected_shul=str(first.pk))
-        ).content.decode(),
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=first.cluster_key)).content.decode(),
         features="html.parser",
     )
 
-    assert "show" in soup.find(id=f"shul-{first.pk}")["class"]
-    assert "show" not in soup.find(id=f"shul-{second.pk}")["class"]
+    assert not soup.select(".accordion-collapse.show")
+    items = soup.select("[data-shul-id]")
+    assert [item["data-shul-id"] for item in items] == [str(first.pk), str(second.pk)]
 
 
+@pytest.mark.usefixtures("_data_version_checked")
 def test_query_count_does_not_scale_with_room_count(popup_GET, django_assert_num_queries):
     """
     Locks in the rooms prefetch (shul.rooms.all|length / {% if shul.rooms.all %}
@@ -202,6 +202,18 @@ def test_query_count_does_not_scale_with_room_count(popup_GET, django_assert_num
         ShulClusterPopupView.as_view()(popup_GET(cluster_key=many_rooms.cluster_key))
 
 
+@pytest.mark.usefixtures("_data_version_checked")
+def test_finds_members_by_the_stored_cluster_key(popup_GET, test_shul):
+    """Membership comes from the indexed column, not a scan of every shul."""
+    with CaptureQueriesContext(connection) as queries:
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+    shul_query = queries.captured_queries[0]["sql"]
+    assert '"eznashdb_shul"."cluster_key" =' in shul_query
+    # Shuls, then their rooms
+    assert len(queries.captured_queries) == 2
+
+
 def describe_authenticated_users():
     def test_sees_full_membership_and_real_count(popup_GET):
         first = Shul.objects.create(name="First", latitude=40.7128, longitude=-74.0060)
@@ -279,3 +291,86 @@ def describe_anonymous_users():
         response = ShulClusterPopupView.as_view()(popup_GET(cluster_key="0.0_0.0", user=AnonymousUser()))
 
         assert "no longer available" in response.content.decode().lower()
+
+
+def describe_popup_cache():
+    def serves_a_repeat_request_without_querying(popup_GET, test_shul, django_assert_num_queries):
+        first = ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        with django_assert_num_queries(0):
+            second = ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        assert second.content == first.content
+
+    def is_refreshed_after_a_shul_change(popup_GET, test_shul):
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+        test_shul.name = "Renamed Shul"
+        test_shul.save()
+
+        content = ShulClusterPopupView.as_view()(
+            popup_GET(cluster_key=test_shul.cluster_key)
+        ).content.decode()
+
+        assert "Renamed Shul" in content
+
+    def is_not_shared_between_signed_in_and_anonymous_users(popup_GET, test_shul):
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        content = ShulClusterPopupView.as_view()(
+            popup_GET(cluster_key=test_shul.cluster_key, user=AnonymousUser())
+        ).content.decode()
+
+        assert test_shul.name not in content
+
+    def is_keyed_by_the_filters(popup_GET, test_shul):
+        test_shul.rooms.create(relative_size=RelativeSize.S)
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        content = ShulClusterPopupView.as_view()(
+            popup_GET(cluster_key=test_shul.cluster_key, rooms__relative_size=RelativeSize.L)
+        ).content.decode()
+
+        assert test_shul.name not in content
+
+    def ignores_the_selected_shul(popup_GET, django_assert_num_queries):
+        first = Shul.objects.create(name="First", latitude=40.7128, longitude=-74.0060)
+        second = Shul.objects.create(name="Second", latitude=40.7128, longitude=-74.0060)
+        content = ShulClusterPopupView.as_view()(popup_GET(cluster_key=first.cluster_key)).content
+
+        with django_assert_num_queries(0):
+            response = ShulClusterPopupView.as_view()(
+                popup_GET(cluster_key=first.cluster_key, selected_shul=second.pk)
+            )
+
+        assert response.content == content
+
+    def ignores_params_other_than_the_filters(popup_GET, test_shul, django_assert_num_queries):
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        with django_assert_num_queries(0):
+            ShulClusterPopupView.as_view()(
+                popup_GET(cluster_key=test_shul.cluster_key, lat="40.7", zoom="12")
+            )
+
+    def is_keyed_by_the_excluded_shul(popup_GET, test_shul):
+        ShulClusterPopupView.as_view()(popup_GET(cluster_key=test_shul.cluster_key))
+
+        content = ShulClusterPopupView.as_view()(
+            popup_GET(cluster_key=test_shul.cluster_key, exclude=test_shul.pk)
+        ).content.decode()
+
+        assert test_shul.name not in content
+
+    def fills_in_the_login_url_per_request(popup_GET, test_shul, settings, mocker):
+        settings.DEBUG = True
+        ShulClusterPopupView.as_view()(
+            popup_GET(cluster_key=test_shul.cluster_key, user=AnonymousUser())
+        )
+        request = popup_GET(cluster_key=test_shul.cluster_key, user=AnonymousUser())
+        mocker.patch.object(request, "get_host", return_value="localhost:8000")
+
+        content = ShulClusterPopupView.as_view()(request).content.decode()
+
+        link = BeautifulSoup(content, features="html.parser").find(attrs={"data-signin-link": True})
+        assert link["href"] == "/accounts/google/login/"
+        assert ShulClusterPopupView.LOGIN_URL_PLACEHOLDER not in content
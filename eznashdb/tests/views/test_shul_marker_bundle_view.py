@@ -0,0 +1,48 @@
+import gzip
+import json
+
+import pytest
+from django.http import Http404
+
+from eznashdb.marker_bundle import build_marker_bundle
+from eznashdb.views import ShulMarkerBundleView
+
+
+@pytest.fixture
+def bundle_GET(rf):
+    def _get(name, accept_encoding=""):
+        request = rf.get(f"/shuls/markers/bundles/{name}", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return ShulMarkerBundleView.as_view()(request, name=name)
+
+    return _get
+
+
+def test_serves_the_bundle(bundle_GET, test_shul):
+    response = bundle_GET(build_marker_bundle())
+
+    assert response["Content-Type"] == "application/json"
+    assert "Content-Encoding" not in response
+    assert json.loads(b"".join(response.streaming_content))["markers"][0][0] == test_shul.pk
+
+
+def test_serves_the_gzipped_copy_when_accepted(bundle_GET, test_shul):
+    response = bundle_GET(build_marker_bundle(), accept_encoding="deflate, gzip;q=1.0")
+
+    assert response["Content-Encoding"] == "gzip"
+    content = gzip.decompress(b"".join(response.streaming_content))
+    assert json.loads(content)["markers"][0][0] == test_shul.pk
+
+
+def test_can_be_cached_forever(bundle_GET, test_shul):
+    response = bundle_GET(build_marker_bundle())
+
+    assert "immutable" in response["Cache-Control"]
+    assert "public" in response["Cache-Control"]
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_unknown_bundles_are_not_found(bundle_GET, test_shul):
+    build_marker_bundle()
+
+    with pytest.raises(Http404):
+        bundle_GET("shul-markers.000000000000.json")
@@ -0,0 +1,192 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from eznashdb.enums import RelativeSize
+from eznashdb.models import Room, Shul
+from eznashdb.views import ShulMarkerDeltaView
+
+
+@pytest.fixture
+def delta_GET(rf_GET):
+    def _get(since, **query_params):
+        if since is not None:
+            query_params["since"] = since.isoformat()
+        request = rf_GET("eznashdb:shul_marker_delta", query_params=query_params)
+        return json.loads(ShulMarkerDeltaView.as_view()(request).content)
+
+    return _get
+
+
+@pytest.fixture
+def last_sync():
+    return timezone.now() - timedelta(minutes=10)
+
+
+def _age(*shuls, by=timedelta(hours=1)):
+    """Backdate shuls (and their rooms) to before the last sync."""
+    then = timezone.now() - by
+    ids = [shul.pk for shul in shuls]
+    Shul.all_objects.filter(pk__in=ids).update(updated_at=then)
+    Room.objects.filter(shul__in=ids).update(updated_at=then)
+
+
+def _marker(shul):
+    shul = Shul.all_objects.get(pk=shul.pk)
+    return [shul.pk, shul.display_lat, shul.display_lon, shul.cluster_key]
+
+
+def describe_reset():
+    def without_a_sync_point(delta_GET):
+        assert delta_GET(None) == {"reset": True}
+
+    def for_an_invalid_sync_point(rf_GET):
+        request = rf_GET("eznashdb:shul_marker_delta", query_params={"since": "yesterday"})
+
+        assert json.loads(ShulMarkerDeltaView.as_view()(request).content) == {"reset": True}
+
+    def for_an_old_sync_point(delta_GET):
+        assert delta_GET(timezone.now() - ShulMarkerDeltaView.MAX_SYNC_AGE * 2) == {"reset": True}
+
+    def for_too_many_changes(delta_GET, last_sync, monkeypatch):
+        monkeypatch.setattr(ShulMarkerDeltaView, "MAX_CHANGES", 2)
+        for i in range(3):
+            Shul.objects.create(name=f"S{i}", latitude=1, longitude=1)
+
+        assert delta_GET(last_sync) == {"reset": True}
+
+
+def test_returns_only_shuls_changed_since_the_sync_point(delta_GET, last_sync):
+    unchanged = Shul.objects.create(name="Unchanged", latitude=1, longitude=1)
+    _age(unchanged)
+    added = Shul.objects.create(name="Added", latitude=2, longitude=2)
+
+    data = delta_GET(last_sync)
+
+    assert data["markers"] == [_marker(added)]
+    assert data["removed"] == []
+
+
+def test_returns_moved_shuls(delta_GET, last_sync):
+    shul = Shul.objects.create(name="Moved", latitude=1, longitude=1)
+    _age(shul)
+    shul.latitude = 10
+    shul.save()
+
+    assert delta_GET(last_sync)["markers"] == [_marker(shul)]
+
+
+def test_removes_soft_deleted_shuls(delta_GET, last_sync):
+    shul = Shul.objects.create(name="Deleted", latitude=1, longitude=1)
+    _age(shul)
+    shul.delete()
+
+    data = delta_GET(last_sync)
+
+    assert data["markers"] == []
+    assert data["removed"] == [shul.pk]
+
+
+def test_removes_changed_shuls_no_longer_matching_the_filters(delta_GET, last_sync):
+    room = Shul.objects.create(name="Shul", latitude=1, longitude=1).rooms.create(
+        relative_size=RelativeSize.L
+    )
+    _age(room.shul)
+    room.relative_size = RelativeSize.S
+    room.save()
+
+    data = delta_GET(last_sync, rooms__relative_size=RelativeSize.L)
+
+    assert data["markers"] == []
+    assert data["removed"] == [room.shul.pk]
+
+
+def test_includes_shuls_whose_rooms_changed(delta_GET, last_sync):
+    room = Shul.objects.create(name="Shul", latitude=1, longitude=1).rooms.create(
+        relative_size=RelativeSize.S
+    )
+    _age(room.shul)
+    room.relative_size = RelativeSize.L
+    room.save()
+
+    assert delta_GET(last_sync, rooms__relative_size=RelativeSize.L)["markers"] == [_marker(room.shul)]
+
+
+def test_excludes_the_exact_pin(delta_GET, last_sync):
+    shul = Shul.objects.create(name="Pinned", latitude=1, longitude=1)
+
+    data = delta_GET(last_sync, exclude=shul.pk)
+
+    assert data["markers"] == []
+    assert data["removed"] == [shul.pk]
+
+
+def test_looks_back_past_the_sync_point_for_late_commits(delta_GET, last_sync):
+    shul = Shul.objects.create(name="Late", latitude=1, longitude=1)
+    _age(shul, by=timedelta(minutes=10) + ShulMarkerDeltaView.SYNC_OVERLAP / 2)
+
+    assert delta_GET(last_sync)["markers"] == [_marker(shul)]
+
+
+def test_returns_the_next_sync_point(delta_GET, last_sync):
+    before = timezone.now()
+
+    since = parse_datetime(delta_GET(last_sync)["since"])
+
+    assert before <= since <= timezone.now()
+
+
+def describe_filter_change():
+    @pytest.fixture
+    def rooms():
+        small = Shul.objects.create(name="Small", latitude=1, longitude=1).rooms.create(
+            relative_size=RelativeSize.S
+        )
+        large = Shul.objects.create(name="Large", latitude=2, longitude=2).rooms.create(
+            relative_size=RelativeSize.L
+        )
+        _age(small.shul, large.shul)
+        return small, large
+
+    def swaps_the_markers_between_the_filter_sets(delta_GET, last_sync, rooms):
+        small, large = rooms
+
+        data = delta_GET(
+            last_sync,
+            rooms__relative_size=RelativeSize.L,
+            previous=f"rooms__relative_size={RelativeSize.S}",
+        )
+
+        assert data["markers"] == [_marker(large.shul)]
+        assert data["removed"] == [small.shul.pk]
+
+    def adds_the_markers_a_cleared_filter_let_in(delta_GET, last_sync, rooms):
+        small, large = rooms
+
+        data = delta_GET(last_sync, previous=f"rooms__relative_size={RelativeSize.L}")
+
+        assert data["markers"] == [_marker(small.shul)]
+        assert data["removed"] == []
+
+    def includes_changes_since_the_sync_point(delta_GET, last_sync, rooms):
+        small, large = rooms
+        large.shul.latitude = 10
+        large.shul.save()
+
+        data = delta_GET(last_sync, previous=f"rooms__relative_size={RelativeSize.L}")
+
+        assert data["markers"] == [_marker(small.shul), _marker(large.shul)]
+
+    def resets_for_too_many_changes(delta_GET, last_sync, rooms, monkeypatch):
+        monkeypatch.setattr(ShulMarkerDeltaView, "MAX_CHANGES", 1)
+
+        data = delta_GET(
+            last_sync,
+            rooms__relative_size=RelativeSize.L,
+            previous=f"rooms__relative_size={RelativeSize.S}",
+        )
+
+        assert data == {"reset": True}
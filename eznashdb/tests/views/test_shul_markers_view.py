@@ -0,0 +1,211 @@
+import json
+
+import pytest
+
+from eznashdb.enums import RelativeSize
+from eznashdb.map_bounds import GRID_CLUSTER_MAX_ZOOM
+from eznashdb.models import Shul
+from eznashdb.views import ShulMarkersView
+
+
+@pytest.fixture
+def markers_GET(rf_GET):
+    def _get(**query_params):
+        request = rf_GET("eznashdb:shul_markers", query_params=query_params)
+        response = ShulMarkersView.as_view()(request)
+        assert response.status_code == 200
+        return json.loads(response.content)["markers"]
+
+    return _get
+
+
+def test_returns_compact_marker_rows(markers_GET, test_shul):
+    markers = markers_GET()
+
+    assert markers == [
+        [test_shul.pk, test_shul.display_lat, test_shul.display_lon, test_shul.cluster_key]
+    ]
+
+
+def test_shul_names_are_not_shipped_with_the_markers(markers_GET, test_shul):
+    """
+    Privacy: marker positions are eager, but names + details are fetched on
+    demand per cluster (see ShulClusterPopupView) - a bare pin reveals nothing.
+    """
+    content = json.dumps(markers_GET())
+
+    assert test_shul.name not in content
+    assert str(test_shul.latitude) not in content
+
+
+def test_soft_deleted_shuls_are_not_returned(markers_GET, test_shul):
+    test_shul.delete()
+
+    assert markers_GET() == []
+
+
+def test_applies_the_filters(markers_GET):
+    large = Shul.objects.create(name="Large Room", latitude=40.7128, longitude=-74.0060)
+    small = Shul.objects.create(name="Small Room", latitude=31.7683, longitude=35.2137)
+    large.rooms.create(name="r", relative_size=RelativeSize.L)
+    small.rooms.create(name="r", relative_size=RelativeSize.S)
+
+    markers = markers_GET(rooms__relative_size=RelativeSize.L)
+
+    assert [marker[0] for marker in markers] == [large.pk]
+
+
+def test_invalid_filter_value_returns_nothing_rather_than_everything(markers_GET, test_shul):
+    markers = markers_GET(rooms__relative_size="NOT_A_REAL_CHOICE")
+
+    assert markers == []
+
+
+def test_excludes_the_given_shul(markers_GET):
+    keep = Shul.objects.create(name="Keep", latitude=40.7128, longitude=-74.0060)
+    drop = Shul.objects.create(name="Drop", latitude=40.7129, longitude=-74.0061)
+
+    markers = markers_GET(exclude=str(drop.pk))
+
+    assert [marker[0] for marker in markers] == [keep.pk]
+
+
+def test_query_count_does_not_scale_with_shul_count(markers_GET, django_assert_num_queries):
+    for i in range(5):
+        shul = Shul.objects.create(name=f"S{i}", latitude=40 + i, longitude=-74)
+        shul.rooms.create(name="r", relative_size=RelativeSize.L)
+
+    # Data version probe (see DataVersionETagMixin) + the markers themselves
+    with django_assert_num_queries(3):
+        markers_GET()
+
+
+def describe_viewport():
+    def returns_only_markers_in_the_viewport_and_margin(markers_GET):
+        inside = Shul.objects.create(name="Inside", latitude=40.71, longitude=-74.0)
+        margin = Shul.objects.create(name="Margin", latitude=40.71, longitude=-72.0)
+        outside = Shul.objects.create(name="Outside", latitude=31.77, longitude=35.21)
+
+        markers = markers_GET(bbox="-75,40,-73,41", zoom="12")
+
+        marker_ids = {marker[0] for marker in markers}
+        assert {inside.pk, margin.pk} <= marker_ids
+        assert outside.pk not in marker_ids
+
+    def echoes_the_covered_area(rf_GET):
+        request = rf_GET("eznashdb:shul_markers", query_params={"bbox": "0,0,10,10", "zoom": "5"})
+
+        data = json.loads(ShulMarkersView.as_view()(request).content)
+
+        assert data["bbox"] == [-5, -5, 15, 15]
+
+    def invalid_bbox_falls_back_to_all_markers(markers_GET, test_shul):
+        markers = markers_GET(bbox="not,a,real,bbox")
+
+        assert [marker[0] for marker in markers] == [test_shul.pk]
+
+
+def describe_grid_clusters():
+    @pytest.fixture
+    def clusters_GET(rf_GET):
+        def _get(**query_params):
+            query_params = {"bbox": "-180,-85,180,85", "zoom": "2", **query_params}
+            request = rf_GET("eznashdb:shul_markers", query_params=query_params)
+            return json.loads(ShulMarkersView.as_view()(request).content)
+
+        return _get
+
+    def aggregates_markers_at_low_zoom(clusters_GET):
+        Shul.objects.create(name="NY 1", latitude=40.71, longitude=-74.0)
+        Shul.objects.create(name="NY 2", latitude=40.8, longitude=-73.9)
+        Shul.objects.create(name="Jerusalem", latitude=31.77, longitude=35.21)
+
+        data = clusters_GET()
+
+        assert data["markers"] == []
+        assert sorted(count for _, _, count in data["clusters"]) == [1, 2]
+
+    def uses_the_centroid_of_each_cell(clusters_GET):
+        first = Shul.objects.create(name="NY 1", latitude=40.71, longitude=-74.0)
+        second = Shul.objects.create(name="NY 2", latitude=40.8, longitude=-73.9)
+
+        [[lat, lon, count]] = clusters_GET()["clusters"]
+
+        assert count == 2
+        assert lat == pytest.approx((first.display_lat + second.display_lat) / 2, abs=1e-6)
+        assert lon == pytest.approx((first.display_lon + second.display_lon) / 2, abs=1e-6)
+
+    def counts_shuls_with_several_matching_rooms_once(clusters_GET):
+        shul = Shul.objects.create(name="S", latitude=40.71, longitude=-74.0)
+        shul.rooms.create(name="r1", relative_size=RelativeSize.L)
+        shul.rooms.create(name="r2", relative_size=RelativeSize.L)
+
+        data = clusters_GET(rooms__relative_size=RelativeSize.L)
+
+        assert [count for _, _, count in data["clusters"]] == [1]
+
+    def applies_the_filters(clusters_GET):
+        large = Shul.objects.create(name="Large Room", latitude=40.7128, longitude=-74.0060)
+        small = Shul.objects.create(name="Small Room", latitude=31.7683, longitude=35.2137)
+        large.rooms.create(name="r", relative_size=RelativeSize.L)
+        small.rooms.create(name="r", relative_size=RelativeSize.S)
+
+        [[lat, lon, count]] = clusters_GET(rooms__relative_size=RelativeSize.L)["clusters"]
+
+        assert (lat, lon, count) == (
+            pytest.approx(large.display_lat),
+            pytest.approx(large.display_lon),
+            1,
+        )
+
+    def sends_individual_markers_past_the_max_zoom(clusters_GET):
+        shul = Shul.objects.create(name="S", latitude=40.71, longitude=-74.0)
+
+        data = clusters_GET(zoom=str(GRID_CLUSTER_MAX_ZOOM + 1))
+
+        assert "clusters" not in data
+        assert [marker[0] for marker in data["markers"]] == [shul.pk]
+
+    def aggregates_in_a_single_query(clusters_GET, django_assert_num_queries):
+        for i in range(5):
+            Shul.objects.create(name=f"S{i}", latitude=40 + i, longitude=-74)
+
+        # Data version probe (see DataVersionETagMixin) + the grid aggregate
+        with django_assert_num_queries(3):
+            clusters_GET()
+
+
+def describe_conditional_get():
+    def unchanged_data_returns_not_modified(rf_GET, test_shul):
+        first = ShulMarkersView.as_view()(rf_GET("eznashdb:shul_markers"))
+        request = rf_GET("eznashdb:shul_markers")
+        request.META["HTTP_IF_NONE_MATCH"] = first["ETag"]
+
+        assert ShulMarkersView.as_view()(request).status_code == 304
+
+    def etag_depends_on_the_viewport(rf_GET, test_shul):
+        etags = {
+            ShulMarkersView.as_view()(
+                rf_GET("eznashdb:shul_markers", query_params={"bbox": bbox, "zoom": "12"})
+            )["ETag"]
+            for bbox in ["0,0,1,1", "1,1,2,2"]
+        }
+
+        assert len(etags) == 2
+
+
+def describe_facet_counts():
+    def are_only_included_when_asked_for(rf_GET, test_shul):
+        request = rf_GET("eznashdb:shul_markers")
+        data = json.loads(ShulMarkersView.as_view()(request).content)
+
+        assert "facet_counts" not in data
+
+    def count_the_filtered_shuls(rf_GET, test_shul):
+        test_shul.rooms.create(relative_size=RelativeSize.L)
+        query_params = {"facets": "1", "rooms__relative_size": RelativeSize.S}
+        request = rf_GET("eznashdb:shul_markers", query_params=query_params)
+        data = json.loads(ShulMarkersView.as_view()(request).content)
+
+        assert data["facet_counts"]["total"] == 0
+        assert data["facet_counts"]["options"]["rooms__relative_size"]["L"] == 1
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from eznashdb.models import Shul
+
+
+@pytest.fixture
+def suggest(client, test_user):
+    client.force_login(test_user)
+
+    def _suggest(**query_params):
+        response = client.get(reverse("eznashdb:shul_name_suggest"), query_params)
+        return json.loads(response.content)["results"]
+
+    return _suggest
+
+
+def test_returns_marker_rows_with_name_and_city(suggest):
+    shul = Shul.objects.create(name="Beth Israel", city="Boston", latitude=42.36, longitude=-71.06)
+    shul = Shul.objects.get(pk=shul.pk)
+
+    assert suggest(q="beth") == [
+        [shul.pk, shul.display_lat, shul.display_lon, shul.cluster_key, "Beth Israel", "Boston"]
+    ]
+
+
+def test_returns_nothing_without_a_query(suggest):
+    Shul.objects.create(name="Beth Israel", latitude=1, longitude=1)
+
+    assert suggest() == []
+
+
+def test_answers_from_memory_once_the_index_is_built(suggest, django_assert_max_num_queries):
+    Shul.objects.create(name="Beth Israel", latitude=1, longitude=1)
+    suggest(q="b")
+
+    # Only the session and user lookups of the login check
+    with django_assert_max_num_queries(2):
+        assert len(suggest(q="beth")) == 1
+
+
+def test_requires_login(client):
+    response = client.get(reverse("eznashdb:shul_name_suggest"), {"q": "beth"})
+
+    assert response.status_code == 302
+    assert "login" in response.url
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from eznashdb.enums import RelativeSize
+from eznashdb.models import Shul
+
+
+@pytest.fixture
+def search(client, test_user):
+    client.force_login(test_user)
+
+    def _search(**query_params):
+        return json.loads(client.get(reverse("eznashdb:shul_search"), query_params).content)["results"]
+
+    return _search
+
+
+def test_returns_marker_rows_with_name_and_city(search):
+    shul = Shul.objects.create(name="Beth Israel", city="Boston", latitude=42.36, longitude=-71.06)
+
+    assert search(q="beth") == [
+        [shul.pk, shul.display_lat, shul.display_lon, shul.cluster_key, "Beth Israel", "Boston"]
+    ]
+
+
+def test_applies_the_filters(search):
+    large = Shul.objects.create(name="Beth Israel Large", latitude=1, longitude=1)
+    large.rooms.create(relative_size=RelativeSize.L)
+    small = Shul.objects.create(name="Beth Israel Small", latitude=1, longitude=1)
+    small.rooms.create(relative_size=RelativeSize.S)
+
+    results = search(q="beth israel", rooms__relative_size=RelativeSize.L)
+
+    assert [row[0] for row in results] == [large.pk]
+
+
+def test_excludes_the_exact_pin(search):
+    shul = Shul.objects.create(name="Beth Israel", latitude=1, longitude=1)
+
+    assert search(q="beth", exclude=shul.pk) == []
+
+
+def test_returns_nothing_without_a_query(search):
+    Shul.objects.create(name="Beth Israel", latitude=1, longitude=1)
+
+    assert search() == []
+
+
+def test_requires_login(client):
+    response = client.get(reverse("eznashdb:shul_search"), {"q": "beth"})
+
+    assert response.status_code == 302
+    assert "login" in response.url
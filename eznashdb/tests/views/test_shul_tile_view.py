@@ -0,0 +1,142 @@
+import json
+
+import pytest
+from django.http import Http404
+from django.utils import timezone
+
+from eznashdb.enums import RelativeSize
+from eznashdb.map_tiles import MARKER_TILE_ZOOM, tile_containing
+from eznashdb.models import Shul
+from eznashdb.views import ShulTileView
+
+
+@pytest.fixture
+def tile_GET(rf_GET):
+    def _get(z, x, y, if_none_match=None, **query_params):
+        request = rf_GET(
+            "eznashdb:shul_tile", url_params={"z": z, "x": x, "y": y}, query_params=query_params
+        )
+        if if_none_match:
+            request.META["HTTP_IF_NONE_MATCH"] = if_none_match
+        return ShulTileView.as_view()(request, z=z, x=x, y=y)
+
+    return _get
+
+
+@pytest.fixture
+def new_york_shul():
+    return Shul.objects.create(name="New York", latitude=40.7128, longitude=-74.0060)
+
+
+def _marker_tile(shul):
+    return (MARKER_TILE_ZOOM, *tile_containing(shul.display_lat, shul.display_lon, MARKER_TILE_ZOOM))
+
+
+def test_returns_the_markers_in_the_tile(tile_GET, new_york_shul):
+    Shul.objects.create(name="Jerusalem", latitude=31.7683, longitude=35.2137)
+
+    data = json.loads(tile_GET(*_marker_tile(new_york_shul)).content)
+
+    assert data["markers"] == [
+        [
+            new_york_shul.pk,
+            new_york_shul.display_lat,
+            new_york_shul.display_lon,
+            new_york_shul.cluster_key,
+        ]
+    ]
+
+
+def test_returns_grid_clusters_at_low_zooms(tile_GET, new_york_shul):
+    Shul.objects.create(name="Also New York", latitude=40.72, longitude=-74.01)
+
+    data = json.loads(tile_GET(0, 0, 0).content)
+
+    assert data["markers"] == []
+    assert [cluster[2] for cluster in data["clusters"]] == [2]
+
+
+def test_applies_the_filters(tile_GET, new_york_shul):
+    new_york_shul.rooms.create(relative_size=RelativeSize.L)
+
+    data = json.loads(tile_GET(0, 0, 0, rooms__relative_size=RelativeSize.S).content)
+
+    assert data["clusters"] == []
+
+
+@pytest.mark.parametrize(("z", "x", "y"), [(2, 4, 0), (MARKER_TILE_ZOOM + 1, 0, 0)])
+def test_rejects_tiles_out_of_range(tile_GET, z, x, y):
+    with pytest.raises(Http404):
+        tile_GET(z, x, y)
+
+
+def describe_caching():
+    def serves_repeat_tiles_without_querying(tile_GET, new_york_shul, django_assert_num_queries):
+        content = tile_GET(0, 0, 0).content
+
+        with django_assert_num_queries(0):
+            response = tile_GET(0, 0, 0)
+
+        assert response.content == content
+
+    def unchanged_tiles_return_not_modified(tile_GET, new_york_shul, django_assert_num_queries):
+        etag = tile_GET(0, 0, 0)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = tile_GET(0, 0, 0, if_none_match=etag)
+
+        assert response.status_code == 304
+
+    def is_invalidated_by_a_change_in_the_tile(tile_GET, new_york_shul):
+        tile = _marker_tile(new_york_shul)
+        tile_GET(*tile)
+
+        new_york_shul.delete()
+
+        assert json.loads(tile_GET(*tile).content)["markers"] == []
+
+    def is_invalidated_by_a_room_change(tile_GET, new_york_shul):
+        tile_GET(0, 0, 0, rooms__relative_size=RelativeSize.L)
+
+        new_york_shul.rooms.create(relative_size=RelativeSize.L)
+
+        data = json.loads(tile_GET(0, 0, 0, rooms__relative_size=RelativeSize.L).content)
+        assert [cluster[2] for cluster in data["clusters"]] == [1]
+
+    def is_invalidated_for_the_tile_a_shul_moves_out_of(tile_GET, new_york_shul):
+        tile = _marker_tile(new_york_shul)
+        tile_GET(*tile)
+
+        new_york_shul.latitude, new_york_shul.longitude = 31.7683, 35.2137
+        new_york_shul.save()
+
+        assert json.loads(tile_GET(*tile).content)["markers"] == []
+
+    def is_invalidated_for_the_tile_a_loaded_shul_moves_out_of(tile_GET, new_york_shul):
+        tile = _marker_tile(new_york_shul)
+        tile_GET(*tile)
+        shul = Shul.objects.get(pk=new_york_shul.pk)
+
+        shul.latitude, shul.longitude = 31.7683, 35.2137
+        shul.save()
+
+        assert json.loads(tile_GET(*tile).content)["markers"] == []
+
+    def is_invalidated_by_writes_that_sent_no_signal_once_rechecked(tile_GET, new_york_shul, mocker):
+        tile = _marker_tile(new_york_shul)
+        response = tile_GET(*tile)
+        mocker.patch("eznashdb.fragment_cache.RECHECK_INTERVAL", 0)
+
+        Shul.objects.filter(pk=new_york_shul.pk).update(deleted=timezone.now())
+
+        assert tile_GET(*tile, if_none_match=response["ETag"]).status_code == 200
+        assert json.loads(tile_GET(*tile).content)["markers"] == []
+
+    def is_kept_for_changes_elsewhere(tile_GET, new_york_shul, django_assert_num_queries):
+        tile = _marker_tile(new_york_shul)
+        tile_GET(*tile)
+
+        Shul.objects.create(name="Jerusalem", latitude=31.7683, longitude=35.2137)
+
+        with django_assert_num_queries(0):
+            tile_GET(*tile)
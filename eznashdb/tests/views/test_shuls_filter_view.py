@@ -1,7 +1,12 @@
 import pytest
 from bs4 import BeautifulSoup
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from eznashdb.constants import JUST_SAVED_SHUL_SESSION_KEY
+from eznashdb.marker_bundle import build_marker_bundle
 from eznashdb.models import Shul
 from eznashdb.views import ShulsFilterView
 
@@ -18,20 +23,108 @@ def test_shows_app_name(GET_request):
     assert "Ezrat Nashim Database" in soup.get_text()
 
 
-def test_shul_names_are_not_shipped_with_the_markers(GET_request, test_shul):
+def test_markers_are_loaded_from_marker_tiles(GET_request, test_shul):
     """
-    Privacy: marker positions are eager, but names + details are fetched on
-    demand per cluster (see ShulClusterPopupView) - a bare pin reveals nothing.
+    Marker positions are fetched as compact JSON tiles (see ShulTileView)
+    rather than rendered into the page one script block per shul.
     """
     content = ShulsFilterView.as_view()(GET_request).render().content.decode()
 
     assert test_shul.name not in content
-    # Pins still render: coordinates are shipped eagerly.
-    assert str(test_shul.display_lat) in content
+    assert test_shul.cluster_key not in content
+    assert "/shuls/tiles/{z}/{x}/{y}/" in content
+
+
+def test_does_not_prefetch_rooms(GET_request, test_shul):
+    response = ShulsFilterView.as_view()(GET_request)
+
+    assert not response.context_data["object_list"]._prefetch_related_lookups
+
+
+def test_shows_the_shul_count(GET_request, test_shul):
+    Shul.objects.create(name="Other", latitude=1, longitude=1)
+    response = ShulsFilterView.as_view()(GET_request)
+    soup = BeautifulSoup(response.render().content, features="html.parser")
+
+    assert soup.find(id="shuls-count").get_text(strip=True) == "2 shuls found"
+    assert response.context_data["facet_counts"]["total"] == 2
+
+
+def describe_marker_bundle_url():
+    def points_the_unfiltered_map_at_the_bundle(GET_request, test_shul):
+        name = build_marker_bundle()
+
+        context = ShulsFilterView.as_view()(GET_request).context_data
+
+        assert context["marker_bundle_url"] == reverse(
+            "eznashdb:shul_marker_bundle", kwargs={"name": name}
+        )
+
+    def is_none_with_filters(rf_GET, test_shul):
+        build_marker_bundle()
+        request = rf_GET("eznashdb:shuls", query_params={"rooms__relative_size": "L"})
+
+        assert ShulsFilterView.as_view()(request).context_data["marker_bundle_url"] is None
+
+    def is_none_with_an_exact_pin(rf_GET, test_shul):
+        build_marker_bundle()
+        request = rf_GET("eznashdb:shuls", session={JUST_SAVED_SHUL_SESSION_KEY: test_shul.pk})
+
+        assert ShulsFilterView.as_view()(request).context_data["marker_bundle_url"] is None
+
+    def is_none_before_a_bundle_is_built(GET_request, test_shul):
+        assert ShulsFilterView.as_view()(GET_request).context_data["marker_bundle_url"] is None
+
+
+def describe_tile_url():
+    def forwards_the_active_filters(rf_GET):
+        request = rf_GET(
+            "eznashdb:shuls",
+            query_params={"rooms__relative_size": ["S", "L"], "lat": "40.7", "lon": "-74"},
+        )
+
+        tile_url = ShulsFilterView.as_view()(request).context_data["tile_url"]
+
+        params = QueryDict(tile_url.split("?", 1)[1])
+        assert params.getlist("rooms__relative_size") == ["S", "L"]
+        assert "lat" not in params
+        assert "lon" not in params
+
+    def does_not_forward_the_viewport(rf_GET):
+        """Tiles cover the viewport - the map requests the ones it shows."""
+        request = rf_GET("eznashdb:shuls", query_params={"bbox": "0,0,10,10", "zoom": "5"})
+
+        tile_url = ShulsFilterView.as_view()(request).context_data["tile_url"]
+
+        assert "bbox" not in tile_url
+        assert "zoom" not in tile_url
+
+    def is_a_bare_template_without_filters(GET_request):
+        tile_url = ShulsFilterView.as_view()(GET_request).context_data["tile_url"]
+
+        assert tile_url == "/shuls/tiles/{z}/{x}/{y}/"
+
+
+def describe_marker_delta_url():
+    def forwards_the_active_filters(rf_GET):
+        request = rf_GET("eznashdb:shuls", query_params={"rooms__relative_size": ["S", "L"]})
+
+        context = ShulsFilterView.as_view()(request).context_data
+
+        url, query = context["marker_delta_url"].split("?", 1)
+        assert url == reverse("eznashdb:shul_marker_delta")
+        assert QueryDict(query).getlist("rooms__relative_size") == ["S", "L"]
+
+    def comes_with_a_sync_point(GET_request):
+        before = timezone.now()
+
+        context = ShulsFilterView.as_view()(GET_request).context_data
+
+        assert before <= parse_datetime(context["marker_sync_since"]) <= timezone.now()
 
 
 def describe_exact_pin_behavior():
-    def test_just_saved_shul_in_context_and_excluded_from_clusters(rf_GET):
+    def test_just_saved_shul_in_context_and_excluded_from_markers(rf_GET):
         """When just saved shul in session, shul should be in exact_pin_shul"""
         shul = Shul.objects.create(name="Test Shul", latitude=40.7128, longitude=-74.0060)
         request = rf_GET("eznashdb:shuls", session={JUST_SAVED_SHUL_SESSION_KEY: shul.id})
@@ -41,9 +134,8 @@ def describe_exact_pin_behavior():
 
         # Shul should be in exact_pin_shul
         assert context["exact_pin_shul"] == shul
-        # But not in any cluster (shul_clusters values are lists of shuls per cluster)
-        all_clustered_shuls = [s for cluster in context["shul_clusters"].values() for s in cluster]
-        assert shul not in all_clustered_shuls
+        # But excluded from the clustered markers
+        assert f"exclude={shul.id}" in context["tile_url"]
 
     def test_just_saved_shul_without_session_does_not_show_exact_pin(rf_GET):
         Shul.objects.create(name="Test Shul", latitude=40.7128, longitude=-74.0060)
@@ -54,6 +146,14 @@ def describe_exact_pin_behavior():
 
         assert context["exact_pin_shul"] is None
 
+    def test_no_cluster_offset_when_exact_pin_is_alone_in_its_cluster(rf_GET):
+        exact_shul = Shul.objects.create(name="Exact Shul", latitude=40.699, longitude=-74.001)
+        request = rf_GET("eznashdb:shuls", session={JUST_SAVED_SHUL_SESSION_KEY: exact_shul.id})
+
+        response = ShulsFilterView.as_view()(request)
+
+        assert response.context_data["cluster_offset"] is None
+
     def test_cluster_offset_calculated_for_nearby_cluster(rf_GET):
         """When exact pin is close to a cluster, offset should be calculated with correct structure"""
         # Create shuls that round to same coords (40.70, -74.00) and jitter close to exact position
@@ -73,3 +173,134 @@ def describe_exact_pin_behavior():
         assert "offset_lon" in offset
         assert isinstance(offset["cluster_key"], str)
         assert isinstance(offset["offset_lon"], (int, float))
+
+
+def describe_conditional_get():
+    @pytest.fixture
+    def htmx_GET(rf_GET):
+        def _get(if_none_match=None, session=None, **query_params):
+            request = rf_GET("eznashdb:shuls", query_params=query_params, htmx=True, session=session)
+            if if_none_match:
+                request.META["HTTP_IF_NONE_MATCH"] = if_none_match
+            return ShulsFilterView.as_view()(request)
+
+        return _get
+
+    def map_updates_carry_an_etag(htmx_GET, test_shul):
+        response = htmx_GET()
+
+        assert response["ETag"]
+        assert "no-cache" in response["Cache-Control"]
+        assert "HX-Request" in response["Vary"]
+
+    def unchanged_data_returns_not_modified_without_querying(
+        htmx_GET, test_shul, django_assert_num_queries
+    ):
+        etag = htmx_GET()["ETag"]
+
+        with django_assert_num_queries(0):
+            response = htmx_GET(if_none_match=etag)
+
+        assert response.status_code == 304
+
+    def changed_shul_data_returns_the_full_partial(htmx_GET, test_shul):
+        etag = htmx_GET()["ETag"]
+        Shul.objects.create(name="New", latitude=40.71, longitude=-74.0)
+
+        response = htmx_GET(if_none_match=etag)
+
+        assert response.status_code == 200
+
+    def signal_less_updates_change_the_etag_once_rechecked(htmx_GET, test_shul, mocker):
+        etag = htmx_GET()["ETag"]
+        mocker.patch("eznashdb.fragment_cache.RECHECK_INTERVAL", 0)
+
+        Shul.objects.filter(pk=test_shul.pk).update(name="Renamed", updated_at=timezone.now())
+
+        assert htmx_GET(if_none_match=etag).status_code == 200
+
+    def changed_filters_return_the_full_partial(htmx_GET, test_shul):
+        etag = htmx_GET()["ETag"]
+
+        response = htmx_GET(if_none_match=etag, rooms__relative_size="L")
+
+        assert response.status_code == 200
+
+    def map_position_does_not_affect_the_etag(htmx_GET, test_shul):
+        assert htmx_GET(lat="1")["ETag"] == htmx_GET(lat="2")["ETag"]
+
+    def full_page_is_not_conditional(GET_request, test_shul):
+        response = ShulsFilterView.as_view()(GET_request)
+
+        assert "ETag" not in response
+
+    def exact_pin_responses_are_not_conditional(htmx_GET, test_shul):
+        response = htmx_GET(session={JUST_SAVED_SHUL_SESSION_KEY: test_shul.pk})
+
+        assert "ETag" not in response
+
+
+def describe_fragment_cache():
+    @pytest.fixture
+    def htmx_GET(rf_GET):
+        def _get(session=None, **query_params):
+            request = rf_GET("eznashdb:shuls", query_params=query_params, htmx=True, session=session)
+            response = ShulsFilterView.as_view()(request)
+            if hasattr(response, "render"):
+                response.render()
+            return response
+
+        return _get
+
+    def serves_repeat_partials_without_querying(htmx_GET, test_shul, django_assert_num_queries):
+        content = htmx_GET().content
+
+        with django_assert_num_queries(0):
+            response = htmx_GET()
+
+        assert response.content == content
+
+    def is_keyed_by_the_filters(htmx_GET, test_shul):
+        test_shul.rooms.create(relative_size="L")
+        htmx_GET()
+
+        response = htmx_GET(rooms__relative_size="S")
+
+        assert b"0 shuls found" in response.content
+
+    def ignores_param_order(htmx_GET, test_shul, django_assert_num_queries):
+        htmx_GET(rooms__relative_size="L", kaddish_policy="NO")
+
+        with django_assert_num_queries(0):
+            htmx_GET(kaddish_policy="NO", rooms__relative_size="L")
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda shul: Shul.objects.create(name="New", latitude=1, longitude=1),
+            lambda shul: shul.delete(),
+            lambda shul: shul.rooms.create(relative_size="L"),
+        ],
+        ids=["shul_created", "shul_soft_deleted", "room_created"],
+    )
+    def is_invalidated_by_shul_changes(htmx_GET, test_shul, change):
+        before = htmx_GET().content
+
+        change(test_shul)
+
+        assert htmx_GET().content != before
+
+    def is_invalidated_when_a_shul_is_restored(htmx_GET, test_shul):
+        test_shul.delete()
+        htmx_GET()
+
+        test_shul.undelete()
+
+        assert b"1 shul found" in htmx_GET().content
+
+    def skips_exact_pin_partials(htmx_GET, test_shul):
+        htmx_GET()
+
+        response = htmx_GET(session={JUST_SAVED_SHUL_SESSION_KEY: test_shul.pk})
+
+        assert "exact_pin_" in response.content.decode()
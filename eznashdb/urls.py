@@ -6,7 +6,18 @@ app_name = "eznashdb"
 
 urlpatterns = [
     path("", views.ShulsFilterView.as_view(), name="shuls"),
+    path("shuls/markers/", views.ShulMarkersView.as_view(), name="shul_markers"),
+    path("shuls/markers/delta/", views.ShulMarkerDeltaView.as_view(), name="shul_marker_delta"),
+    path("shuls/search/", views.ShulSearchView.as_view(), name="shul_search"),
+    path("shuls/suggest/", views.ShulNameSuggestView.as_view(), name="shul_name_suggest"),
+    path(
+        "shuls/markers/bundles/<str:name>",
+        views.ShulMarkerBundleView.as_view(),
+        name="shul_marker_bundle",
+    ),
+    path("shuls/tiles/<int:z>/<int:x>/<int:y>/", views.ShulTileView.as_view(), name="shul_tile"),
     path("shuls/popup/", views.ShulClusterPopupView.as_view(), name="cluster_popup"),
+    path("shuls/popups/", views.ShulClusterPopupBatchView.as_view(), name="cluster_popups"),
     path("shuls/create/", views.CreateUpdateShulView.as_view(), name="create_shul"),
     path("shuls/<pk>/update/", views.CreateUpdateShulView.as_view(), name="update_shul"),
     path("shuls/<int:pk>/undelete/", views.UndeleteShulView.as_view(), name="undelete_shul"),
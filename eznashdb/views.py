@@ -1,16 +1,29 @@
 import math
-from collections import defaultdict
-from decimal import Decimal
+from datetime import timedelta
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.http import HttpResponseBadRequest, HttpResponseRedirect, JsonResponse
+from django.db.models import Avg, Count, F, Q
+from django.db.models.functions import Floor
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    QueryDict,
+)
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
 from django.views import View
 from django.views.generic import TemplateView, UpdateView
 from django_filters.views import FilterView
@@ -19,57 +32,230 @@ from django_htmx.http import HttpResponseClientRedirect
 from app.context_processors import get_login_url
 from app.mixins import AbusePreventionMixin
 from eznashdb.constants import JUST_SAVED_SHUL_SESSION_KEY
-from eznashdb.filtersets import ShulFilterSet
+from eznashdb.data_version import get_data_version, make_etag
+from eznashdb.filtersets import MARKER_FIELDS, ShulFilterSet
 from eznashdb.forms import RoomFormSet, ShulDeleteForm, ShulForm
+from eznashdb.fragment_cache import (
+    get_fragment,
+    get_fragment_stamp,
+    get_fragments,
+    make_fragment_key,
+    set_fragment,
+)
 from eznashdb.geocoding import GooglePlacesBudgetChecker, GooglePlacesClient, OSMClient
-from eznashdb.models import Shul
+from eznashdb.map_bounds import MapViewport
+from eznashdb.map_tiles import (
+    MARKER_TILE_ZOOM,
+    is_valid_tile,
+    tile_q,
+    tile_version_key,
+    tile_viewport,
+)
+from eznashdb.marker_bundle import ENCODINGS, get_bundle_name, get_bundle_path
+from eznashdb.models import Room, Shul
+from eznashdb.name_index import shul_name_index
+from eznashdb.nearby import shuls_near, similar_to
 from eznashdb.place_search import PlaceSearchMerger
+from eznashdb.shul_search import search_shuls
+from eznashdb.signals import batched_room_changes, rooms_changed
 
+VIEWPORT_PARAMS = ("bbox", "zoom")
 
-class ShulsFilterView(FilterView):
+
+class FilteredShulsMixin:
+    """Builds a ShulFilterSet-filtered queryset from the request's query params."""
+
+    NON_FILTER_PARAMS = (
+        "cluster_key",
+        "exclude",
+        "facets",
+        "previous",
+        "q",
+        "selected_shul",
+        "since",
+        *VIEWPORT_PARAMS,
+    )
+    # Only views rendering room details need the rooms prefetch
+    prefetch_rooms = True
+
+    def get_queryset(self, params: QueryDict | None = None):
+        """
+        Shuls matching the page's active filters, minus any excluded shul.
+        ``params`` stands in for the request's query params if given.
+        """
+        params = self.request.GET if params is None else params
+        filter_params = params.copy()
+        for param in self.NON_FILTER_PARAMS:
+            filter_params.pop(param, None)
+
+        self.filterset = filterset = ShulFilterSet(
+            filter_params or None,
+            queryset=Shul.objects.all(),
+            request=self.request,
+            prefetch_rooms=self.prefetch_rooms,
+        )
+        # Mirrors default behavior from django_filter
+        qs = filterset.qs if not filterset.is_bound or filterset.is_valid() else Shul.objects.none()
+
+        exclude_id = params.get("exclude", "")
+        if exclude_id.isdigit():
+            qs = qs.exclude(pk=exclude_id)
+
+        return qs
+
+
+class DataVersionETagMixin:
+    """
+    Answers conditional GETs with a 304 while neither shul data nor the
+    request params the response depends on have changed since the client's
+    copy. Only the data version probe touches the database on a match.
+    """
+
+    def get_etag_params(self) -> QueryDict | None:
+        """Params the response depends on, or None to skip conditional handling."""
+        return self.request.GET
+
+    def get_etag_version(self) -> str:
+        return get_data_version()
+
+    def dispatch(self, request, *args, **kwargs):
+        params = self.get_etag_params() if request.method in ("GET", "HEAD") else None
+        if params is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = make_etag(self.get_etag_version(), params)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        response.headers["ETag"] = etag
+        # Browsers only send If-None-Match for responses they were allowed to store
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ["HX-Request"])
+        return response
+
+
+class ShulsFilterView(DataVersionETagMixin, FilterView):
     template_name = "eznashdb/shuls.html"
     filterset_class = ShulFilterSet
 
+    def get_etag_params(self):
+        # Pending messages are appended to the partial (see HTMXMessagesMiddleware)
+        if not self._is_shared_partial() or len(messages.get_messages(self.request)):
+            return None
+        return self._get_data_params()
+
+    def get_etag_version(self):
+        # The same stamp the fragment cache uses, so a 304 costs no queries
+        # between data version checks
+        return get_fragment_stamp()
+
+    def _is_shared_partial(self) -> bool:
+        """
+        Whether the response is the same for everyone with these params. Only
+        the map_updates partial is - the full page carries per-user bits - and
+        not with an exact pin, which is per-session.
+        """
+        return self.request.htmx and JUST_SAVED_SHUL_SESSION_KEY not in self.request.session
+
+    def get(self, request, *args, **kwargs):
+        if not self._is_shared_partial():
+            return super().get(request, *args, **kwargs)
+
+        fragment_key = make_fragment_key("map_updates", self._get_data_params())
+        content = get_fragment(fragment_key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(lambda r: set_fragment(fragment_key, r.content))
+        return response
+
+    def _get_data_params(self) -> QueryDict:
+        """The request's filter params, which determine the map data."""
+        filter_names = self.get_filterset_class().base_filters
+        params = QueryDict(mutable=True)
+        for name in filter_names:
+            if name in self.request.GET:
+                params.setlist(name, self.request.GET.getlist(name))
+        return params
+
+    def get_filterset_kwargs(self, filterset_class):
+        # The page only counts shuls - markers come from ShulTileView
+        return {**super().get_filterset_kwargs(filterset_class), "prefetch_rooms": False}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         # Get exact pin shul from session
         saved_shul_id = self.request.session.pop(JUST_SAVED_SHUL_SESSION_KEY, None)
         exact_pin_shul = Shul.objects.filter(pk=saved_shul_id).first()
-        clustered_shuls = self.object_list.exclude(pk=saved_shul_id)
-
-        # Group shuls by their display coordinates (excluding exact pin to prevent double-display)
-        clusters_dict = defaultdict(list)
-        for shul in clustered_shuls:
-            clusters_dict[shul.cluster_key].append(shul)
-
-        context["clustered_shuls_list"] = clustered_shuls
-        context["shul_clusters"] = dict(clusters_dict)
 
         # Calculate cluster offset if needed
         cluster_offset = None
         if exact_pin_shul:
-            cluster_offset = self._calculate_cluster_offset(exact_pin_shul, clusters_dict)
-
+            clustered_shuls = self.object_list.exclude(pk=exact_pin_shul.pk)
+            cluster_offset = self._calculate_cluster_offset(exact_pin_shul, clustered_shuls)
+
+        context["facet_counts"] = self.filterset.get_facet_counts()
+        context["marker_bundle_url"] = self._get_marker_bundle_url(exact_pin_shul)
+        context["tile_url"] = self._get_tile_url(exact_pin_shul)
+        context["marker_delta_url"] = self._get_marker_delta_url(exact_pin_shul)
+        # Sync point for marker deltas - whatever the client loads next is at
+        # least this current. (A cached partial's is older, which only means
+        # a delta repeats some changes.)
+        context["marker_sync_since"] = timezone.now().isoformat()
+        context["marker_tile_zoom"] = MARKER_TILE_ZOOM
         context["cluster_offset"] = cluster_offset
         context["exact_pin_shul"] = exact_pin_shul
 
         return context
 
-    def _calculate_cluster_offset(self, exact_pin_shul, clusters_dict):
+    def _get_marker_bundle_url(self, exact_pin_shul):
+        """
+        ShulMarkerBundleView URL for the unfiltered map, loaded instead of
+        tiles. None with filters or an exact pin, or if there's no bundle yet.
+        """
+        if self._get_data_params() or exact_pin_shul:
+            return None
+        name = get_bundle_name()
+        return reverse("eznashdb:shul_marker_bundle", kwargs={"name": name}) if name else None
+
+    def _get_marker_params(self, exact_pin_shul) -> QueryDict:
+        """
+        Params for the marker endpoints: the active filters, excluding the
+        exact pin to prevent it being displayed twice.
+        """
+        params = self._get_data_params()
+        if exact_pin_shul:
+            params["exclude"] = exact_pin_shul.pk
+        return params
+
+    def _get_marker_delta_url(self, exact_pin_shul):
+        params = self._get_marker_params(exact_pin_shul)
+        url = reverse("eznashdb:shul_marker_delta")
+        return f"{url}?{params.urlencode()}" if params else url
+
+    def _get_tile_url(self, exact_pin_shul):
+        """ShulTileView URL template, Leaflet style with ``{z}/{x}/{y}``."""
+        params = self._get_marker_params(exact_pin_shul)
+        url = reverse("eznashdb:shul_tile", kwargs={"z": 0, "x": 0, "y": 0})
+        url = url.replace("/0/0/0/", "/{z}/{x}/{y}/")
+        return f"{url}?{params.urlencode()}" if params else url
+
+    def _calculate_cluster_offset(self, exact_pin_shul, clustered_shuls):
         """
         Calculate offset for cluster that would have contained the exact_pin_shul.
         Returns dict with cluster_key and offset values, or None if no offset needed.
         """
         MIN_SEPARATION_FROM_EXACT_PIN = 0.004
         cluster_key = exact_pin_shul.cluster_key
-        if cluster_key not in clusters_dict:
+        if not clustered_shuls.filter(cluster_key=cluster_key).exists():
             return None
 
-        # Get cluster's position (use first shul's display coords as cluster centroid)
-        cluster_shul = clusters_dict[cluster_key][0]
-        cluster_lat = cluster_shul.display_lat
-        cluster_lon = cluster_shul.display_lon
+        # Every member of a cluster shares its display coords, so the cluster
+        # sits at the exact pin shul's own display coords
+        cluster_lat = exact_pin_shul.display_lat
+        cluster_lon = exact_pin_shul.display_lon
 
         # Calculate distance between exact pin and cluster
         exact_lat = float(exact_pin_shul.latitude)
@@ -98,63 +284,335 @@ class ShulsFilterView(FilterView):
         return super().get_template_names()
 
 
-class ShulClusterPopupView(View):
+class ShulMarkersView(DataVersionETagMixin, FilteredShulsMixin, View):
+    """
+    Map markers for the active filters as compact ``[id, lat, lon, cluster_key]``
+    rows. Only the jittered display coords are shipped - names and details are
+    fetched on demand per cluster (see ShulClusterPopupView).
+
+    Given a ``bbox`` (and ``zoom``), only markers within the viewport plus a
+    margin are returned, and the covered area is echoed back as ``bbox`` so the
+    client knows when panning needs another fetch. At low zooms, markers are
+    instead aggregated into ``[lat, lon, count]`` grid ``clusters``.
+
+    With ``facets=1``, the filters' ``facet_counts`` are included too (see
+    ShulFilterSet.get_facet_counts) - they don't depend on the viewport, so
+    clients ask for them once per filter change rather than on every pan.
+    """
+
+    prefetch_rooms = False
+
+    def get(self, request, *args, **kwargs):
+        markers = self.get_queryset().order_by("pk")
+        data = {}
+
+        viewport = MapViewport.from_params(request.GET)
+        if viewport:
+            viewport = viewport.with_margin()
+            markers = markers.filter(viewport.as_q())
+            data["bbox"] = [viewport.west, viewport.south, viewport.east, viewport.north]
+
+        if request.GET.get("facets"):
+            data["facet_counts"] = self.filterset.get_facet_counts()
+
+        data.update(self._get_marker_data(markers, viewport))
+        return JsonResponse(data)
+
+    def _get_marker_data(self, markers, viewport: MapViewport | None) -> dict:
+        if viewport and viewport.is_grid_clustered:
+            return {
+                "markers": [],
+                "clusters": self._grid_clusters(markers, viewport.grid_cell_size),
+            }
+        return {"markers": list(markers.values_list(*MARKER_FIELDS))}
+
+    def _grid_clusters(self, markers, cell_size):
+        """Count and centroid of the markers in each grid cell, in one GROUP BY."""
+        # Group over a pk__in subquery so the filters' room joins (and their
+        # DISTINCT) can't double count shuls with several matching rooms.
+        cells = (
+            Shul.objects.filter(pk__in=markers.values("pk"))
+            .annotate(
+                cell_lat=Floor(F("display_lat") / cell_size),
+                cell_lon=Floor(F("display_lon") / cell_size),
+            )
+            .values("cell_lat", "cell_lon")
+            .annotate(count=Count("pk"), lat=Avg("display_lat"), lon=Avg("display_lon"))
+            .order_by("cell_lat", "cell_lon")
+        )
+        return [[round(cell["lat"], 6), round(cell["lon"], 6), cell["count"]] for cell in cells]
+
+
+class ShulTileView(ShulMarkersView):
+    """
+    The markers (or grid clusters) in one XYZ map tile, in ShulMarkersView's
+    format - see eznashdb.map_tiles. Tiles are cached per filters, and
+    invalidated individually when a shul in them changes, so a cached tile
+    or a 304 for an unchanged one needs no database query.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_valid_tile(kwargs["z"], kwargs["x"], kwargs["y"]):
+            raise Http404("No such tile.")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_etag_version(self):
+        # The stamp its cached body is keyed by - writes that sent no signal
+        # here still change it once the data version is rechecked
+        return get_fragment_stamp(tile_version_key(self.kwargs["z"], self.kwargs["x"], self.kwargs["y"]))
+
+    def get(self, request, *args, z, x, y, **kwargs):
+        fragment_key = make_fragment_key(
+            f"tile:{z}/{x}/{y}", request.GET, version_key=tile_version_key(z, x, y)
+        )
+        content = get_fragment(fragment_key)
+        if content is None:
+            markers = self.get_queryset().filter(tile_q(z, x, y)).order_by("pk")
+            content = JsonResponse(self._get_marker_data(markers, tile_viewport(z, x, y))).content
+            set_fragment(fragment_key, content)
+        return HttpResponse(content, content_type="application/json")
+
+
+class ShulMarkerDeltaView(FilteredShulsMixin, View):
+    """
+    Marker changes for the active filters since the client's ``since`` sync
+    point, so a map showing them can be patched in place: ``markers`` rows
+    (ShulMarkersView's format) for shuls added, moved or otherwise changed,
+    the ``removed`` ids of changed shuls that no longer match, and the
+    ``since`` to send next time.
+
+    Changes are found by ``updated_at`` and safedelete's ``deleted``. If the
+    map shows different filters, ``previous`` holds their query string, and
+    shuls matching only one of the two filter sets count as changed too.
+    Responds ``{"reset": true}`` when a full reload is the better option - an
+    old or missing sync point, or too many changes.
+    """
+
+    prefetch_rooms = False
+    # Rows are timestamped before their transaction commits, so each query
+    # looks back this far past the sync point to catch late commits
+    SYNC_OVERLAP = timedelta(minutes=1)
+    MAX_SYNC_AGE = timedelta(days=1)
+    MAX_CHANGES = 500
+
+    def get(self, request, *args, **kwargs):
+        now = timezone.now()
+        since = parse_datetime(request.GET.get("since", ""))
+        if since is None or since.tzinfo is None or now - since > self.MAX_SYNC_AGE:
+            return JsonResponse({"reset": True})
+
+        queryset = self.get_queryset()
+        changed_ids = self._get_changed_ids(since - self.SYNC_OVERLAP)
+        if "previous" in request.GET:
+            previous = self.get_queryset(QueryDict(request.GET["previous"]))
+            changed_ids += self._get_ids(queryset.exclude(pk__in=previous.values("pk")))
+            changed_ids += self._get_ids(previous.exclude(pk__in=queryset.values("pk")))
+        changed_ids = set(changed_ids)
+        if len(changed_ids) > self.MAX_CHANGES:
+            return JsonResponse({"reset": True})
+
+        markers = list(queryset.filter(pk__in=changed_ids).order_by("pk").values_list(*MARKER_FIELDS))
+        matching_ids = {marker[0] for marker in markers}
+        removed = sorted(pk for pk in changed_ids if pk not in matching_ids)
+        return JsonResponse({"markers": markers, "removed": removed, "since": now.isoformat()})
+
+    def _get_changed_ids(self, window_start) -> list[int]:
+        """Shuls (deleted ones included) changed since ``window_start``."""
+        changed_rooms = Room.objects.filter(updated_at__gt=window_start).values("shul_id")
+        return self._get_ids(
+            Shul.all_objects.filter(
+                Q(updated_at__gt=window_start) | Q(deleted__gt=window_start) | Q(pk__in=changed_rooms)
+            )
+        )
+
+    def _get_ids(self, queryset) -> list[int]:
+        """Up to one more id than MAX_CHANGES - enough to know there are too many."""
+        return list(queryset.order_by().values_list("pk", flat=True)[: self.MAX_CHANGES + 1])
+
+
+class ShulSearchView(LoginRequiredMixin, FilteredShulsMixin, View):
+    """
+    Shuls matching ``q`` by name, city or address (see eznashdb.shul_search),
+    within the active filters and best match first. Rows are marker rows in
+    ShulMarkersView's format followed by name and city, so the map can jump
+    straight to a result. Signed-in users only, as they alone see names.
+    """
+
+    prefetch_rooms = False
+
+    def get(self, request, *args, **kwargs):
+        shuls = search_shuls(self.get_queryset(), request.GET.get("q", ""))
+        return JsonResponse({"results": list(shuls.values_list(*MARKER_FIELDS, "name", "city"))})
+
+
+class ShulNameSuggestView(LoginRequiredMixin, View):
+    """
+    Keystroke autocomplete of shul names, answered from the in-process name
+    index (see eznashdb.name_index) without querying the database. Rows are
+    in ShulSearchView's format. Unlike it, filters aren't applied - this is
+    for finding a shul that's already listed.
+    """
+
+    def get(self, request, *args, **kwargs):
+        suggestions = shul_name_index.suggest(request.GET.get("q", ""))
+        return JsonResponse({"results": [suggestion.as_row() for suggestion in suggestions]})
+
+
+class ShulMarkerBundleView(View):
+    """
+    Serves a marker bundle (see eznashdb.marker_bundle) precompressed, for
+    the client's preferred encoding. Bundle names change with their content,
+    so responses can be cached forever.
+    """
+
+    def get(self, request, name):
+        accepted = {
+            encoding.split(";")[0].strip()
+            for encoding in request.headers.get("Accept-Encoding", "").split(",")
+        }
+        for encoding in [*(e for e in ENCODINGS if e in accepted), None]:
+            path = get_bundle_path(name, encoding)
+            if path:
+                break
+        else:
+            raise Http404("No such marker bundle.")
+
+        response = FileResponse(path.open("rb"), content_type="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+
+class ShulClusterPopupView(FilteredShulsMixin, View):
+    """
+    A map cluster's popup. Rendered popups are shared through the map
+    fragment cache, keyed by the active filters and whether the user is
+    signed in (anonymous users see one shul, without its name). Shuls are
+    rendered collapsed - the map expands the selected one.
+    """
+
+    template_name = "eznashdb/includes/shul_cluster_popup.html"
+    # Stands in for the login URL in cached popups, which is per host in DEBUG
+    LOGIN_URL_PLACEHOLDER = "__login_url__"
+
     def get(self, request, *args, **kwargs):
         cluster_key = request.GET.get("cluster_key", "")
         if not cluster_key:
             return HttpResponseBadRequest("Missing 'cluster_key'.")
 
-        qs = self.get_queryset()
-        shul_count_limit = None if request.user.is_authenticated else 1
-        shuls = self._shuls_in_cluster(qs, cluster_key, limit=shul_count_limit)
-        self._mark_selected_shul(shuls, request.GET.get("selected_shul", ""))
-
-        context = {"shuls": shuls}
-        if not request.user.is_authenticated:
-            context["login_url"] = get_login_url(request)
+        fragment_key = self._make_popup_key(cluster_key)
+        content = get_fragment(fragment_key)
+        if content is None:
+            shuls = self._shuls_in_cluster(self.get_queryset(), cluster_key, limit=self.shul_count_limit)
+            content = self._render_popup(shuls)
+            set_fragment(fragment_key, content)
 
-        return render(request, "eznashdb/includes/shul_cluster_popup.html", context)
+        return HttpResponse(self._fill_in_login_url(content))
 
-    def get_queryset(self):
-        """Shuls matching the page's active filters, minus any excluded shul."""
-        NON_FILTER_PARAMS = ("cluster_key", "exclude", "selected_shul")
-        filter_params = self.request.GET.copy()
-        for param in NON_FILTER_PARAMS:
-            filter_params.pop(param, None)
+    @property
+    def shul_count_limit(self) -> int | None:
+        return None if self.request.user.is_authenticated else 1
 
-        filterset = ShulFilterSet(
-            filter_params or None, queryset=Shul.objects.all(), request=self.request
-        )
-        # Mirrors default behavior from django_filter
-        qs = filterset.qs if not filterset.is_bound or filterset.is_valid() else Shul.objects.none()
+    def _make_popup_key(self, cluster_key) -> str:
+        return make_fragment_key("cluster_popup", self._get_popup_params(cluster_key))
 
+    def _get_popup_params(self, cluster_key) -> QueryDict:
+        """
+        The params a cluster's popup depends on, for its cache key. Only the
+        filterset's own params count, so callers sending different extras
+        (the batch and single views do) share entries.
+        """
+        params = QueryDict(mutable=True)
+        for name in ShulFilterSet.base_filters:
+            if name in self.request.GET:
+                params.setlist(name, self.request.GET.getlist(name))
         exclude_id = self.request.GET.get("exclude", "")
         if exclude_id.isdigit():
-            qs = qs.exclude(pk=exclude_id)
+            params["exclude"] = exclude_id
+        params["cluster_key"] = cluster_key
+        if self.request.user.is_authenticated:
+            params["signed_in"] = "1"
+        return params
 
-        return qs
+    def _render_popup(self, shuls) -> bytes:
+        context = {"shuls": shuls}
+        if not self.request.user.is_authenticated:
+            context["login_url"] = self.LOGIN_URL_PLACEHOLDER
+        return render_to_string(self.template_name, context, request=self.request).encode()
+
+    def _fill_in_login_url(self, content: bytes) -> bytes:
+        if self.request.user.is_authenticated:
+            return content
+        login_url = escape(get_login_url(self.request)).encode()
+        return content.replace(self.LOGIN_URL_PLACEHOLDER.encode(), login_url)
 
     def _shuls_in_cluster(self, qs, cluster_key, limit: int | None = None):
-        """Members of the given cluster, with rooms prefetched for rendering."""
-        # Scan without the rooms prefetch to find cluster membership cheaply,
-        # then re-fetch just those shuls with the prefetch for rendering.
-        member_ids = [
-            shul.pk
-            for shul in qs.prefetch_related(None).only("pk", "latitude", "longitude")
-            if shul.cluster_key == cluster_key
-        ]
-        return list(qs.filter(pk__in=member_ids).order_by("name", "pk"))[:limit]
+        """
+        Members of the given cluster, with rooms prefetched for rendering.
+        Found through the stored, indexed cluster_key, so the cost doesn't
+        grow with the number of shuls outside the cluster.
+        """
+        return list(qs.filter(cluster_key=cluster_key).order_by("name", "pk")[:limit])
+
+
+class ShulClusterPopupBatchView(ShulClusterPopupView):
+    """
+    Several clusters' popups in one request, as ``{"popups": {cluster_key:
+    html}}``, so the map can prefetch the popups of the clusters in view.
+    Shares ShulClusterPopupView's cache entries; the uncached ones are
+    rendered from a single query and rooms prefetch.
+    """
+
+    MAX_CLUSTERS = 50
+
+    def get(self, request, *args, **kwargs):
+        cluster_keys = list(dict.fromkeys(key for key in request.GET.getlist("cluster_key") if key))
+        if not cluster_keys:
+            return HttpResponseBadRequest("Missing 'cluster_key'.")
+        if len(cluster_keys) > self.MAX_CLUSTERS:
+            return HttpResponseBadRequest(f"At most {self.MAX_CLUSTERS} 'cluster_key' values.")
+
+        fragment_keys = {cluster_key: self._make_popup_key(cluster_key) for cluster_key in cluster_keys}
+        cached = get_fragments(fragment_keys.values())
+        contents = {
+            cluster_key: cached[fragment_key]
+            for cluster_key, fragment_key in fragment_keys.items()
+            if fragment_key in cached
+        }
+
+        missing = [cluster_key for cluster_key in cluster_keys if cluster_key not in contents]
+        if missing:
+            shuls_by_cluster = self._shuls_in_clusters(self.get_queryset(), missing)
+            for cluster_key in missing:
+                contents[cluster_key] = self._render_popup(shuls_by_cluster[cluster_key])
+                set_fragment(fragment_keys[cluster_key], contents[cluster_key])
+
+        popups = {
+            cluster_key: self._fill_in_login_url(contents[cluster_key]).decode()
+            for cluster_key in cluster_keys
+        }
+        return JsonResponse({"popups": popups})
 
-    def _mark_selected_shul(self, shuls, selected_shul):
-        for shul in shuls:
-            shul.is_expanded = str(shul.pk) == selected_shul
+    def _shuls_in_clusters(self, qs, cluster_keys) -> dict[str, list[Shul]]:
+        shuls_by_cluster = {cluster_key: [] for cluster_key in cluster_keys}
+        for shul in qs.filter(cluster_key__in=cluster_keys).order_by("name", "pk"):
+            shuls_by_cluster[shul.cluster_key].append(shul)
+        return {
+            cluster_key: shuls[: self.shul_count_limit]
+            for cluster_key, shuls in shuls_by_cluster.items()
+        }
 
 
 class CreateUpdateShulView(AbusePreventionMixin, LoginRequiredMixin, UpdateView):
     model = Shul
     form_class = ShulForm
     template_name = "eznashdb/create_update_shul.html"
-    NEARBY_SEARCH_RADIUS = Decimal("0.001")  # ~111 meters at the equator
+    NEARBY_SEARCH_RADIUS_M = 150
+    # Shuls this close with a similar name or address are likely the same
+    # shul added with a slightly different pin
+    SIMILAR_SHUL_SEARCH_RADIUS_M = 2000
 
     def get_success_url(self) -> str:
         url = reverse_lazy("eznashdb:shuls")
@@ -300,20 +758,39 @@ class CreateUpdateShulView(AbusePreventionMixin, LoginRequiredMixin, UpdateView)
         if lat is None or lon is None:
             return Shul.objects.none()
 
-        return Shul.objects.filter(
-            latitude__gte=lat - self.NEARBY_SEARCH_RADIUS,
-            latitude__lte=lat + self.NEARBY_SEARCH_RADIUS,
-            longitude__gte=lon - self.NEARBY_SEARCH_RADIUS,
-            longitude__lte=lon + self.NEARBY_SEARCH_RADIUS,
-        ).exclude(pk=self.object.pk if self.object else None)
+        similar = similar_to(
+            name=form.cleaned_data.get("name", ""), address=form.cleaned_data.get("address", "")
+        )
+        return (
+            shuls_near(lat, lon, self.SIMILAR_SHUL_SEARCH_RADIUS_M)
+            .filter(Q(distance__lte=self.NEARBY_SEARCH_RADIUS_M) | similar)
+            .exclude(pk=self.object.pk if self.object else None)
+        )
 
     def room_fs_valid(self, room_fs):
-        rooms = room_fs.save(commit=False)
-        for obj in room_fs.deleted_objects:
-            obj.delete()
-        for room in rooms:
+        """
+        Saves the rooms in one query per kind of change (removed, new and
+        changed) rather than one per room, then updates the caches once.
+        """
+        room_fs.save(commit=False)
+        new_rooms = room_fs.new_objects
+        changed_rooms = [room for room, _ in room_fs.changed_objects]
+        for room in [*new_rooms, *changed_rooms]:
             room.shul = self.object
-            room.save()
+
+        with batched_room_changes():
+            if room_fs.deleted_objects:
+                Room.objects.filter(pk__in=[room.pk for room in room_fs.deleted_objects]).delete()
+            if new_rooms:
+                Room.objects.bulk_create(new_rooms)
+            if changed_rooms:
+                # bulk_update() skips auto_now, so stamp changed rooms as save() would
+                now = timezone.now()
+                for room in changed_rooms:
+                    room.updated_at = now
+                Room.objects.bulk_update(changed_rooms, [*room_fs.form._meta.fields, "updated_at"])
+            # Bulk writes send no signals
+            rooms_changed(self.object.pk)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -382,8 +859,8 @@ class AddressLookupView(LoginRequiredMixin, View):
         merger = PlaceSearchMerger(google_client, osm_client)
         normalized_results = merger.search(query, session_token)
 
-        # Increment Google usage if it was used
-        if use_google:
+        # Increment Google usage if it was used - cached lookups are free
+        if use_google and google_client.autocomplete_requests:
             budget_checker.increment_autocomplete(request.user)
 
         # Convert NormalizedPlace objects to JSON format
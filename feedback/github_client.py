@@ -1,6 +1,8 @@
 import requests
 from django.conf import settings
 
+from app import http_client
+
 
 class ImgurClient:
     """Client for uploading images to Imgur anonymously."""
@@ -29,7 +31,7 @@ class ImgurClient:
 
             files = {"image": image_data}
 
-            response = requests.post(self.upload_url, headers=headers, files=files, timeout=30)
+            response = http_client.post(self.upload_url, headers=headers, files=files, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -74,7 +76,7 @@ class GitHubClient:
         data = {"title": title, "body": body, "labels": labels}
 
         try:
-            response = requests.post(url, json=data, headers=self.headers, timeout=10)
+            response = http_client.post(url, json=data, headers=self.headers, timeout=10)
             response.raise_for_status()
             issue_data = response.json()
             return issue_data
@@ -101,7 +103,7 @@ class GitHubClient:
             url = f"{self.base_url}/repos/{self.repo}/issues/{issue_number}/comments"
             data = {"body": comment_body}
 
-            response = requests.post(url, json=data, headers=self.headers, timeout=10)
+            response = http_client.post(url, json=data, headers=self.headers, timeout=10)
             response.raise_for_status()
             return True
         except requests.exceptions.RequestException: